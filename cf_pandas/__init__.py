@@ -2,15 +2,37 @@
 cf-pandas: an accessor for pandas objects that interprets CF attributes
 """
 
+import sys
 from importlib.metadata import PackageNotFoundError, version
 
+from . import analyze, search, standard_name_index, standard_name_table
 from .accessor import CFAccessor  # noqa
-from .options import set_options  # noqa
+from .analyze import lint_vocab
+from .catalog import Catalog
+from .compiled import CompiledCriteria
+from .options import set_default_options, set_options  # noqa
+from .readers import read_csv, read_dataset, read_feather, read_parquet, read_sql
 from .reg import Reg
+from .search import search_standard_names
 from .utils import always_iterable, astype, match_criteria_key, standard_names
-from .vocab import Vocab, merge
+from .vocab import LazyVocab, Vocab, merge
 from .widget import Selector, dropdown
 
+# importing dask.dataframe is slow, so its accessor is registered here only if it is imported
+# already, and otherwise with "import cf_pandas.dask_accessor"
+if "dask.dataframe" in sys.modules:
+    try:
+        from . import dask_accessor  # noqa
+    except ImportError:
+        pass
+
+# the same for the cf namespace of polars, with "import cf_pandas.polars_accessor"
+if "polars" in sys.modules:
+    try:
+        from . import polars_accessor  # noqa
+    except ImportError:
+        pass
+
 try:
     __version__ = version("cf-pandas")
 except PackageNotFoundError:
@@ -2,6 +2,7 @@
 From cf-xarray.
 """
 
+import functools
 import itertools
 from collections import ChainMap
 from typing import (
@@ -13,6 +14,7 @@ from typing import (
     List,
     Mapping,
     MutableMapping,
+    Optional,
     Sequence,
     Set,
     Tuple,
@@ -22,19 +24,22 @@ from typing import (
 )
 
 import pandas as pd
+import regex
 from pandas import DataFrame, Series
 
-import cf_pandas as cfp
-
-from .criteria import coordinate_criteria, guess_regex
+from .compiled import CompiledCriteria
+from .criteria import coordinate_criteria_index, guess_regex_tagged
+from .metadata import METADATA_KEY, make_metadata, stored_keys
 from .options import OPTIONS
+from .standard_name_table import load_table, units_agree
 from .utils import (
     _is_datetime_like,
+    _match_criteria_key,
     always_iterable,
+    header_index,
     match_criteria_key,
     set_up_criteria,
 )
-from .vocab import Vocab
 
 #:  `axis` names understood by cf_xarray
 _AXIS_NAMES = ("X", "Y", "Z", "T")
@@ -42,6 +47,9 @@ _AXIS_NAMES = ("X", "Y", "Z", "T")
 #:  `coordinate` types understood by cf_xarray.
 _COORD_NAMES = ("longitude", "latitude", "vertical", "time")
 
+# units at the end of a header, in parentheses or brackets
+_HEADER_UNITS = regex.compile(r"[\(\[]([^\)\]]*)[\)\]]\s*$")
+
 # Type for Mapper functions
 Mapper = Callable[[DataFrame, str], List[str]]
 
@@ -69,9 +77,8 @@ class CFAccessor:
         # verify that necessary keys are present. Z would also be nice but might be missing.
         # but don't use the accessor to check
         keys = ["T", "longitude", "latitude"]
-        missing_keys = [
-            key for key in keys if len(_get_axis_coord(self._obj, key)) == 0
-        ]
+        axis_coords = _get_axis_coords(self._obj)
+        missing_keys = [key for key in keys if len(axis_coords[key]) == 0]
         if len(missing_keys) > 0:
             raise AttributeError(
                 f'{"longitude", "latitude", "time"} must be identifiable in DataFrame but {missing_keys} are missing.'
@@ -105,17 +112,7 @@ class CFAccessor:
         >>> df.cf[alias]
         """
 
-        # if key is a coordinate or axes, use a different method to match
-        valid_keys = _COORD_NAMES + _AXIS_NAMES
-        # return the key if it is already a name in the object and doesn't need to be interpreted
-        if key in self._obj.keys():
-            col_names = [key]
-
-        elif key in valid_keys:
-            col_names = _get_axis_coord(self._obj, key)
-
-        else:
-            col_names = _get_custom_criteria(self._obj, key)
+        col_names = self._key_names(key)
 
         # return series for column
         if len(col_names) == 1 and col_names[0] in self._obj.columns:
@@ -129,6 +126,25 @@ class CFAccessor:
         else:
             raise ValueError("Some error has occurred.")
 
+    def _key_names(self, key: str) -> List[str]:
+        """Names of columns or index levels that key selects."""
+
+        # if key is a coordinate or axes, use a different method to match
+        valid_keys = _COORD_NAMES + _AXIS_NAMES
+        stored = _resolved_keys(self._obj)
+        # return the key if it is already a name in the object and doesn't need to be interpreted
+        if key in self._obj.keys():
+            return [key]
+
+        elif stored is not None and key in stored:
+            return list(stored[key])
+
+        elif key in valid_keys:
+            return _get_axis_coord(self._obj, key)
+
+        else:
+            return _get_custom_criteria(self._obj, key)
+
     def __setitem__(self, key: str, values: Union[Sequence, Series]):
         """Set column by alias.
 
@@ -227,7 +243,8 @@ class CFAccessor:
             Values are lists of variable names that match that particular key.
         """
         # vardict = {key: self.__getitem__(key) for key in _AXIS_NAMES}
-        vardict = {key: _get_all(self._obj, key) for key in _AXIS_NAMES}
+        axis_coords = _get_axis_coords(self._obj)
+        vardict = {key: _get_all(self._obj, key, axis_coords) for key in _AXIS_NAMES}
         return {k: sorted(v) for k, v in vardict.items() if v}
 
     @property
@@ -249,7 +266,8 @@ class CFAccessor:
             Values are lists of variable names that match that particular key.
         """
         # vardict = {key: self.__getitem__(key) for key in _COORD_NAMES}
-        vardict = {key: _get_all(self._obj, key) for key in _COORD_NAMES}
+        axis_coords = _get_axis_coords(self._obj)
+        vardict = {key: _get_all(self._obj, key, axis_coords) for key in _COORD_NAMES}
 
         return {k: sorted(v) for k, v in vardict.items() if v}
 
@@ -269,8 +287,13 @@ class CFAccessor:
         """
 
         custom_criteria = set_up_criteria()
+        # one stored or cached mapping for all keys, if there is one
+        stored = _resolved_keys(self._obj) or {}
         vardict = {
-            key: _get_custom_criteria(self._obj, key) for key in custom_criteria.keys()
+            key: list(stored[key])
+            if key in stored
+            else _get_custom_criteria(self._obj, key)
+            for key in custom_criteria.keys()
         }
 
         return vardict
@@ -316,22 +339,241 @@ class CFAccessor:
         This is not the same as the cf-xarray accessor method of the same name, which searches for variables with standard_name attributes and surfaces those values to map to the variable name.
         """
 
-        names = cfp.standard_names()
-
-        vardict = {}
-        for key in names:
-            local_criteria = Vocab().make_entry(key, f"{key}$")
-            key_match = _get_custom_criteria(
-                self._obj, key, criteria=local_criteria.vocab
-            )
+        table = load_table()
 
-            if len(key_match) > 0:
-                vardict[key] = key_match
+        # standard names are plain words, so matching them is exact membership of a
+        # header token, which replaces a regular expression pass per standard name.
+        # Deprecated aliases are reported under the standard name that replaces them.
+        index = header_index(
+            [col for col in self._obj.columns if isinstance(col, str)], split=True
+        )
+        vardict: Dict[str, List[str]] = {}
+        for token, cols in index.items():
+            name = table.resolve(token)
+            if name is None:
+                continue
+            matched = vardict.setdefault(name, [])
+            matched.extend(col for col in cols if col not in matched)
 
         return vardict
 
+    def to_arrow(self, criteria=None, **kwargs):
+        """
+        Convert to an Arrow table that stores which columns match each key.
+
+        The mapping of keys to columns, the fingerprint of the criteria, and the "standard_name",
+        "units" and "axis" of columns are stored in the schema metadata under "cf_pandas", and the
+        attributes of each column in its field metadata. The readers of cf-pandas and ``df.cf`` use
+        the stored mapping instead of matching again if the criteria have the same fingerprint.
+
+        Parameters
+        ----------
+        criteria : dict, optional
+            Criteria to use to map from variable to attributes describing the variable. If user has defined custom_criteria, this will be used by default. Axes and coordinates are stored without criteria.
+        kwargs
+            Passed to ``pyarrow.Table.from_pandas``.
+
+        Returns
+        -------
+        pyarrow.Table
+            Table with the mapping in its metadata.
+        """
+
+        import json
+
+        import pyarrow as pa
+
+        metadata = self._metadata(criteria)
+        obj = self._obj.copy(deep=False)
+        obj.attrs = {**self._obj.attrs, METADATA_KEY: metadata}
+        table = pa.Table.from_pandas(obj, **kwargs)
+
+        fields = []
+        for field in table.schema:
+            attrs = metadata["columns"].get(field.name)
+            if attrs:
+                field = field.with_metadata({**(field.metadata or {}), **attrs})
+            fields.append(field)
+        schema = pa.schema(
+            fields,
+            metadata={
+                **(table.schema.metadata or {}),
+                METADATA_KEY: json.dumps(metadata),
+            },
+        )
+        return table.cast(schema)
+
+    def to_parquet(self, path, criteria=None, **kwargs):
+        """
+        Write to a Parquet file that stores which columns match each key.
+
+        See ``to_arrow`` for what is stored. ``cfp.read_parquet`` then reads matching columns without
+        matching again.
+
+        Parameters
+        ----------
+        path : str, Path, file-like
+            Parquet file to write.
+        criteria : dict, optional
+            Criteria to use to map from variable to attributes describing the variable. If user has defined custom_criteria, this will be used by default.
+        kwargs
+            Passed to ``pyarrow.parquet.write_table``.
+        """
+
+        import pyarrow.parquet as pq
+
+        pq.write_table(self.to_arrow(criteria), path, **kwargs)
+
+    def _metadata(self, criteria=None) -> Dict[str, Any]:
+        """Mapping of all keys to columns and attributes of columns, to store."""
+
+        names = list(self._obj.columns) + list(self._obj.index.names)
+        try:
+            custom_criteria = set_up_criteria(criteria)
+        except ValueError:
+            # only axes and coordinates without criteria
+            custom_criteria = None
+        keys = _classify(self._obj, custom_criteria)
+
+        columns: Dict[str, Dict[str, str]] = {}
+        for name, cols in self.standard_names.items():
+            for col in cols:
+                columns.setdefault(col, {})["standard_name"] = name
+        for col in names:
+            units = _header_units(col) if isinstance(col, str) else None
+            if units:
+                columns.setdefault(col, {})["units"] = units
+        for axis in _AXIS_NAMES:
+            for col in keys[axis]:
+                columns.setdefault(col, {})["axis"] = axis
+
+        return make_metadata(names, keys, columns, custom_criteria)
+
+    def check_units(self) -> Dict[str, Dict[str, str]]:
+        """
+        Compare units in column headers to the canonical units of the standard names in them.
+
+        Columns are checked if their header has the form "standard_name (units)" or "standard_name [units]".
+
+        Returns
+        -------
+        dict
+            Column names whose units do not agree with the canonical units, mapped to their
+            "standard_name", "units", and "canonical_units".
+
+        Notes
+        -----
+        If ``cf_units`` is installed, units agree if they can be converted to each other. Otherwise
+        units are compared by spelling and by the dimensions of common units, so "m/s" agrees with
+        "m s-1" and "degC" with "K". Units that cannot be compared without ``cf_units`` are not reported.
+        """
+
+        table = load_table()
+        mismatches = {}
+        for col in self._obj.columns:
+            if not isinstance(col, str):
+                continue
+            units = _header_units(col)
+            if units is None:
+                continue
+            for token in col.split():
+                name = table.resolve(token)
+                if name is None:
+                    continue
+                canonical = table.units(name)
+                if canonical is not None and units_agree(units, canonical) is False:
+                    mismatches[col] = {
+                        "standard_name": name,
+                        "units": units,
+                        "canonical_units": canonical,
+                    }
+                break
+
+        return mismatches
+
+
+def _stored_keys(obj: DataFrame) -> Optional[Dict[str, List[str]]]:
+    """Mapping stored in ``obj.attrs`` if it was resolved for the same names and criteria."""
+
+    metadata = getattr(obj, "attrs", {}).get(METADATA_KEY)
+    if not isinstance(metadata, dict):
+        return None
+    # columns may have been added, removed or renamed since
+    names = list(obj.columns) + list(obj.index.names)
+    if metadata.get("names") != [
+        name if isinstance(name, str) else None for name in names
+    ]:
+        return None
+    return stored_keys(metadata)
+
+
+def _resolved_keys(obj: DataFrame) -> Optional[Dict[str, List[str]]]:
+    """All keys mapped to names of obj, stored in attrs or from the resolution cache.
+
+    Returns None if there is no stored mapping and the resolution cache is off, to match as usual.
+    """
+
+    stored = _stored_keys(obj)
+    if stored is not None or not OPTIONS["resolution_cache"]:
+        return stored
+
+    from .resolution_cache import cached_resolution
+
+    try:
+        custom_criteria = set_up_criteria()
+    except ValueError:
+        custom_criteria = None
+    names = list(obj.columns) + list(obj.index.names)
+    # time is guessed from dtypes too, so the same names with other dtypes are kept apart
+    if isinstance(obj.index, pd.MultiIndex):
+        dtypes = list(obj.dtypes) + [level.dtype for level in obj.index.levels]
+    else:
+        dtypes = list(obj.dtypes) + [obj.index.dtype]
+    datetimes = [
+        i
+        for i, dtype in enumerate(dtypes)
+        # datetime64 and timedelta64, also with time zones
+        if getattr(dtype, "kind", None) in ("M", "m")
+    ]
+    return cached_resolution(
+        "accessor",
+        names,
+        lambda: _classify(obj, custom_criteria),
+        extra=datetimes,
+        fingerprint=None if custom_criteria is None else custom_criteria.fingerprint,
+    )
+
+
+def _classify(
+    obj: DataFrame, custom_criteria: Optional[CompiledCriteria]
+) -> Dict[str, List[str]]:
+    """Match names of obj to all axis, coordinate and criteria keys, in the order of names."""
+
+    names = list(obj.columns) + list(obj.index.names)
+    order = {name: i for i, name in enumerate(names)}
+    keys = _match_axis_coords(obj)
+    for key in custom_criteria or ():
+        keys[key] = sorted(
+            _match_criteria_key(list(obj.columns), key, custom_criteria, split=True),
+            key=order.__getitem__,
+        )
+    return keys
+
+
+def _header_units(col: str) -> Optional[str]:
+    """Units from a header like "name (units)" or "name [units]", or None."""
 
-def _get_axis_coord(obj: Union[DataFrame, Series], key: str) -> list:
+    match = _HEADER_UNITS.search(col)
+    if match is None:
+        return None
+    return match.group(1).strip()
+
+
+def _get_axis_coord(
+    obj: Union[DataFrame, Series],
+    key: str,
+    axis_coords: Optional[Mapping[str, List[str]]] = None,
+) -> list:
     """
     Translate from axis or coord name to variable name. After matching based on coordinate_criteria,
     if there are no matches for key, then guess_regex is used to search for matches.
@@ -342,6 +584,8 @@ def _get_axis_coord(obj: Union[DataFrame, Series], key: str) -> list:
         DataArray belonging to the coordinate to be checked
     key : str, ["X", "Y", "Z", "T", "longitude", "latitude", "vertical", "time"]
         key to check for.
+    axis_coords : Mapping, optional
+        Output of ``_get_axis_coords`` for obj, to reuse instead of matching again.
 
     Returns
     -------
@@ -366,52 +610,111 @@ def _get_axis_coord(obj: Union[DataFrame, Series], key: str) -> list:
             f"cf_xarray did not understand key {key!r}. Expected one of {valid_keys!r}"
         )
 
-    # loop over column names and index names
-    results: set = set()
+    if axis_coords is None:
+        axis_coords = _get_axis_coords(obj)
+    return list(axis_coords[key])
+
+
+def _get_axis_coords(obj: Union[DataFrame, Series]) -> Dict[str, List[str]]:
+    """Match columns and index names of obj to all axis and coordinate keys at once.
+
+    Parameters
+    ----------
+    obj : DataFrame
+        Object whose columns and index names are checked.
+
+    Returns
+    -------
+    dict
+        Every key of ``_AXIS_NAMES`` and ``_COORD_NAMES`` mapped to the list of matching names.
+    """
+
+    stored = _resolved_keys(obj)
+    if stored is not None and all(key in stored for key in _AXIS_NAMES + _COORD_NAMES):
+        return {key: list(stored[key]) for key in _AXIS_NAMES + _COORD_NAMES}
+    return _match_axis_coords(obj)
+
+
+def _match_axis_coords(obj: DataFrame) -> Dict[str, List[str]]:
+    """``_get_axis_coords`` without stored or cached mappings."""
+
     cols_and_indices = list(obj.columns)
     cols_and_indices += obj.index.names
-    # remove None if in names from index
-    cols_and_indices = [name for name in cols_and_indices if name is not None]
-    for col in cols_and_indices:
-        if key in coordinate_criteria:
-            for criterion, expected in coordinate_criteria[key].items():
-                # allow for the column header having a space in it that separate
-                # the name from the units, for example
-                strings = col.split()
-                for string in strings:
-                    string = string.lower()
-                    if string.startswith("(") and string.endswith(")"):
-                        if string.strip(")(") in expected:
-                            results.update((col,))
-                    if string in expected:
-                        # if col.attrs.get(criterion, None) in expected:
-                        results.update((col,))
-                    # if criterion == "units":
-                    #     # deal with pint-backed objects
-                    #     units = getattr(col.data, "units", None)
-                    #     if units in expected:
-                    #         results.update((col,))
+
+    def is_datetime(col: str) -> bool:
+        if col in obj.columns:
+            return _is_datetime_like(obj[col])
+        return _is_datetime_like(obj.index.get_level_values(col))
+
+    return _match_axis_coord_names(cols_and_indices, is_datetime)
+
+
+def _match_axis_coord_names(
+    names: Sequence[Hashable],
+    is_datetime: Optional[Callable[[str], bool]] = None,
+) -> Dict[str, List[str]]:
+    """Match names to all axis and coordinate keys in one pass.
+
+    Parameters
+    ----------
+    names : Sequence
+        Column and index names in order. Names that are not strings, like None for an unnamed index, are skipped.
+    is_datetime : Callable, optional
+        Returns whether the values under a name are datetime-like, to identify time without a matching name.
+
+    Returns
+    -------
+    dict
+        Every key of ``_AXIS_NAMES`` and ``_COORD_NAMES`` mapped to the list of matching names.
+
+    Notes
+    -----
+    Header tokens are looked up in ``coordinate_criteria_index``. For each key that has no results
+    so far, a datetime-like name is taken as time, otherwise the key's ``guess_regex`` pattern is used,
+    read from one match of ``guess_regex_tagged``.
+    """
+
+    # dicts as ordered sets
+    results: Dict[str, Dict[str, None]] = {
+        key: {} for key in _AXIS_NAMES + _COORD_NAMES
+    }
+    for col in names:
+        if not isinstance(col, str):
+            continue
+
+        # allow for the column header having a space in it that separate
+        # the name from the units, for example
+        matched: Set[str] = set()
+        for string in col.split():
+            string = string.lower()
+            if string.startswith("(") and string.endswith(")"):
+                matched.update(coordinate_criteria_index.get(string.strip(")("), ()))
+            matched.update(coordinate_criteria_index.get(string, ()))
+        for key in matched:
+            results[key][col] = None
+
         # also use the guess_regex approach by default, but only if no results so far
         # this takes the logic from cf-xarray guess_coord_axis
-        if len(results) == 0:
-            if col in obj.columns:
-                if key in ("T", "time") and _is_datetime_like(obj[col]):
-                    results.update((col,))
-                    continue  # prevent second detection
-            elif col in obj.index.names:
-                if key in ("T", "time") and _is_datetime_like(
-                    obj.index.get_level_values(col)
-                ):
-                    results.update((col,))
-                    continue  # prevent second detection
-            pattern = guess_regex[key]
-            if pattern.match(col.lower()):
-                results.update((col,))
-
-    return list(results)
-
-
-def _get_all(obj: DataFrame, key: str) -> List[str]:
+        pending = [key for key, found in results.items() if len(found) == 0]
+        if len(pending) == 0:
+            continue
+        if is_datetime is not None and is_datetime(col):
+            for key in ("T", "time"):
+                if key in pending:
+                    results[key][col] = None
+                    pending.remove(key)  # prevent second detection
+        groups = guess_regex_tagged.match(col.lower()).groupdict()
+        for key in pending:
+            # there is no guess for "vertical"
+            if groups.get("time" if key == "T" else key) is not None:
+                results[key][col] = None
+
+    return {key: list(found) for key, found in results.items()}
+
+
+def _get_all(
+    obj: DataFrame, key: str, axis_coords: Optional[Mapping[str, List[str]]] = None
+) -> List[str]:
     """
     One or more of ('X', 'Y', 'Z', 'T', 'longitude', 'latitude', 'vertical', 'time',
     'area', 'volume'), or arbitrary measures, or standard names
@@ -419,7 +722,7 @@ def _get_all(obj: DataFrame, key: str) -> List[str]:
     all_mappers = (
         _get_custom_criteria,
         # functools.partial(_get_custom_criteria, criteria=cf_role_criteria),
-        _get_axis_coord,
+        functools.partial(_get_axis_coord, axis_coords=axis_coords),
         # _get_measure,
         # _get_with_standard_name,
     )
@@ -495,5 +798,9 @@ def apply_mapper(
 # without accessor.
 def _get_custom_criteria(obj: DataFrame, key: str, criteria=None) -> List[str]:
 
+    if criteria is None:
+        stored = _resolved_keys(obj)
+        if stored is not None and key in stored:
+            return list(stored[key])
     results = match_criteria_key(obj.columns, key, criteria, split=True)
     return results
@@ -0,0 +1,148 @@
+"""Aho-Corasick automaton to find many literal terms in one pass over a string."""
+
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+class AhoCorasick(object):
+    """Automaton matching a set of literal terms at once.
+
+    Each string is read once, however many terms there are, so this is faster than checking
+    terms one by one with ``in`` when there are many of them.
+
+    Parameters
+    ----------
+    terms: Iterable
+        Strings to look for. Duplicates are ignored.
+
+    Examples
+    --------
+    >>> automaton = AhoCorasick(["qc", "flag", "error"])
+    >>> automaton.search("temp_qc")
+    True
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        self.terms: List[str] = list(dict.fromkeys(terms))
+        # the empty term occurs at every position
+        self._empty = "" in self.terms
+
+        # state -> character -> next state, failure links, and ids of terms ending at state
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+        for term_id, term in enumerate(self.terms):
+            if term == "":
+                continue
+            state = 0
+            for char in term:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._out[state] += (term_id,)
+
+        # breadth first, so failure targets are complete before their children
+        order = []
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            order.append(state)
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._out[child] += self._out[self._fail[child]]
+
+        # follow failure links ahead of time, so reading a character is one lookup;
+        # characters that are in no term go back to the start
+        self._delta: List[Dict[str, int]] = [dict(self._goto[0])] + [
+            {} for _ in range(len(self._goto) - 1)
+        ]
+        for state in order:
+            self._delta[state] = {
+                **self._delta[self._fail[state]],
+                **self._goto[state],
+            }
+
+    def __len__(self):
+        """Number of terms."""
+        return len(self.terms)
+
+    def __repr__(self):
+        """Representation."""
+        return f"<AhoCorasick terms={len(self.terms)} states={len(self._goto)}>"
+
+    def occurrences(self, text: str, start: int = 0) -> Iterator[Tuple[int, int]]:
+        """Occurrences of terms in text that start at or after start.
+
+        Parameters
+        ----------
+        text: str
+            String to search.
+        start: int
+            Position in text to start from.
+
+        Yields
+        ------
+        tuple
+            (end position, term id), in order of end position. The empty term is not included.
+        """
+
+        delta, out = self._delta, self._out
+        state = 0
+        for position in range(start, len(text)):
+            state = delta[state].get(text[position], 0)
+            if out[state]:
+                for term_id in out[state]:
+                    yield position + 1, term_id
+
+    def search(self, text: str, start: int = 0) -> bool:
+        """Whether any term occurs in text at or after start."""
+
+        if self._empty:
+            return start <= len(text)
+        delta, out = self._delta, self._out
+        state = 0
+        for char in text[start:]:
+            state = delta[state].get(char, 0)
+            if out[state]:
+                return True
+        return False
+
+    def first_end(self, text: str, start: int = 0) -> Optional[int]:
+        """End of the occurrence of any term that ends first, among those at or after start.
+
+        Returns
+        -------
+        int, None
+            Position just after the occurrence, or None if no term occurs.
+        """
+
+        if self._empty:
+            return start if start <= len(text) else None
+        delta, out = self._delta, self._out
+        state = 0
+        for end, char in enumerate(text[start:], start + 1):
+            state = delta[state].get(char, 0)
+            if out[state]:
+                return end
+        return None
+
+    def contains_all(self, text: str, start: int = 0) -> bool:
+        """Whether every term occurs in text at or after start."""
+
+        needed: Set[int] = set(range(len(self.terms)))
+        if self._empty:
+            needed.discard(self.terms.index(""))
+        if not needed:
+            return start <= len(text)
+        for _, term_id in self.occurrences(text, start):
+            needed.discard(term_id)
+            if not needed:
+                return True
+        return False
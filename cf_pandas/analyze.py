@@ -0,0 +1,396 @@
+"""Find regular expressions in vocabularies that are likely to be slow or redundant.
+
+Patterns are parsed into a small tree and checked for constructs known to make
+backtracking engines slow:
+
+* unbounded wildcards like ``.*`` at the start, which scan the whole value,
+* several unbounded wildcards in one sequence, which can backtrack polynomially,
+* quantifiers applied to groups that already contain unbounded quantifiers, which can backtrack exponentially,
+* stacked lookarounds that each scan the value, as ``Reg`` writes for every ``include`` term.
+
+Top-level alternatives are also checked for duplicates and for alternatives that can never
+change the result because another, plain-text alternative already matches everything they do.
+The cost is a relative estimate for comparing patterns, not a time.
+"""
+
+import json
+import pathlib
+import time
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+import pandas as pd
+import regex
+
+from .compiled import _split_alternatives
+
+_QUANTIFIER = regex.compile(r"(?:[*+?]|\{(?:\d+(?:,\d*)?|,\d+)\})[?+]?")
+
+# escapes that match a class of characters rather than one character
+_CLASS_ESCAPES = set("dDwWsShHvVpPX")
+_ANCHOR_ESCAPES = set("AbBGzZ")
+
+
+class _Node(object):
+    """Piece of a parsed pattern."""
+
+    __slots__ = ("kind", "text", "alternatives", "quantifier")
+
+    def __init__(self, kind: str, text: str = "", alternatives=None):
+        # literal, any, class, anchor, flags, backref, group, lookaround
+        self.kind = kind
+        self.text = text
+        self.alternatives: List[List["_Node"]] = alternatives or []
+        self.quantifier: Optional[str] = None
+
+    @property
+    def unbounded(self) -> bool:
+        """Whether the quantifier allows any number of repeats."""
+        q = self.quantifier
+        return q is not None and (
+            q[0] in "*+" or (q[0] == "{" and q.rstrip("?+").endswith(",}"))
+        )
+
+
+def _scan_class(pattern: str, i: int) -> int:
+    """Position after the character class starting at i."""
+
+    i += 1
+    if pattern[i : i + 1] == "^":
+        i += 1
+    if pattern[i : i + 1] == "]":
+        i += 1
+    while i < len(pattern) and pattern[i] != "]":
+        i += 2 if pattern[i] == "\\" else 1
+    if i >= len(pattern):
+        raise ValueError("unterminated character class")
+    return i + 1
+
+
+def _parse(pattern: str, i: int = 0, depth: int = 0) -> Tuple[List[List[_Node]], int]:
+    """Parse pattern from i into alternatives of nodes, up to the closing ")" of depth."""
+
+    alternatives: List[List[_Node]] = [[]]
+    while i < len(pattern):
+        char = pattern[i]
+        node = None
+        if char == "\\":
+            escaped = pattern[i + 1 : i + 2]
+            end = i + 2
+            if escaped and escaped in "pPN" and pattern[end : end + 1] == "{":
+                end = pattern.index("}", end) + 1
+            elif escaped == "L" and pattern[end : end + 1] == "<":
+                end = pattern.index(">", end) + 1
+            if escaped in _CLASS_ESCAPES:
+                node = _Node("class", pattern[i:end])
+            elif escaped in _ANCHOR_ESCAPES:
+                node = _Node("anchor", pattern[i:end])
+            elif escaped.isdigit():
+                node = _Node("backref", pattern[i:end])
+            else:
+                node = _Node("literal", escaped)
+            i = end
+        elif char == "[":
+            end = _scan_class(pattern, i)
+            node = _Node("class", pattern[i:end])
+            i = end
+        elif char == "(":
+            kind = "group"
+            start = i + 1
+            if pattern.startswith("(?#", i):
+                i = pattern.index(")", i) + 1
+                continue
+            if pattern.startswith(("(?=", "(?!"), i):
+                kind, start = "lookaround", i + 3
+            elif pattern.startswith(("(?<=", "(?<!"), i):
+                kind, start = "lookaround", i + 4
+            elif pattern.startswith("(?", i):
+                flags = regex.match(r"\(\?[a-zA-Z\-]*\)", pattern[i:])
+                if flags is not None:
+                    alternatives[-1].append(_Node("flags", flags.group()))
+                    i += flags.end()
+                    continue
+                named = regex.match(
+                    r"\(\?P?<\w+>|\(\?[a-zA-Z\-]*:|\(\?[>|]", pattern[i:]
+                )
+                if named is None:
+                    raise ValueError(f"unsupported group at position {i}")
+                start = i + named.end()
+            children, i = _parse(pattern, start, depth + 1)
+            node = _Node(kind, alternatives=children)
+        elif char == ")":
+            if depth == 0:
+                raise ValueError(f"unbalanced parenthesis at position {i}")
+            return alternatives, i + 1
+        elif char == "|":
+            alternatives.append([])
+            i += 1
+            continue
+        elif char == ".":
+            node = _Node("any", char)
+            i += 1
+        elif char in "^$":
+            node = _Node("anchor", char)
+            i += 1
+        else:
+            node = _Node("literal", char)
+            i += 1
+
+        quantifier = _QUANTIFIER.match(pattern, i)
+        if quantifier is not None:
+            node.quantifier = quantifier.group()
+            i = quantifier.end()
+        alternatives[-1].append(node)
+
+    if depth > 0:
+        raise ValueError("missing closing parenthesis")
+    return alternatives, i
+
+
+def _is_wildcard(node: _Node) -> bool:
+    """Unbounded repeat of a character class, like ``.*``."""
+    return node.unbounded and node.kind in ("any", "class")
+
+
+def _is_scan(node: _Node) -> bool:
+    """Unbounded repeat of any character or of a negated class, like ``.*`` or ``[^_]+``."""
+    return node.unbounded and (
+        node.kind == "any"
+        or (node.kind == "class" and node.text[:2] in ("[^", "\\D", "\\W", "\\S"))
+    )
+
+
+def _contains_unbounded(nodes: Iterable[_Node]) -> bool:
+    return any(
+        node.unbounded
+        or any(_contains_unbounded(alternative) for alternative in node.alternatives)
+        for node in nodes
+    )
+
+
+def _check_sequence(nodes: List[_Node], issues: List[str], top: bool = False) -> float:
+    """Add issues of a sequence of nodes and its groups, returning their cost."""
+
+    cost = 0.0
+
+    wildcards = [node for node in nodes if _is_wildcard(node)]
+    if len(wildcards) > 1:
+        issues.append(
+            f"{len(wildcards)} unbounded wildcards in sequence can backtrack up to O(n^{len(wildcards)})"
+        )
+        cost += 2 ** (len(wildcards) - 1)
+    elif len(wildcards) == 1:
+        cost += 1
+
+    if top:
+        first = next(
+            (node for node in nodes if node.kind not in ("anchor", "flags")), None
+        )
+        if first is not None and _is_scan(first):
+            issues.append("leading unbounded wildcard scans the whole value")
+
+    scanning = [
+        node
+        for node in nodes
+        if node.kind == "lookaround"
+        and any(_contains_unbounded(alternative) for alternative in node.alternatives)
+    ]
+    if len(scanning) > 1:
+        issues.append(f"{len(scanning)} stacked lookarounds each scan the value")
+    cost += len(scanning)
+
+    for node in nodes:
+        if node.kind not in ("group", "lookaround"):
+            continue
+        if node.unbounded and any(
+            _contains_unbounded(alternative) for alternative in node.alternatives
+        ):
+            issues.append("nested quantifiers can backtrack exponentially")
+            cost += 10
+        for alternative in node.alternatives:
+            cost += _check_sequence(alternative, issues)
+    return cost
+
+
+def _literal_head(nodes: List[_Node]) -> Tuple[str, bool, bool]:
+    """Literal text an alternative starts with.
+
+    Returns the text, whether the alternative is only that text, and whether it ends with "$".
+    """
+
+    head = ""
+    rest = [node for node in nodes if node.kind != "flags"]
+    if rest and rest[0].kind == "anchor" and rest[0].text == "^":
+        rest = rest[1:]
+    for n, node in enumerate(rest):
+        if node.kind != "literal" or node.quantifier is not None:
+            if n == len(rest) - 1 and node.kind == "anchor" and node.text == "$":
+                return head, True, True
+            return head, False, False
+        head += node.text
+    return head, True, False
+
+
+def _check_alternatives(pattern: str, issues: List[str]) -> None:
+    """Add issues for duplicate and subsumed top-level alternatives."""
+
+    alternatives = _split_alternatives(pattern)
+    ignore_case = regex.match(r"\(\?[a-zA-Z]*i[a-zA-Z]*\)", pattern) is not None
+
+    def normalize(alternative):
+        alternative = regex.sub(r"^\(\?[a-zA-Z]+\)", "", alternative)
+        return alternative.lower() if ignore_case else alternative
+
+    seen = set()
+    heads = []
+    for alternative in alternatives:
+        key = normalize(alternative)
+        if key in seen:
+            issues.append(f"duplicate alternative {alternative!r}")
+            continue
+        seen.add(key)
+        try:
+            heads.append((alternative, _literal_head(_parse(key)[0][0])))
+        except ValueError:
+            continue
+
+    # a plain-text alternative without "$" matches every value starting with its text
+    prefixes = [
+        (alternative, head)
+        for alternative, (head, only, end) in heads
+        if only and not end
+    ]
+    for alternative, (head, _, _) in heads:
+        for other, prefix in prefixes:
+            if other != alternative and head.startswith(prefix):
+                issues.append(
+                    f"alternative {alternative!r} is already matched by {other!r}"
+                )
+                break
+
+
+def analyze_pattern(pattern: str) -> Dict[str, Any]:
+    """Estimate the cost of a regular expression and list likely problems.
+
+    Parameters
+    ----------
+    pattern: str
+        Regular expression, as in a vocab or from ``Reg.pattern()``.
+
+    Returns
+    -------
+    dict
+        "cost", a relative estimate where a plain-text alternative is 0.1 and a single
+        ``.*`` is 1, and "issues", a list of descriptions.
+    """
+
+    issues: List[str] = []
+    try:
+        regex.compile(pattern)
+        alternatives, _ = _parse(pattern)
+    except (regex.error, ValueError) as e:
+        return {"cost": float("inf"), "issues": [f"invalid pattern: {e}"]}
+
+    cost = 0.0
+    for alternative in alternatives:
+        alternative_issues: List[str] = []
+        cost += 0.1 + _check_sequence(alternative, alternative_issues, top=True)
+        issues.extend(dict.fromkeys(alternative_issues))
+    _check_alternatives(pattern, issues)
+    return {"cost": round(cost, 3), "issues": issues}
+
+
+def _benchmark(pattern: str, sample: List[str], repeat: int = 3) -> float:
+    """Best time in seconds to match pattern against every value in sample."""
+
+    compiled = regex.compile(pattern)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for value in sample:
+            compiled.match(value)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def analyze_vocab(
+    vocab: Mapping[str, Mapping[str, str]], sample: Optional[Iterable[str]] = None
+) -> pd.DataFrame:
+    """Cost estimate and likely problems of every pattern in a vocabulary.
+
+    Parameters
+    ----------
+    vocab: Mapping
+        Nickname to attribute to regular expression, like ``Vocab.vocab``.
+    sample: Iterable, optional
+        Column names or attribute values to time every pattern against.
+
+    Returns
+    -------
+    DataFrame
+        Columns "nickname", "attr", "pattern", "cost" and "issues", plus "seconds" if sample
+        is input. Sorted with the most expensive pattern first, by measured time if available.
+    """
+
+    sample = None if sample is None else list(sample)
+    rows = []
+    for nickname, attrs in vocab.items():
+        for attr, pattern in attrs.items():
+            row = {"nickname": nickname, "attr": attr, "pattern": pattern}
+            row.update(analyze_pattern(pattern))
+            if sample is not None:
+                row["seconds"] = (
+                    _benchmark(pattern, sample)
+                    if row["cost"] != float("inf")
+                    else float("nan")
+                )
+            rows.append(row)
+
+    columns = ["nickname", "attr", "pattern", "cost", "issues"]
+    if sample is not None:
+        columns.append("seconds")
+    df = pd.DataFrame(rows, columns=columns)
+    by = "seconds" if sample is not None else "cost"
+    return df.sort_values(by, ascending=False, kind="stable").reset_index(drop=True)
+
+
+def lint_vocab(
+    path: Union[str, pathlib.PurePath], sample: Optional[Iterable[str]] = None
+) -> pd.DataFrame:
+    """Analyze the patterns of a saved vocabulary.
+
+    The file is read as saved, so duplicates that opening it as a ``Vocab`` would remove are
+    reported too.
+
+    Parameters
+    ----------
+    path: str, PurePath
+        Vocab saved with ``Vocab.save``, as JSON, compiled, or indexed.
+    sample: Iterable, optional
+        Column names or attribute values to time every pattern against.
+
+    Returns
+    -------
+    DataFrame
+        See ``analyze_vocab``.
+
+    Examples
+    --------
+    >>> cfp.lint_vocab("my_vocab.json").head()
+    """
+
+    from .vocab import _COMPILED_FORMAT, LazyVocab
+
+    path = pathlib.Path(path)
+    if path.suffix == ".sqlite":
+        return analyze_vocab(LazyVocab(path), sample)
+
+    with open(path.with_suffix(".json")) as f:
+        content = json.load(f)
+    if content.get("format") == _COMPILED_FORMAT:
+        content = {
+            nickname: {
+                attr: "|".join(alternatives) for attr, alternatives in attrs.items()
+            }
+            for nickname, attrs in content["entries"].items()
+        }
+    return analyze_vocab(content, sample)
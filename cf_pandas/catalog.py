@@ -0,0 +1,340 @@
+"""
+Catalog of which files have columns matching keys, made from file headers only.
+
+Headers of CSV, Parquet and Feather files are read in parallel and matched like ``df.cf`` matches
+columns. The result is an inverted index from each key to the files and columns that match it, so
+questions like "which files have temp, salt and a time axis" are answered by intersecting sets of
+files without opening any of them.
+"""
+
+import csv
+import json
+import os
+import pathlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
+
+from .accessor import _match_axis_coord_names
+from .compiled import CompiledCriteria
+from .metadata import _version
+from .standard_name_table import _write_atomic
+from .utils import match_criteria_key, set_up_criteria
+
+_CATALOG_FORMAT = "cf-pandas-catalog"
+_CATALOG_VERSION = 1
+
+_COMPRESSION_SUFFIXES = (".gz", ".bz2", ".xz", ".zip", ".zst")
+_CSV_SUFFIXES = (".csv", ".txt")
+_PARQUET_SUFFIXES = (".parquet", ".parq", ".pq")
+_FEATHER_SUFFIXES = (".feather", ".arrow", ".ipc")
+
+
+def _file_kind(path: str) -> str:
+    """Kind of file from its name, "csv", "parquet" or "feather"."""
+
+    suffixes = [suffix.lower() for suffix in pathlib.PurePath(path).suffixes]
+    if suffixes and suffixes[-1] in _COMPRESSION_SUFFIXES:
+        suffixes = suffixes[:-1]
+    suffix = suffixes[-1] if suffixes else ""
+    if suffix in _CSV_SUFFIXES:
+        return "csv"
+    if suffix in _PARQUET_SUFFIXES:
+        return "parquet"
+    if suffix in _FEATHER_SUFFIXES:
+        return "feather"
+    raise ValueError(f"Cannot tell the type of file {path!r} from its name.")
+
+
+def _scan(path: str, units_row: bool) -> Tuple[List[str], List[bool]]:
+    """Column names of a file, and whether each holds dates if the header says."""
+
+    from .readers import _arrow_is_datetime, _csv_header, _with_units
+
+    kind = _file_kind(path)
+    if kind == "csv":
+        names = None
+        if not path.lower().endswith(_COMPRESSION_SUFFIXES):
+            # much faster than starting the pandas parser for each file
+            with open(path, newline="", encoding="utf-8-sig") as f:
+                reader = csv.reader(f)
+                names = next(reader, [])
+                if units_row:
+                    units = next(reader, [])
+                    names = _with_units(names, units + [""] * (len(names) - len(units)))
+        # pandas renames empty and repeated names, so it has the last word on those
+        if names is None or "" in names or len(set(names)) < len(names):
+            names = _csv_header(path, units_row, {})
+        return names, [False] * len(names)
+
+    import pyarrow as pa
+
+    if kind == "parquet":
+        import pyarrow.parquet as pq
+
+        schema = pq.read_schema(path)
+    else:
+        import pyarrow.ipc as ipc
+
+        with pa.memory_map(path) as source:
+            schema = ipc.open_file(source).schema
+    is_datetime = _arrow_is_datetime(schema)
+    return list(schema.names), [is_datetime(name) for name in schema.names]
+
+
+def _resolve(
+    names: List[str], datetimes: List[bool], criteria: Optional[CompiledCriteria]
+) -> Dict[str, List[str]]:
+    """Keys that match any names, mapped to them in order."""
+
+    flags = dict(zip(names, datetimes))
+    keys = _match_axis_coord_names(names, flags.get)
+    strings = [name for name in names if isinstance(name, str)]
+    order = {name: i for i, name in enumerate(names)}
+    for key in criteria or ():
+        keys[key] = sorted(
+            match_criteria_key(strings, key, criteria, split=True),
+            key=order.__getitem__,
+        )
+    return {key: found for key, found in keys.items() if found}
+
+
+class Catalog(object):
+    """Inverted index from keys to the files and columns that match them.
+
+    Make one with ``Catalog.build`` and open a saved one with ``Catalog.open``.
+
+    Parameters
+    ----------
+    files : dict, optional
+        Path of each file mapped to its "mtime_ns" and "size" when it was scanned.
+    index : dict, optional
+        Each key mapped to the paths of files with matching columns, mapped to the columns.
+    fingerprint : str, optional
+        Fingerprint of the criteria used, or None if there were none.
+    version : str, optional
+        Version of cf-pandas used.
+
+    Examples
+    --------
+    >>> catalog = cfp.Catalog.build(paths, criteria=vocab, n_workers=8, savename="catalog.json")
+    >>> catalog.search("temp", "salt", "T")
+    ['data/station1.csv', 'data/station7.parquet']
+    >>> catalog["temp"]["data/station1.csv"]
+    ['sea_water_temperature (degree_C)']
+    """
+
+    def __init__(
+        self,
+        files: Optional[Dict[str, Dict[str, int]]] = None,
+        index: Optional[Dict[str, Dict[str, List[str]]]] = None,
+        fingerprint: Optional[str] = None,
+        version: Optional[str] = None,
+    ):
+        self.files: Dict[str, Dict[str, int]] = files or {}
+        self.index: Dict[str, Dict[str, List[str]]] = index or {}
+        self.fingerprint = fingerprint
+        self.version = version or _version()
+        #: Files that could not be scanned by the last build, with the error. They are not in the catalog.
+        self.errors: Dict[str, str] = {}
+        # sets of files by key, made when first searched
+        self._sets: Dict[str, FrozenSet[str]] = {}
+
+    def __repr__(self):
+        """Representation."""
+        return f"<Catalog files={len(self.files)} keys={len(self.index)}>"
+
+    def __len__(self):
+        """Number of files."""
+        return len(self.files)
+
+    def __contains__(self, key) -> bool:
+        """Whether any file has columns matching key."""
+        return key in self.index
+
+    def __getitem__(self, key: str) -> Dict[str, List[str]]:
+        """Paths of files with columns matching key, mapped to the columns. Empty if there are none."""
+        return self.index.get(key, {})
+
+    def keys(self) -> List[str]:
+        """Keys that match columns of any file."""
+        return list(self.index)
+
+    def search(self, *keys: str) -> List[str]:
+        """Files that have columns matching all keys.
+
+        Parameters
+        ----------
+        keys : str
+            Axes, coordinates, or keys in the criteria used to build the catalog.
+
+        Returns
+        -------
+        list
+            Sorted paths of files. All files if no keys are given.
+        """
+
+        if len(keys) == 0:
+            return sorted(self.files)
+        sets = []
+        for key in keys:
+            if key not in self._sets:
+                self._sets[key] = frozenset(self.index.get(key, ()))
+            sets.append(self._sets[key])
+        # intersect starting with the smallest set
+        sets.sort(key=len)
+        return sorted(sets[0].intersection(*sets[1:]))
+
+    @classmethod
+    def build(
+        cls,
+        paths: Union[str, os.PathLike, Iterable[Union[str, os.PathLike]]],
+        criteria: Optional[Union[dict, Iterable]] = None,
+        n_workers: Optional[int] = None,
+        savename: Optional[Union[str, os.PathLike]] = None,
+        units_row: bool = False,
+    ) -> "Catalog":
+        """Scan the headers of files and match them to keys.
+
+        Parameters
+        ----------
+        paths : str, Path, Iterable
+            CSV, Parquet, or Feather files, told apart by their names.
+        criteria : dict, optional
+            Criteria to use to map from variable to attributes describing the variable. If user has defined custom_criteria, this will be used by default. Without criteria, only axes and coordinates are indexed.
+        n_workers : int, optional
+            Number of threads reading headers. Default is that of ``concurrent.futures.ThreadPoolExecutor``.
+        savename : str, Path, optional
+            Catalog file to update and save. If it exists and was built with the same criteria and
+            version of cf-pandas, only files whose modification time or size changed are scanned again.
+        units_row : bool
+            If True, CSV files have a row of units under the header, see ``cfp.read_csv``.
+
+        Returns
+        -------
+        Catalog
+            Catalog of the files that could be scanned. Others are in its ``errors``.
+
+        Notes
+        -----
+        Files with the same header are matched only once.
+        """
+
+        try:
+            custom_criteria: Optional[CompiledCriteria] = set_up_criteria(criteria)
+        except ValueError:
+            custom_criteria = None
+        fingerprint = None if custom_criteria is None else custom_criteria.fingerprint
+
+        if isinstance(paths, (str, os.PathLike)):
+            paths = [paths]
+        paths = list(dict.fromkeys(str(path) for path in paths))
+
+        # keys of files scanned before, if their scan is still valid
+        previous: Dict[str, Dict[str, List[str]]] = {}
+        previous_files: Dict[str, Dict[str, int]] = {}
+        if savename is not None and os.path.exists(savename):
+            old = cls.open(savename)
+            if old.fingerprint == fingerprint and old.version == _version():
+                previous_files = old.files
+                for key, found in old.index.items():
+                    for path, cols in found.items():
+                        previous.setdefault(path, {})[key] = cols
+
+        files: Dict[str, Dict[str, int]] = {}
+        file_keys: Dict[str, Dict[str, List[str]]] = {}
+        errors: Dict[str, str] = {}
+        to_scan = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError as e:
+                errors[path] = str(e)
+                continue
+            files[path] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+            if previous_files.get(path) == files[path]:
+                file_keys[path] = previous.get(path, {})
+            else:
+                to_scan.append(path)
+
+        def scan(path: str) -> Any:
+            try:
+                return _scan(path, units_row)
+            except Exception as e:
+                return e
+
+        # reading headers waits on the disk, so threads overlap it; matching runs here,
+        # once for each distinct header
+        resolved: Dict[Tuple[Tuple[str, ...], Tuple[bool, ...]], Dict] = {}
+        with ThreadPoolExecutor(n_workers) as pool:
+            for path, result in zip(to_scan, pool.map(scan, to_scan)):
+                if isinstance(result, Exception):
+                    errors[path] = f"{type(result).__name__}: {result}"
+                    del files[path]
+                    continue
+                header = (tuple(result[0]), tuple(result[1]))
+                if header not in resolved:
+                    resolved[header] = _resolve(*result, custom_criteria)
+                file_keys[path] = resolved[header]
+
+        index: Dict[str, Dict[str, List[str]]] = {}
+        for path in files:
+            for key, cols in file_keys[path].items():
+                index.setdefault(key, {})[path] = cols
+
+        catalog = cls(files, index, fingerprint)
+        catalog.errors = errors
+        if savename is not None:
+            catalog.save(savename)
+        return catalog
+
+    @classmethod
+    def open(cls, openname: Union[str, os.PathLike]) -> "Catalog":
+        """Open a catalog saved with ``save``.
+
+        Parameters
+        ----------
+        openname : str, Path
+            Catalog file.
+
+        Returns
+        -------
+        Catalog
+        """
+
+        with open(openname) as f:
+            content = json.load(f)
+        if content.get("format") != _CATALOG_FORMAT:
+            raise ValueError(f"{str(openname)!r} is not a cf-pandas catalog.")
+        if content.get("format_version") != _CATALOG_VERSION:
+            raise ValueError(
+                f"Catalog format version {content.get('format_version')!r} is not supported."
+            )
+        return cls(
+            content["files"],
+            content["index"],
+            content["fingerprint"],
+            content["version"],
+        )
+
+    def save(self, savename: Union[str, os.PathLike]):
+        """Save catalog to a JSON file.
+
+        The file is replaced at once, so a catalog being read is never half written.
+
+        Parameters
+        ----------
+        savename : str, Path
+            Catalog file.
+        """
+
+        content = {
+            "format": _CATALOG_FORMAT,
+            "format_version": _CATALOG_VERSION,
+            "version": self.version,
+            "fingerprint": self.fingerprint,
+            "files": self.files,
+            "index": self.index,
+        }
+        _write_atomic(
+            pathlib.Path(savename), json.dumps(content, separators=(",", ":")).encode()
+        )
@@ -0,0 +1,341 @@
+"""Regular expressions from vocabularies prepared once for fast matching."""
+
+import hashlib
+import json
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import regex
+
+# alternative that is plain text, optionally anchored: "^" is implied by matching
+# at the start and "$" makes it an exact match
+_LITERAL = regex.compile(
+    r"^\^?((?:[A-Za-z0-9_ ,:;/%'\"@&=<>!~-]|\\[^A-Za-z0-9])*)(\$?)$"
+)
+
+# inline flags like "(?i)" apply to the whole expression, not just their alternative
+_GLOBAL_FLAGS = regex.compile(r"\(\?[a-zA-Z]+\)")
+
+_ESCAPE = regex.compile(r"\\([^A-Za-z0-9])")
+
+
+def _mapping_fingerprint(criteria: Mapping) -> str:
+    """sha256 of criteria mapping key to attribute to regular expression."""
+
+    content = json.dumps(
+        {key: dict(criteria[key]) for key in criteria},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def _split_alternatives(pattern: str, keep_empty: bool = False) -> List[str]:
+    """Split regular expression into its top-level alternatives.
+
+    Pipes that are escaped, inside a group, or inside a character class are not split on.
+
+    Parameters
+    ----------
+    pattern: str
+        Regular expression, for example "temp$|(sea|lake)_water".
+    keep_empty: bool
+        Empty alternatives, which match anything, are dropped unless this is True.
+
+    Returns
+    -------
+    list
+        Alternatives, for example ["temp$", "(sea|lake)_water"].
+    """
+
+    alternatives = []
+    depth = 0
+    start = 0
+    i = 0
+    in_class = False
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            i += 2
+            continue
+        if in_class:
+            if char == "]":
+                in_class = False
+        elif char == "[":
+            in_class = True
+            # "]" right after "[" or "[^" is a literal
+            if pattern[i + 1 : i + 2] == "^":
+                i += 1
+            if pattern[i + 1 : i + 2] == "]":
+                i += 1
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            alternatives.append(pattern[start:i])
+            start = i + 1
+        i += 1
+    alternatives.append(pattern[start:])
+    if keep_empty:
+        return alternatives
+    return [alternative for alternative in alternatives if alternative != ""]
+
+
+class CompiledPattern(object):
+    """Regular expression split into exact literals, literal prefixes, and the rest.
+
+    ``match(value)`` gives the same result as ``regex.match(pattern, value)``, but
+    alternatives that are plain text are checked with set lookups and ``str.startswith``
+    instead of the regular expression engine.
+
+    Parameters
+    ----------
+    pattern: str
+        Regular expression.
+    exact, prefixes, rest: optional
+        Parts of pattern from ``CompiledPattern.parts``, when already known. Otherwise pattern is analyzed.
+    """
+
+    __slots__ = ("pattern", "exact", "prefixes", "rest", "_regex")
+
+    def __init__(
+        self,
+        pattern: str,
+        exact: Optional[Iterable[str]] = None,
+        prefixes: Optional[Iterable[str]] = None,
+        rest: Optional[str] = None,
+    ):
+        self.pattern = pattern
+        if exact is None or prefixes is None:
+            exact, prefixes, rest = self.parts(pattern)
+        self.exact: FrozenSet[str] = frozenset(exact)
+        self.prefixes: Tuple[str, ...] = tuple(prefixes)
+        self.rest: Optional[str] = rest
+        try:
+            self._regex = None if rest is None else regex.compile(rest)
+        except regex.error as e:
+            raise ValueError(f"Invalid regular expression {pattern!r}: {e}") from e
+
+    @staticmethod
+    def parts(pattern: str) -> Tuple[FrozenSet[str], Tuple[str, ...], Optional[str]]:
+        """Split pattern into exact literals, literal prefixes, and remaining expression.
+
+        Parameters
+        ----------
+        pattern: str
+            Regular expression.
+
+        Returns
+        -------
+        tuple
+            Strings matched exactly, strings matched at the start, and a regular expression of the other alternatives or None.
+        """
+
+        alternatives = _split_alternatives(pattern, keep_empty=True)
+        if "" in alternatives or _GLOBAL_FLAGS.search(pattern):
+            return frozenset(), (), pattern
+
+        exact, prefixes, rest = [], [], []
+        for alternative in alternatives:
+            literal = _LITERAL.match(alternative)
+            if literal is None:
+                rest.append(alternative)
+                continue
+            text = _ESCAPE.sub(r"\1", literal.group(1))
+            if literal.group(2):
+                exact.append(text)
+            else:
+                prefixes.append(text)
+        return frozenset(exact), tuple(prefixes), "|".join(rest) if rest else None
+
+    def match(self, value: str) -> bool:
+        """Whether pattern matches at the start of value.
+
+        Parameters
+        ----------
+        value: str
+            String to check.
+
+        Returns
+        -------
+        bool
+            Same as ``regex.match(pattern, value) is not None``.
+        """
+
+        if value in self.exact:
+            return True
+        # "$" also matches before a final newline
+        if value.endswith("\n") and value[:-1] in self.exact:
+            return True
+        if self.prefixes and value.startswith(self.prefixes):
+            return True
+        return self._regex is not None and self._regex.match(value) is not None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Parts of the pattern for saving."""
+        return {
+            "exact": sorted(self.exact),
+            "prefixes": list(self.prefixes),
+            "rest": self.rest,
+        }
+
+    @classmethod
+    def from_dict(cls, pattern: str, parts: Dict[str, Any]) -> "CompiledPattern":
+        """Compiled pattern from saved parts, skipping the analysis of pattern."""
+        return cls(pattern, parts["exact"], parts["prefixes"], parts["rest"])
+
+
+# pattern -> compiled pattern, shared by all matching in the process
+_PATTERNS: Dict[str, CompiledPattern] = {}
+
+# start over rather than grow without bound with many one-off patterns
+_MAX_PATTERNS = 10000
+
+
+def _remember(compiled: CompiledPattern) -> CompiledPattern:
+    if len(_PATTERNS) >= _MAX_PATTERNS:
+        _PATTERNS.clear()
+    _PATTERNS[compiled.pattern] = compiled
+    return compiled
+
+
+def compile_pattern(pattern: str) -> CompiledPattern:
+    """Compiled version of pattern, made once per process.
+
+    Parameters
+    ----------
+    pattern: str
+        Regular expression.
+
+    Returns
+    -------
+    CompiledPattern
+        Matcher for pattern.
+    """
+
+    compiled = _PATTERNS.get(pattern)
+    if compiled is None:
+        compiled = _remember(CompiledPattern(pattern))
+    return compiled
+
+
+class CompiledCriteria(Mapping):
+    """Criteria prepared for matching once and not changed after.
+
+    Behaves like a ``ChainMap`` of the input criteria: for a key in several of them, the
+    first one wins. The patterns of a key are compiled the first time the key is matched and
+    kept, so every match with the same ``CompiledCriteria`` reuses them.
+
+    Parameters
+    ----------
+    criteria: Mapping, Vocab, or a tuple, list or set of them
+        Criteria mapping key to attribute to regular expression.
+    copy: bool
+        If True, copy criteria that are dictionaries so that later changes to them do not show.
+        Other mappings, like ``LazyVocab``, are read-only and never copied.
+    """
+
+    def __init__(self, criteria: Any = (), copy: bool = True):
+        if not isinstance(criteria, (tuple, list, set)):
+            criteria = [criteria]
+        maps: List[Mapping] = []
+        for crit in criteria:
+            if isinstance(crit, CompiledCriteria):
+                maps.extend(crit._maps)
+                continue
+            # Vocab objects hold their criteria in .vocab
+            crit = getattr(crit, "vocab", crit)
+            if copy and isinstance(crit, dict):
+                crit = MappingProxyType(
+                    {key: MappingProxyType(dict(attrs)) for key, attrs in crit.items()}
+                )
+            maps.append(crit)
+        self._maps = tuple(maps)
+        # key -> (attribute, compiled pattern) pairs, for keys matched so far
+        self._patterns: Dict[str, Tuple[Tuple[str, CompiledPattern], ...]] = {}
+        self._fingerprint: Optional[str] = None
+
+    def __repr__(self):
+        """Representation."""
+        return (
+            f"<CompiledCriteria maps={len(self._maps)} compiled={len(self._patterns)}>"
+        )
+
+    def __getitem__(self, key: str) -> Mapping[str, str]:
+        """Attributes and regular expressions of key."""
+
+        for crit in self._maps:
+            if key in crit:
+                return crit[key]
+        raise KeyError(key)
+
+    def __contains__(self, key) -> bool:
+        """Whether any criteria have key."""
+        return any(key in crit for crit in self._maps)
+
+    def __iter__(self):
+        """Keys, in the order of ``ChainMap``."""
+
+        keys: Dict[str, None] = {}
+        for crit in reversed(self._maps):
+            keys.update(dict.fromkeys(crit))
+        return iter(keys)
+
+    def __len__(self):
+        """Number of keys."""
+        return len(set().union(*self._maps))
+
+    def __bool__(self):
+        """Whether any criteria were input, even if they are empty."""
+        return len(self._maps) > 0
+
+    def __deepcopy__(self, memo):
+        """Immutable, so copies are the same object."""
+        return self
+
+    def patterns(self, key: str) -> Tuple[Tuple[str, CompiledPattern], ...]:
+        """Compiled patterns of key.
+
+        Parameters
+        ----------
+        key: str
+            Key in criteria.
+
+        Returns
+        -------
+        tuple
+            (attribute, CompiledPattern) pairs.
+        """
+
+        patterns = self._patterns.get(key)
+        if patterns is None:
+            patterns = tuple(
+                (attr, compile_pattern(pattern)) for attr, pattern in self[key].items()
+            )
+            self._patterns[key] = patterns
+        return patterns
+
+    @property
+    def fingerprint(self) -> str:
+        """sha256 of the resolved criteria, the same for criteria with the same content.
+
+        Criteria like ``LazyVocab`` that have their own ``fingerprint`` are not read for it.
+        """
+
+        if self._fingerprint is None:
+            own = [getattr(crit, "fingerprint", None) for crit in self._maps]
+            if len(own) == 1 and own[0] is not None:
+                self._fingerprint = own[0]
+            elif any(fingerprint is not None for fingerprint in own):
+                fingerprints = [
+                    fingerprint or _mapping_fingerprint(crit)
+                    for fingerprint, crit in zip(own, self._maps)
+                ]
+                self._fingerprint = hashlib.sha256(
+                    json.dumps(fingerprints).encode()
+                ).hexdigest()
+            else:
+                self._fingerprint = _mapping_fingerprint(self)
+        return self._fingerprint
@@ -5,7 +5,8 @@ Copyright (c) 2017 MetPy Developers.
 """
 
 import re
-from typing import Mapping, MutableMapping, Tuple
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Mapping, MutableMapping, Set, Tuple
 
 coordinate_criteria: MutableMapping[str, MutableMapping[str, Tuple]] = {
     "latitude": {
@@ -122,3 +123,43 @@ guess_regex = {
     "longitude": re.compile("x?(nav_lon|(?=.*lon)|glam)[a-z0-9]*"),
 }
 guess_regex["T"] = guess_regex["time"]
+
+
+def _index_coordinate_criteria(
+    criteria: Mapping[str, Mapping[str, Tuple]]
+) -> Mapping[str, FrozenSet[str]]:
+    """Reverse coordinate criteria into a mapping of expected value to keys.
+
+    Parameters
+    ----------
+    criteria : dict
+        Criteria in the form of ``coordinate_criteria``.
+
+    Returns
+    -------
+    Mapping
+        Read-only mapping from each expected value to the axis and coordinate keys it identifies.
+    """
+
+    index: Dict[str, Set[str]] = {}
+    for key, attrs in criteria.items():
+        for expected in attrs.values():
+            for value in expected:
+                index.setdefault(value, set()).add(key)
+    return MappingProxyType({value: frozenset(keys) for value, keys in index.items()})
+
+
+# lookup from a header token to all keys in coordinate_criteria that it satisfies
+coordinate_criteria_index = _index_coordinate_criteria(coordinate_criteria)
+
+# all guess_regex patterns as one program; each pattern sits in an optional lookahead
+# at the start of the string and is tagged with a named group, so a single match
+# reports every key whose pattern would have matched on its own.
+# "T" shares its pattern with "time".
+guess_regex_tagged = re.compile(
+    "".join(
+        f"(?:(?=(?P<{key}>{pattern.pattern})))?"
+        for key, pattern in guess_regex.items()
+        if key != "T"
+    )
+)
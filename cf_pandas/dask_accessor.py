@@ -0,0 +1,119 @@
+"""
+Accessor for dask DataFrames.
+
+Keys are matched against the columns, index name and dtypes of ``_meta``, the empty pandas
+DataFrame that describes every partition, so nothing is computed and matching is done once for the
+whole DataFrame instead of once per partition.
+
+It is registered by importing this module, or when cf-pandas is imported after ``dask.dataframe``:
+
+>>> import cf_pandas.dask_accessor
+"""
+
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+import dask.dataframe as dd
+
+from .accessor import CFAccessor
+from .metadata import criteria_fingerprint
+
+try:
+    # delete the accessor to avoid warning
+    del dd.DataFrame.cf
+except AttributeError:
+    pass
+
+
+@dd.extensions.register_dataframe_accessor("cf")
+class DaskCFAccessor(object):
+    """Dask DataFrame accessor with the selection of the cf-pandas DataFrame accessor.
+
+    Examples
+    --------
+    >>> ddf = dd.read_parquet("data/*.parquet")
+    >>> with cfp.set_options(custom_criteria=vocab):
+    ...     ddf.cf["temp"].mean().compute()
+    """
+
+    def __init__(self, dask_obj):
+        self._obj = dask_obj
+        # names for (key, criteria fingerprint), since options can change between calls
+        self._names: Dict[Tuple[str, Optional[str]], List[str]] = {}
+
+    @property
+    def _meta(self) -> CFAccessor:
+        """The pandas accessor of the metadata."""
+        return self._obj._meta.cf
+
+    def __getitem__(self, key: str) -> Union[dd.Series, dd.DataFrame, dd.Index]:
+        """Select columns or index by alias, lazily.
+
+        Parameters
+        ----------
+        key: str
+            key in custom criteria/vocabulary to match with columns of DataFrame, or in axes or coordinates.
+
+        Returns
+        -------
+        Series, DataFrame, Index
+            Dask Series for one matching column, the index if it matches, or a dask DataFrame
+            for several matching columns.
+        """
+
+        memo = (key, criteria_fingerprint())
+        if memo not in self._names:
+            self._names[memo] = self._meta._key_names(key)
+        col_names = self._names[memo]
+
+        if len(col_names) == 1 and col_names[0] in self._obj.columns:
+            return self._obj[col_names[0]]
+        elif len(col_names) == 1 and col_names[0] == self._obj.index.name:
+            return self._obj.index
+        elif len(col_names) > 1:
+            return self._obj[col_names]
+        else:
+            raise ValueError("Some error has occurred.")
+
+    def __contains__(self, item: str) -> bool:
+        """
+        Check whether item is a valid key for indexing with .cf
+        """
+        return item in self.keys()
+
+    def keys(self) -> Set[str]:
+        """Valid keys for ``.cf[]``, see ``CFAccessor.keys``."""
+        return self._meta.keys()
+
+    @property
+    def axes(self) -> Dict[str, List[str]]:
+        """Axis names mapped to names of columns or index, see ``CFAccessor.axes``."""
+        return self._meta.axes
+
+    @property
+    def coordinates(self) -> Dict[str, List[str]]:
+        """Coordinate names mapped to names of columns or index, see ``CFAccessor.coordinates``."""
+        return self._meta.coordinates
+
+    @property
+    def custom_keys(self) -> Dict[str, List[str]]:
+        """Criteria keys mapped to column names, see ``CFAccessor.custom_keys``."""
+        return self._meta.custom_keys
+
+    @property
+    def axes_cols(self) -> List[str]:
+        """Column names that represent axes."""
+        return self._meta.axes_cols
+
+    @property
+    def coordinates_cols(self) -> List[str]:
+        """Column names that represent coordinates."""
+        return self._meta.coordinates_cols
+
+    @property
+    def standard_names(self) -> Dict[str, List[str]]:
+        """Standard names mapped to column names, see ``CFAccessor.standard_names``."""
+        return self._meta.standard_names
+
+    def check_units(self) -> Dict[str, Dict[str, str]]:
+        """Columns whose units disagree with their standard names, see ``CFAccessor.check_units``."""
+        return self._meta.check_units()
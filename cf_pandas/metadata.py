@@ -0,0 +1,143 @@
+"""
+Resolved mappings stored with data, so they are not matched again.
+
+``df.cf.to_arrow`` and ``df.cf.to_parquet`` store which columns match each key, with the fingerprint
+of the criteria used, in ``df.attrs`` and in the Arrow schema metadata under "cf_pandas". The readers
+and the accessor use a stored mapping instead of matching when it was made with the same criteria and
+version of cf-pandas.
+"""
+
+import functools
+import json
+from importlib.metadata import PackageNotFoundError, version
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence
+
+#: Key of the mapping in ``DataFrame.attrs`` and in Arrow schema metadata.
+METADATA_KEY = "cf_pandas"
+
+
+@functools.lru_cache(maxsize=None)
+def _version() -> str:
+    """Version of cf-pandas, since matching may change between versions."""
+
+    try:
+        return version("cf-pandas")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def criteria_fingerprint(criteria=None) -> Optional[str]:
+    """Fingerprint of criteria, or of the criteria in options if None, or None if there are none."""
+
+    from .utils import set_up_criteria
+
+    try:
+        return set_up_criteria(criteria).fingerprint
+    except ValueError:
+        return None
+
+
+def make_metadata(
+    names: Sequence[Hashable],
+    keys: Dict[str, List[str]],
+    columns: Optional[Dict[str, Dict[str, str]]] = None,
+    criteria=None,
+) -> Dict[str, Any]:
+    """Metadata to store a resolved mapping.
+
+    Parameters
+    ----------
+    names : Sequence
+        Column and index names the mapping was resolved for.
+    keys : dict
+        Keys mapped to their matching names, including keys that match nothing.
+    columns : dict, optional
+        Attributes of columns, like "standard_name", "units" and "axis".
+    criteria : dict, optional
+        Criteria the mapping was resolved with, otherwise the criteria in options.
+
+    Returns
+    -------
+    dict
+        "version", "fingerprint", "names", "keys" and "columns".
+    """
+
+    return {
+        "version": _version(),
+        "fingerprint": criteria_fingerprint(criteria),
+        "names": [name if isinstance(name, str) else None for name in names],
+        "keys": {key: list(found) for key, found in keys.items()},
+        "columns": columns or {},
+    }
+
+
+def stored_keys(metadata: Any, criteria=None) -> Optional[Dict[str, List[str]]]:
+    """Keys mapped to names from metadata, if it was made with the same criteria and version.
+
+    Parameters
+    ----------
+    metadata : dict, str, bytes, None
+        Output of ``make_metadata``, or it as JSON.
+    criteria : dict, optional
+        Criteria that would be used to match, otherwise the criteria in options.
+
+    Returns
+    -------
+    dict, None
+        The stored keys, or None if there is no usable mapping.
+    """
+
+    if metadata is None:
+        return None
+    if isinstance(metadata, (str, bytes)):
+        try:
+            metadata = json.loads(metadata)
+        except ValueError:
+            return None
+    if not isinstance(metadata, dict) or metadata.get("version") != _version():
+        return None
+    if metadata.get("fingerprint") != criteria_fingerprint(criteria):
+        return None
+    return metadata.get("keys")
+
+
+def subset(
+    metadata: Dict[str, Any],
+    names: Sequence[Hashable],
+    independent: Callable[[str], bool],
+) -> Dict[str, Any]:
+    """Metadata for part of the names.
+
+    Parameters
+    ----------
+    metadata : dict
+        Output of ``make_metadata``.
+    names : Sequence
+        Column and index names that are left.
+    independent : Callable
+        Returns whether names are matched to a key one by one, so the matches among fewer names
+        are those that are left. Other keys are kept only if all their names are left.
+
+    Returns
+    -------
+    dict
+        Metadata for names.
+    """
+
+    present = set(names)
+    keys = {}
+    for key, found in metadata["keys"].items():
+        if independent(key):
+            keys[key] = [name for name in found if name in present]
+        elif all(name in present for name in found):
+            keys[key] = found
+    return {
+        **metadata,
+        "names": [name if isinstance(name, str) else None for name in names],
+        "keys": keys,
+        "columns": {
+            name: attrs
+            for name, attrs in metadata["columns"].items()
+            if name in present
+        },
+    }
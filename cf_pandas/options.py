@@ -1,25 +1,115 @@
 """
 Copying options from cf-xarray options.py
+
+Options are kept in a ``contextvars.ContextVar`` on top of process-wide defaults, so
+``set_options`` only affects the current thread or asyncio task and reading an option
+needs no lock.
 """
 
-import copy
-from typing import Any, MutableMapping
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Mapping
 
-import cf_pandas as cfp
+from .compiled import CompiledCriteria
 
-OPTIONS: MutableMapping[str, Any] = {
+# process-wide values, replaced as a whole by set_default_options
+_DEFAULTS: Dict[str, Any] = {
     "custom_criteria": [],
+    "cache_dir": None,
+    "standard_name_version": None,
+    "resolution_cache": False,
+    "resolution_cache_size": 10000,
     # "warn_on_missing_variables": True,
 }
 
+# options set with set_options in the current context, on top of _DEFAULTS
+_CONTEXT: ContextVar[Dict[str, Any]] = ContextVar("cf_pandas_options", default={})
+
+
+class _Options(Mapping):
+    """Read-only view of the options in effect in the current context."""
+
+    def __getitem__(self, key: str) -> Any:
+        overrides = _CONTEXT.get()
+        if key in overrides:
+            return overrides[key]
+        return _DEFAULTS[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_DEFAULTS)
+
+    def __len__(self) -> int:
+        return len(_DEFAULTS)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+OPTIONS: Mapping[str, Any] = _Options()
+
+
+def _prepare(options_dict: Mapping[str, Any]) -> Dict[str, Any]:
+    """Check option names and freeze criteria."""
+
+    options_dict = dict(options_dict)
+    for k in options_dict:
+        if k not in _DEFAULTS:
+            raise ValueError(
+                f"argument name {k!r} is not in the set of valid options {set(_DEFAULTS)!r}"
+            )
+    # criteria are frozen once here and then shared, not copied, by everything that matches
+    if "custom_criteria" in options_dict and not isinstance(
+        options_dict["custom_criteria"], CompiledCriteria
+    ):
+        options_dict["custom_criteria"] = CompiledCriteria(
+            options_dict["custom_criteria"]
+        )
+    return options_dict
+
+
+def set_default_options(**kwargs):
+    """Set options for all threads and tasks.
+
+    These are used wherever ``set_options`` has not set the option in the current context.
+
+    Parameters
+    ----------
+    kwargs
+        Options as for ``set_options``.
+
+    Examples
+    --------
+    >>> cfp.set_default_options(custom_criteria=my_custom_criteria)
+    """
+
+    global _DEFAULTS
+    # replace instead of update, so readers in other threads see either version whole
+    _DEFAULTS = {**_DEFAULTS, **_prepare(kwargs)}
+
 
 class set_options:
     """Set options for cf-xarray in a controlled context.
+
+    Options set here apply to the current thread or asyncio task only, on top of the defaults
+    from ``set_default_options``. New threads start from the defaults, and asyncio tasks
+    start from the options of the code that created them.
+
     Parameters
     ----------
     custom_criteria : dict
         Translate from axis, coord, or custom name to
-        variable name optionally using ``custom_criteria``. Default: [].
+        variable name optionally using ``custom_criteria``. Default: []. Stored as a
+        ``CompiledCriteria``, copied once when set.
+    cache_dir : str
+        Directory for files cached by cf-pandas, like downloaded CF standard name tables.
+        Default: None, to use environment variable ``CF_PANDAS_CACHE_DIR`` or the user cache directory.
+    standard_name_version : int
+        Version of the CF standard name table to use. Default: None, for the table bundled with cf-pandas.
+    resolution_cache : bool, str
+        Whether to keep which names match which keys in a database on disk shared by processes,
+        used by ``df.cf`` and ``match_criteria_key``. True to use "resolutions.sqlite" in ``cache_dir``,
+        or the path of the database. Default: False.
+    resolution_cache_size : int
+        Number of resolutions to keep in the resolution cache, removing the least recently used. Default: 10000.
     warn_on_missing_variables : bool
         Whether to raise a warning when variables referred to in attributes
         are not present in the object.
@@ -33,32 +123,17 @@ class set_options:
     >>> with cf_xarray.set_options(custom_criteria=my_custom_criteria):
     ...     xr.testing.assert_identical(ds["elev"], ds.cf["ssh"])
     ...
-    Or to set global options:
+    Or to set options for the rest of the current thread or task:
     >>> cf_xarray.set_options(custom_criteria=my_custom_criteria)
     >>> xr.testing.assert_identical(ds["elev"], ds.cf["ssh"])
+    Use ``set_default_options`` to set options for every thread.
     """
 
     def __init__(self, **kwargs):
-        self.old = {}
-        for k, v in kwargs.items():
-            if k not in OPTIONS:
-                raise ValueError(
-                    f"argument name {k!r} is not in the set of valid options {set(OPTIONS)!r}"
-                )
-            self.old[k] = OPTIONS[k]
-        self._apply_update(kwargs)
-
-    def _apply_update(self, options_dict):
-        options_dict = copy.deepcopy(options_dict)
-        for k, v in options_dict.items():
-            if k == "custom_criteria":
-                options_dict["custom_criteria"] = cfp.always_iterable(
-                    options_dict["custom_criteria"], allowed=(tuple, list, set)
-                )
-        OPTIONS.update(options_dict)
+        self._token = _CONTEXT.set({**_CONTEXT.get(), **_prepare(kwargs)})
 
     def __enter__(self):
         return
 
     def __exit__(self, type, value, traceback):
-        self._apply_update(self.old)
+        _CONTEXT.reset(self._token)
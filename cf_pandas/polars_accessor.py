@@ -0,0 +1,190 @@
+"""
+"cf" namespace for polars DataFrames and LazyFrames.
+
+Keys are matched against the schema, the column names and dtypes, with the same matching as the
+pandas accessor. On a LazyFrame, ``lf.cf[key]`` is a ``select`` of the matching columns, so polars can
+push the projection down into the scan and read only those columns.
+
+It is registered by importing this module, or when cf-pandas is imported after polars:
+
+>>> import cf_pandas.polars_accessor
+"""
+
+import itertools
+from abc import ABC, abstractmethod
+from typing import Dict, List, Set
+
+import polars as pl
+
+from .accessor import _AXIS_NAMES, _COORD_NAMES, _match_axis_coord_names
+from .utils import match_criteria_key, set_up_criteria
+
+
+class _PolarsCFNamespace(ABC):
+    """Matching on a polars schema, shared by the DataFrame and LazyFrame namespaces."""
+
+    def __init__(self, polars_obj):
+        self._obj = polars_obj
+
+    @abstractmethod
+    def _schema(self) -> pl.Schema:
+        """Schema of the object."""
+
+    def _axis_coords(self) -> Dict[str, List[str]]:
+        """All axis and coordinate keys mapped to matching column names."""
+
+        schema = self._schema()
+
+        def is_datetime(name: str) -> bool:
+            return isinstance(schema[name], (pl.Datetime, pl.Date, pl.Duration))
+
+        return _match_axis_coord_names(schema.names(), is_datetime)
+
+    def _key_names(self, key: str) -> List[str]:
+        """Names of columns that key selects, in schema order."""
+
+        names = self._schema().names()
+        # return the key if it is already a name and doesn't need to be interpreted
+        if key in names:
+            return [key]
+        if key in _AXIS_NAMES + _COORD_NAMES:
+            return self._axis_coords()[key]
+        matched = set(match_criteria_key(names, key, split=True))
+        return [name for name in names if name in matched]
+
+    def __contains__(self, item: str) -> bool:
+        """
+        Check whether item is a valid key for indexing with .cf
+        """
+        return item in self.keys()
+
+    def keys(self) -> Set[str]:
+        """
+        Utility function that returns valid keys for .cf[].
+
+        Returns
+        -------
+        set
+            Axes, coordinates, and criteria keys that match columns.
+        """
+
+        varnames = list(self.axes) + list(self.coordinates)
+        try:
+            varnames.extend(key for key, val in self.custom_keys.items() if val)
+        except ValueError:
+            # don't have criteria defined, then no custom keys to report
+            pass
+        return set(varnames)
+
+    @property
+    def axes(self) -> Dict[str, List[str]]:
+        """Axis names ("X", "Y", "Z", "T") that match columns, mapped to the column names."""
+
+        return {
+            key: sorted(names)
+            for key, names in self._axis_coords().items()
+            if key in _AXIS_NAMES and names
+        }
+
+    @property
+    def coordinates(self) -> Dict[str, List[str]]:
+        """Coordinate names ("longitude", "latitude", "vertical", "time") that match columns, mapped to the column names."""
+
+        return {
+            key: sorted(names)
+            for key, names in self._axis_coords().items()
+            if key in _COORD_NAMES and names
+        }
+
+    @property
+    def custom_keys(self) -> Dict[str, List[str]]:
+        """Criteria keys mapped to matching column names."""
+
+        custom_criteria = set_up_criteria()
+        names = self._schema().names()
+        return {
+            key: match_criteria_key(names, key, custom_criteria, split=True)
+            for key in custom_criteria.keys()
+        }
+
+    @property
+    def axes_cols(self) -> List[str]:
+        """Column names that represent axes."""
+        return list(itertools.chain(*self.axes.values()))
+
+    @property
+    def coordinates_cols(self) -> List[str]:
+        """Column names that represent coordinates."""
+        return list(itertools.chain(*self.coordinates.values()))
+
+
+@pl.api.register_dataframe_namespace("cf")
+class PolarsCFAccessor(_PolarsCFNamespace):
+    """polars DataFrame namespace analogous to the pandas accessor.
+
+    Examples
+    --------
+    >>> with cfp.set_options(custom_criteria=vocab):
+    ...     df.cf["temp"]
+    """
+
+    def _schema(self) -> pl.Schema:
+        return self._obj.schema
+
+    def __getitem__(self, key: str):
+        """Select columns by alias.
+
+        Parameters
+        ----------
+        key: str
+            key in custom criteria/vocabulary to match with columns of DataFrame, or in axes or coordinates.
+
+        Returns
+        -------
+        Series, DataFrame
+            Series if one column matches, otherwise DataFrame of the matching columns.
+        """
+
+        col_names = self._key_names(key)
+        if len(col_names) == 1:
+            return self._obj.get_column(col_names[0])
+        elif len(col_names) > 1:
+            return self._obj.select(col_names)
+        else:
+            raise ValueError("Some error has occurred.")
+
+
+@pl.api.register_lazyframe_namespace("cf")
+class PolarsCFLazyAccessor(_PolarsCFNamespace):
+    """polars LazyFrame namespace analogous to the pandas accessor.
+
+    Keys are matched against the schema only, without collecting.
+
+    Examples
+    --------
+    >>> lf = pl.scan_parquet("wide.parquet")
+    >>> with cfp.set_options(custom_criteria=vocab):
+    ...     lf.cf["temp"].collect()  # reads only the matching columns
+    """
+
+    def _schema(self) -> pl.Schema:
+        return self._obj.collect_schema()
+
+    def __getitem__(self, key: str) -> pl.LazyFrame:
+        """Select columns by alias, lazily.
+
+        Parameters
+        ----------
+        key: str
+            key in custom criteria/vocabulary to match with columns of LazyFrame, or in axes or coordinates.
+
+        Returns
+        -------
+        LazyFrame
+            ``select`` of the matching columns, even if there is one.
+        """
+
+        col_names = self._key_names(key)
+        if len(col_names) == 0:
+            raise ValueError("Some error has occurred.")
+        return self._obj.select(col_names)
@@ -0,0 +1,563 @@
+"""
+Read only the columns of a file that match keys.
+
+Keys are matched against the names in the file schema, like ``df.cf[key]`` matches them against
+the columns and index names of a DataFrame, so other columns are never read.
+"""
+
+import json
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Union,
+)
+
+import pandas as pd
+
+from .accessor import _AXIS_NAMES, _COORD_NAMES, _match_axis_coord_names
+from .metadata import METADATA_KEY, make_metadata, stored_keys, subset
+from .utils import astype, match_criteria_key
+
+
+def resolve_keys(
+    names: Iterable[Hashable],
+    keys: Union[str, Iterable[str]],
+    criteria: Optional[Union[dict, Iterable]] = None,
+    is_datetime: Optional[Callable[[str], bool]] = None,
+) -> Dict[str, List[str]]:
+    """Match keys to names the way ``df.cf[key]`` does, without any data.
+
+    Parameters
+    ----------
+    names : Iterable
+        Column and index names, for example from a file schema.
+    keys : str, list
+        Names, axes, coordinates, or keys in criteria.
+    criteria : dict, optional
+        Criteria to use to map from variable to attributes describing the variable. If user has defined custom_criteria, this will be used by default.
+    is_datetime : Callable, optional
+        Returns whether the values under a name are datetime-like, to identify time without a matching name.
+
+    Returns
+    -------
+    dict
+        Each key mapped to its matching names, in the order of names.
+
+    Raises
+    ------
+    KeyError
+        If a key matches no names.
+    """
+
+    names = list(names)
+    order = {name: i for i, name in enumerate(names)}
+    axis_coords = None
+    mapping = {}
+    for key in astype(keys, list):
+        # a name in the file doesn't need to be interpreted
+        if key in order:
+            matched = [key]
+        elif key in _AXIS_NAMES + _COORD_NAMES:
+            if axis_coords is None:
+                axis_coords = _match_axis_coord_names(names, is_datetime)
+            matched = axis_coords[key]
+        else:
+            strings = [name for name in names if isinstance(name, str)]
+            matched = match_criteria_key(strings, key, criteria, split=True)
+        if len(matched) == 0:
+            raise KeyError(f"cf-pandas cannot match key {key!r} to names {names!r}.")
+        mapping[key] = sorted(matched, key=order.__getitem__)
+    return mapping
+
+
+def _columns(mapping: Dict[str, List[str]], names: Iterable[Hashable]) -> List[str]:
+    """Names matched to any key, in the order of names."""
+
+    matched = {name for found in mapping.values() for name in found}
+    return [name for name in names if name in matched]
+
+
+def _schema_columns(
+    schema, keys: Optional[Union[str, Iterable[str]]], criteria
+) -> Optional[List[str]]:
+    """Names in an Arrow schema that match keys, or None for all of them.
+
+    Keys in a mapping stored by ``df.cf.to_arrow`` with the same criteria are not matched again.
+    """
+
+    if keys is None:
+        return None
+
+    stored = stored_keys((schema.metadata or {}).get(METADATA_KEY.encode()), criteria)
+    mapping = {}
+    missing = []
+    for key in astype(keys, list):
+        if stored is not None and stored.get(key):
+            mapping[key] = stored[key]
+        else:
+            missing.append(key)
+
+    if missing:
+        mapping.update(
+            resolve_keys(schema.names, missing, criteria, _arrow_is_datetime(schema))
+        )
+    return _columns(mapping, schema.names)
+
+
+def _arrow_is_datetime(schema) -> Callable[[str], bool]:
+    """Whether a field of an Arrow schema holds timestamps, dates or durations."""
+
+    import pyarrow as pa
+
+    def is_datetime(name: str) -> bool:
+        type_ = schema.field(name).type
+        return (
+            pa.types.is_timestamp(type_)
+            or pa.types.is_date(type_)
+            or pa.types.is_duration(type_)
+        )
+
+    return is_datetime
+
+
+def _to_pandas(table) -> pd.DataFrame:
+    """DataFrame from an Arrow table, with the mapping stored in its metadata in attrs."""
+
+    df = table.to_pandas()
+    metadata = (table.schema.metadata or {}).get(METADATA_KEY.encode())
+    if metadata is not None:
+        try:
+            metadata = json.loads(metadata)
+        except ValueError:
+            return df
+        if not isinstance(metadata, dict) or "keys" not in metadata:
+            return df
+        _store_mapping(df, metadata)
+    return df
+
+
+def _store_mapping(
+    df: pd.DataFrame, metadata: Optional[Dict[str, Any]]
+) -> pd.DataFrame:
+    """Store the part of a mapping for the names of df in its attrs, so ``df.cf`` uses it."""
+
+    if metadata is None:
+        return df
+    names = list(df.columns) + list(df.index.names)
+    # axes and coordinates may be guessed differently from fewer names, so they
+    # are kept only if all their names were read
+    df.attrs[METADATA_KEY] = subset(
+        metadata, names, lambda key: key not in _AXIS_NAMES + _COORD_NAMES
+    )
+    return df
+
+
+def read_parquet(
+    path: Any,
+    keys: Optional[Union[str, Iterable[str]]] = None,
+    criteria: Optional[Union[dict, Iterable]] = None,
+    **kwargs,
+) -> pd.DataFrame:
+    """Read the columns of a Parquet file that match keys.
+
+    Only the file footer is read to match keys, then only matching columns are read.
+
+    Parameters
+    ----------
+    path : str, Path, file-like
+        Parquet file.
+    keys : str, list, optional
+        Names, axes, coordinates, or keys in criteria. If None, read all columns.
+    criteria : dict, optional
+        Criteria to use to map from variable to attributes describing the variable. If user has defined custom_criteria, this will be used by default.
+    kwargs
+        Passed to ``pyarrow.parquet.read_table``.
+
+    Returns
+    -------
+    DataFrame
+        Matching columns, with the index stored in the file.
+
+    Examples
+    --------
+    >>> df = cfp.read_parquet("wide.parquet", keys=["temp", "T"], criteria=vocab)
+    >>> df.cf["temp"]
+    """
+
+    import pyarrow.parquet as pq
+
+    schema = pq.read_schema(path)
+    columns = _schema_columns(schema, keys, criteria)
+    kwargs.setdefault("use_pandas_metadata", True)
+    return _to_pandas(pq.read_table(path, columns=columns, **kwargs))
+
+
+def read_feather(
+    path: Any,
+    keys: Optional[Union[str, Iterable[str]]] = None,
+    criteria: Optional[Union[dict, Iterable]] = None,
+    memory_map: bool = True,
+    **kwargs,
+) -> pd.DataFrame:
+    """Read the columns of a Feather (Arrow IPC) file that match keys.
+
+    Parameters
+    ----------
+    path : str, Path
+        Feather or Arrow IPC file.
+    keys : str, list, optional
+        Names, axes, coordinates, or keys in criteria. If None, read all columns.
+    criteria : dict, optional
+        Criteria to use to map from variable to attributes describing the variable. If user has defined custom_criteria, this will be used by default.
+    memory_map : bool
+        Map the file into memory instead of reading it, so uncompressed columns are not copied.
+    kwargs
+        Passed to ``pyarrow.feather.read_table``.
+
+    Returns
+    -------
+    DataFrame
+        Matching columns.
+    """
+
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.ipc as ipc
+
+    source = pa.memory_map(str(path)) if memory_map else pa.OSFile(str(path))
+    with source:
+        schema = ipc.open_file(source).schema
+    columns = _schema_columns(schema, keys, criteria)
+    table = feather.read_table(path, columns=columns, memory_map=memory_map, **kwargs)
+    return _to_pandas(table)
+
+
+def read_dataset(
+    source: Any,
+    keys: Optional[Union[str, Iterable[str]]] = None,
+    criteria: Optional[Union[dict, Iterable]] = None,
+    filter: Any = None,
+    **kwargs,
+) -> pd.DataFrame:
+    """Read the columns of an Arrow dataset that match keys.
+
+    Parameters
+    ----------
+    source : str, Path, list, Dataset
+        Files or directory of a dataset, or a ``pyarrow.dataset.Dataset``.
+    keys : str, list, optional
+        Names, axes, coordinates, or keys in criteria. If None, read all columns.
+    criteria : dict, optional
+        Criteria to use to map from variable to attributes describing the variable. If user has defined custom_criteria, this will be used by default.
+    filter : Expression, optional
+        Rows to read, passed to ``Dataset.to_table``.
+    kwargs
+        Passed to ``pyarrow.dataset.dataset``, for example ``format="parquet"``.
+
+    Returns
+    -------
+    DataFrame
+        Matching columns.
+    """
+
+    import pyarrow.dataset as ds
+
+    dataset = source if isinstance(source, ds.Dataset) else ds.dataset(source, **kwargs)
+    columns = _schema_columns(dataset.schema, keys, criteria)
+    return _to_pandas(dataset.to_table(columns=columns, filter=filter))
+
+
+def _csv_header(path: Any, units_row: bool, kwargs: dict) -> List[str]:
+    """Column names of a CSV file, with units from the row under the header if units_row."""
+
+    # a file object is read again after the header, so start from the same place
+    position = path.tell() if hasattr(path, "seek") else None
+    header = pd.read_csv(
+        path,
+        nrows=1 if units_row else 0,
+        dtype=str,
+        keep_default_na=False,
+        **kwargs,
+    )
+    if position is not None:
+        path.seek(position)
+
+    names = [str(name) for name in header.columns]
+    if not units_row:
+        return names
+    units = header.iloc[0] if len(header) > 0 else [""] * len(names)
+    return _with_units(names, units)
+
+
+def _index_names(
+    index_col: Any, names: List[str], positions: bool = False
+) -> List[str]:
+    """Names of the index columns in index_col, which are read whether or not they match keys.
+
+    Parameters
+    ----------
+    index_col : str, int, list, False, None
+        ``index_col`` for pandas. None is no index, and so is False for CSV files.
+    names : list
+        Column names in the file.
+    positions : bool
+        Whether index_col can have positions in names and be False, as for CSV files.
+
+    Raises
+    ------
+    ValueError
+        If index_col has anything else.
+    """
+
+    if index_col is None or (positions and index_col is False):
+        return []
+    form = (
+        "a column name or position, or a list of them"
+        if positions
+        else "a column name or a list of them"
+    )
+    columns = index_col if isinstance(index_col, (list, tuple)) else [index_col]
+    index_names = []
+    for col in columns:
+        if isinstance(col, str):
+            index_names.append(col)
+        elif positions and isinstance(col, int) and not isinstance(col, bool):
+            if not 0 <= col < len(names):
+                raise ValueError(
+                    f"index_col {col} is not a position of the {len(names)} columns."
+                )
+            index_names.append(names[col])
+        else:
+            raise ValueError(f"index_col must be {form}, not {index_col!r}.")
+    return index_names
+
+
+def _with_units(names: List[str], units: Iterable[str]) -> List[str]:
+    """Names in the form "name (units)", or just name where units are empty."""
+
+    return [
+        f"{name} ({unit.strip()})" if unit.strip() else name
+        for name, unit in zip(names, units)
+    ]
+
+
+def read_csv(
+    path: Any,
+    keys: Optional[Union[str, Iterable[str]]] = None,
+    criteria: Optional[Union[dict, Iterable]] = None,
+    units_row: bool = False,
+    chunksize: Optional[int] = None,
+    dtype: Optional[Union[Any, Dict[str, Any]]] = None,
+    **kwargs,
+) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+    """Read the columns of a CSV file that match keys.
+
+    Only the header is read to match keys, then the pandas parser is given the matching columns
+    with ``usecols`` and skips the others.
+
+    Parameters
+    ----------
+    path : str, Path, file-like
+        CSV file.
+    keys : str, list, optional
+        Names, axes, coordinates, or keys in criteria. If None, read all columns.
+    criteria : dict, optional
+        Criteria to use to map from variable to attributes describing the variable. If user has defined custom_criteria, this will be used by default.
+    units_row : bool
+        If True, the row under the header has units, like in ERDDAP CSV files. Columns are then named
+        "name (units)", which ``check_units`` understands, and the row is not read as data.
+    chunksize : int, optional
+        If given, return an iterator of DataFrames with up to this many rows each. Keys are matched
+        once for all of them, and ``chunk.cf`` uses that mapping, so large files can be read with
+        bounded memory.
+    dtype : type, dict, optional
+        Type for all columns, or a dict of types by column name or by key, where a key sets the type
+        of all its matching columns.
+    kwargs
+        Passed to ``pandas.read_csv``. ``header``, ``names``, ``skiprows`` and ``usecols`` are set here. ``index_col``
+        can be column names or positions in the header, which are read whether or not they match keys.
+
+    Returns
+    -------
+    DataFrame, Iterator
+        Matching columns, or an iterator of DataFrames of them if chunksize is given.
+
+    Examples
+    --------
+    >>> df = cfp.read_csv("erddap.csv", keys=["temp", "T"], criteria=vocab, units_row=True)
+    >>> for chunk in cfp.read_csv("large.csv", keys="temp", criteria=vocab, chunksize=100_000):
+    ...     chunk.cf["temp"].mean()
+    """
+
+    header_kwargs = {
+        key: kwargs[key]
+        for key in ("sep", "delimiter", "encoding", "comment", "quotechar", "engine")
+        if key in kwargs
+    }
+    names = _csv_header(path, units_row, header_kwargs)
+
+    usecols = None
+    metadata = None
+    if keys is not None:
+        mapping = resolve_keys(names, keys, criteria)
+        metadata = make_metadata(names, mapping, criteria=criteria)
+        # the index is read too, and given by name since positions would count only usecols
+        index_col = _index_names(kwargs.get("index_col"), names, positions=True)
+        if index_col:
+            kwargs["index_col"] = index_col[0] if len(index_col) == 1 else index_col
+        matched = set(_columns(mapping, names)) | set(index_col)
+        usecols = [name for name in names if name in matched]
+
+        # types by key apply to all columns matched to the key
+        if isinstance(dtype, dict):
+            dtype = {
+                col: type_
+                for name, type_ in dtype.items()
+                for col in mapping.get(name, [name])
+            }
+
+    if isinstance(dtype, dict) and usecols is not None:
+        dtype = {col: type_ for col, type_ in dtype.items() if col in usecols}
+
+    reader = pd.read_csv(
+        path,
+        header=None,
+        names=names,
+        skiprows=2 if units_row else 1,
+        usecols=usecols,
+        dtype=dtype,
+        chunksize=chunksize,
+        **kwargs,
+    )
+    if chunksize is None:
+        return _store_mapping(reader, metadata)
+    return _chunks(reader, metadata)
+
+
+def _chunks(
+    reader, metadata: Optional[Dict[str, Any]] = None
+) -> Iterator[pd.DataFrame]:
+    """DataFrames from a pandas TextFileReader with the mapping in attrs, closing it when done."""
+
+    with reader:
+        for chunk in reader:
+            yield _store_mapping(chunk, metadata)
+
+
+def _quote(name: str) -> str:
+    """SQL identifier in double quotes, which works for names with spaces and units."""
+
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _sql_schema(
+    source: str, source_sql: str, is_table: bool, con, params
+) -> Dict[str, str]:
+    """Column names of a table or query mapped to their declared types, which may be empty.
+
+    source is the table name or query, and source_sql what follows FROM to select from it.
+    """
+
+    import sqlite3
+
+    cursor = con.cursor()
+    try:
+        if is_table and isinstance(con, sqlite3.Connection):
+            # the declared types tell which columns hold dates, which a query cannot
+            cursor.execute(f"PRAGMA table_info({_quote(source)})")
+            schema = {row[1]: row[2] or "" for row in cursor.fetchall()}
+            if len(schema) == 0:
+                raise ValueError(f"No table {source!r} in database.")
+            return schema
+        # no rows, just the description of the columns
+        cursor.execute(f"SELECT * FROM {source_sql} WHERE 1 = 0", params or ())
+        return {column[0]: "" for column in cursor.description}
+    finally:
+        cursor.close()
+
+
+def read_sql(
+    table_or_query: str,
+    con: Any,
+    keys: Optional[Union[str, Iterable[str]]] = None,
+    criteria: Optional[Union[dict, Iterable]] = None,
+    chunksize: Optional[int] = None,
+    params: Optional[Union[tuple, dict]] = None,
+    **kwargs,
+) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+    """Select the columns of a database table or query that match keys.
+
+    Keys are matched against the column names before querying, then only the matching columns are
+    selected, instead of ``SELECT *``.
+
+    Parameters
+    ----------
+    table_or_query : str
+        Name of a table, or a SELECT query. A string without white space is taken as a table name.
+    con : Connection
+        DB-API connection, like from ``sqlite3.connect``. Column names come from ``PRAGMA table_info``
+        for a sqlite table, otherwise from the cursor description of the query.
+    keys : str, list, optional
+        Names, axes, coordinates, or keys in criteria. If None, select all columns.
+    criteria : dict, optional
+        Criteria to use to map from variable to attributes describing the variable. If user has defined custom_criteria, this will be used by default.
+    chunksize : int, optional
+        If given, return an iterator of DataFrames with up to this many rows each.
+    params : tuple, dict, optional
+        Parameters of the query.
+    kwargs
+        Passed to ``pandas.read_sql_query``. ``index_col`` can be a column name or a list of them,
+        which are selected whether or not they match keys.
+
+    Returns
+    -------
+    DataFrame, Iterator
+        Matching columns, or an iterator of DataFrames of them if chunksize is given.
+
+    Examples
+    --------
+    >>> con = sqlite3.connect("stations.db")
+    >>> df = cfp.read_sql("observations", con, keys=["temp", "T"], criteria=vocab)
+    >>> df = cfp.read_sql("SELECT * FROM observations WHERE station = ?", con, keys="temp", params=("a",))
+    """
+
+    source = table_or_query.strip()
+    is_table = len(source.split()) == 1
+    if is_table:
+        source_sql = _quote(source)
+    else:
+        # a query is used as a subquery, without a trailing semicolon
+        source_sql = f"({source.rstrip(';')}) AS cf_pandas_query"
+
+    select = "*"
+    metadata = None
+    if keys is not None:
+        schema = _sql_schema(source, source_sql, is_table, con, params)
+        names = list(schema)
+
+        def is_datetime(name: str) -> bool:
+            declared = schema[name].upper()
+            return "DATE" in declared or "TIME" in declared
+
+        mapping = resolve_keys(names, keys, criteria, is_datetime)
+        metadata = make_metadata(names, mapping, criteria=criteria)
+        index_col = _index_names(kwargs.get("index_col"), names)
+        matched = set(_columns(mapping, names)) | set(index_col)
+        select = ", ".join(_quote(name) for name in names if name in matched)
+
+    read = pd.read_sql_query(
+        f"SELECT {select} FROM {source_sql}",
+        con,
+        params=params,
+        chunksize=chunksize,
+        **kwargs,
+    )
+    if chunksize is None:
+        return _store_mapping(read, metadata)
+    return (_store_mapping(chunk, metadata) for chunk in read)
@@ -1,9 +1,130 @@
 """Class for writing regular expressions."""
 
-from typing import List, Optional, Sequence, Type, Union
+from typing import Iterable, List, Optional, Pattern, Sequence, Type, Union
 
+import numpy as np
+import pandas as pd
+import regex
+
+from .aho_corasick import AhoCorasick
 from .utils import astype
 
+# term without regular expression syntax, other than escaped punctuation
+_LITERAL_TERM = regex.compile(r"(?:[^\\.^$*+?{}\[\]()|]|\\[^A-Za-z0-9])*")
+_UNESCAPE = regex.compile(r"\\([^A-Za-z0-9])")
+
+#: Above this many terms, exclude and include term lists are searched with an Aho-Corasick
+#: automaton instead of one pass per term.
+AHO_CORASICK_MIN_TERMS = 32
+
+
+def _literal(term: str) -> Optional[str]:
+    """Plain text of term, or None if term uses regular expression syntax."""
+
+    if not term.isascii() or _LITERAL_TERM.fullmatch(term) is None:
+        return None
+    return _UNESCAPE.sub(r"\1", term)
+
+
+class _LiteralRules(object):
+    """Rules of a Reg whose terms are all plain text, evaluated without regular expressions.
+
+    For strings without newlines, the pattern of a Reg matches exactly when:
+
+    * no exclude term is in the string, it starts with no exclude_start and ends with no exclude_end term,
+    * it starts with include_start,
+    * an include_or term occurs after include_start; the earliest end of one is position p,
+      otherwise p is the end of include_start,
+    * every include term occurs at or after p, and include_end ends the string at or after p.
+
+    include_exact is a case-sensitive comparison of the whole string.
+    """
+
+    def __init__(self, reg: "Reg"):
+        self.exact = _literal(reg._include_exact) if reg._include_exact else None
+        if reg._include_exact and self.exact is None:
+            raise ValueError("not literal")
+        self.ignore_case = reg.ignore_case
+
+        def terms(values):
+            values = [_literal(value) for value in values]
+            if any(value is None for value in values):
+                raise ValueError("not literal")
+            return [value.lower() for value in values] if self.ignore_case else values
+
+        self.exclude = terms(reg._exclude)
+        self.exclude_start = tuple(terms(reg._exclude_start))
+        self.exclude_end = tuple(terms(reg._exclude_end))
+        self.include = terms(reg._include)
+        self.include_or = terms(reg._include_or)
+        self.start = terms([reg._include_start])[0] if reg._include_start else ""
+        self.end = terms([reg._include_end])[0] if reg._include_end else None
+
+        def automaton(values):
+            return AhoCorasick(values) if len(values) > AHO_CORASICK_MIN_TERMS else None
+
+        self._exclude_automaton = automaton(self.exclude)
+        self._include_automaton = automaton(self.include)
+        self._include_or_automaton = automaton(self.include_or)
+
+    def _each(self, s: pd.Series, func) -> np.ndarray:
+        return np.fromiter((func(value) for value in s), dtype=bool, count=len(s))
+
+    def match(self, s: pd.Series) -> np.ndarray:
+        """Whether each string matches. Strings must be ASCII without newlines."""
+
+        if self.exact is not None:
+            return (s == self.exact).to_numpy(dtype=bool)
+        if self.ignore_case:
+            s = s.str.lower()
+
+        ok = np.ones(len(s), dtype=bool)
+        if self._exclude_automaton is not None:
+            ok &= ~self._each(s, self._exclude_automaton.search)
+        for term in self.exclude if self._exclude_automaton is None else []:
+            ok &= ~s.str.contains(term, regex=False).to_numpy(dtype=bool)
+        if self.exclude_start:
+            ok &= ~s.str.startswith(self.exclude_start).to_numpy(dtype=bool)
+        if self.exclude_end:
+            ok &= ~s.str.endswith(self.exclude_end).to_numpy(dtype=bool)
+        if self.start:
+            ok &= s.str.startswith(self.start).to_numpy(dtype=bool)
+
+        # position the include and include_end terms must come at or after
+        position = np.full(len(s), len(self.start))
+        if self._include_or_automaton is not None:
+            ends = [
+                self._include_or_automaton.first_end(value, len(self.start))
+                for value in s
+            ]
+            found = np.array([end is not None for end in ends], dtype=bool)
+            ok &= found
+            position = np.where(found, [end or 0 for end in ends], position)
+        elif self.include_or:
+            ends = np.full(len(s), np.iinfo(np.int64).max)
+            for term in self.include_or:
+                starts = s.str.find(term, len(self.start)).to_numpy(dtype=np.int64)
+                ends = np.where(starts >= 0, np.minimum(ends, starts + len(term)), ends)
+            ok &= ends != np.iinfo(np.int64).max
+            position = np.where(ok, ends, position)
+
+        if self._include_automaton is not None:
+            ok &= np.fromiter(
+                (
+                    self._include_automaton.contains_all(value, int(start))
+                    for value, start in zip(s, position)
+                ),
+                dtype=bool,
+                count=len(s),
+            )
+        for term in self.include if self._include_automaton is None else []:
+            # the last occurrence is the one most likely to be after position
+            ok &= s.str.rfind(term).to_numpy(dtype=np.int64) >= position
+        if self.end is not None:
+            ok &= s.str.endswith(self.end).to_numpy(dtype=bool)
+            ok &= s.str.len().to_numpy(dtype=np.int64) - len(self.end) >= position
+        return ok
+
 
 class Reg(object):
     """Class to write a regular expression.
@@ -58,10 +179,32 @@ class Reg(object):
             "" if include_end is None or include_end == "" else include_end
         )
 
+        self._pattern: Optional[str] = None
+        self._compiled: Optional[Pattern] = None
+        self._rules: Optional[_LiteralRules] = None
+        self._rules_checked = False
         self.ignore_case = ignore_case
 
         self.check()
 
+    @property
+    def ignore_case(self) -> bool:
+        """Whether matches ignore case. Changing this resets the cached pattern."""
+        return self._ignore_case
+
+    @ignore_case.setter
+    def ignore_case(self, ignore_case: bool):
+        self._ignore_case = ignore_case
+        self._invalidate()
+
+    def _invalidate(self):
+        """Forget the pattern and compiled matcher after rules change."""
+
+        self._pattern = None
+        self._compiled = None
+        self._rules = None
+        self._rules_checked = False
+
     def check(self):
         """Check to make sure selected options are compatible."""
 
@@ -103,6 +246,7 @@ class Reg(object):
 
         if string != "":
             self._exclude += astype(string, list)
+        self._invalidate()
         self.check()
 
     def exclude_start(self, string: Union[str, list]):
@@ -120,6 +264,7 @@ class Reg(object):
 
         if string != "":
             self._exclude_start += astype(string, list)
+        self._invalidate()
         self.check()
 
     def exclude_end(self, string: Union[str, list]):
@@ -137,6 +282,7 @@ class Reg(object):
 
         if string != "":
             self._exclude_end += astype(string, list)
+        self._invalidate()
         self.check()
 
     def include_exact(self, string: str):
@@ -152,6 +298,7 @@ class Reg(object):
             raise ValueError("`include_exact` already contains a string.")
         if string != "":
             self._include_exact = string
+        self._invalidate()
         self.check()
 
     def include(self, string: Union[str, list]):
@@ -169,6 +316,7 @@ class Reg(object):
 
         if string != "":
             self._include += astype(string, list)
+        self._invalidate()
         self.check()
 
     def include_or(self, string: Union[str, list]):
@@ -186,6 +334,7 @@ class Reg(object):
 
         if string != "":
             self._include += astype(string, list)
+        self._invalidate()
         self.check()
 
     def include_end(self, string: str):
@@ -201,6 +350,7 @@ class Reg(object):
             raise ValueError("`include_end` already contains a string.")
         if string != "":
             self._include_end = string
+        self._invalidate()
         self.check()
 
     def include_start(self, string: str):
@@ -216,17 +366,23 @@ class Reg(object):
             raise ValueError("`include_start` already contains a string.")
         if string != "":
             self._include_start = string
+        self._invalidate()
         self.check()
 
     def pattern(self) -> str:
         """Generate regular expression pattern from user rules.
 
+        The pattern is kept until the rules change, so calling this again is cheap.
+
         Returns
         -------
         str
             Regular expression accounting for all input selections.
         """
 
+        if self._pattern is not None:
+            return self._pattern
+
         self._pattern = ""
 
         # the order of these statements is critical to get expressions correct
@@ -262,6 +418,97 @@ class Reg(object):
 
         return self._pattern
 
+    def compile(self) -> Pattern:
+        """Compiled regular expression, kept until the rules change.
+
+        Returns
+        -------
+        Pattern
+            ``regex`` pattern object for ``pattern()``.
+        """
+
+        if self._compiled is None:
+            self._compiled = regex.compile(self.pattern())
+        return self._compiled
+
+    def _literal_rules(self) -> Optional[_LiteralRules]:
+        """Rules for matching without regular expressions, if all terms are plain text."""
+
+        if not self._rules_checked:
+            try:
+                self._rules = _LiteralRules(self)
+            except ValueError:
+                self._rules = None
+            self._rules_checked = True
+        return self._rules
+
+    def match(self, values: Union[Iterable, pd.Series]) -> np.ndarray:
+        """Whether each value matches, at its start like ``regex.match``.
+
+        When every term of the rules is plain text, strings are checked directly with string
+        methods over the whole input and, for long lists of terms, an Aho-Corasick automaton.
+        Otherwise, and for strings that are not ASCII or contain newlines, the compiled pattern
+        is used. The results are the same either way.
+
+        Parameters
+        ----------
+        values: Iterable, Series
+            Strings to check. Values that are not strings do not match.
+
+        Returns
+        -------
+        ndarray
+            Boolean array with one element per value.
+        """
+
+        values = list(values)
+        rules = self._literal_rules()
+        if rules is None:
+            plain = np.zeros(len(values), dtype=bool)
+        else:
+            plain = np.fromiter(
+                (
+                    isinstance(value, str) and value.isascii() and "\n" not in value
+                    for value in values
+                ),
+                dtype=bool,
+                count=len(values),
+            )
+
+        result = np.zeros(len(values), dtype=bool)
+        if plain.any():
+            result[plain] = rules.match(
+                pd.Series([value for value, p in zip(values, plain) if p], dtype=object)
+            )
+        if not plain.all():
+            match = self.compile().match
+            result[~plain] = np.fromiter(
+                (
+                    isinstance(value, str) and match(value) is not None
+                    for value, p in zip(values, plain)
+                    if not p
+                ),
+                dtype=bool,
+            )
+        return result
+
+    def filter(self, series: Union[Iterable, pd.Series]) -> pd.Series:
+        """Values of series that match.
+
+        Parameters
+        ----------
+        series: Iterable, Series
+            Strings to filter.
+
+        Returns
+        -------
+        Series
+            Matching values, with their index.
+        """
+
+        series = astype(series, pd.Series)
+        return series[self.match(series)]
+
 
 def joinpat(regs: Sequence[Reg]) -> str:
     """Join patterns from Reg objects.
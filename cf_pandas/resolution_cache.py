@@ -0,0 +1,254 @@
+"""
+Cache of resolved mappings on disk, shared by processes.
+
+Which names match which keys depends only on the names, which of them hold dates, the criteria,
+and the version of cf-pandas, so the result for a schema is stored under a hash of those. The cache
+is a sqlite database in WAL mode, so concurrent processes can read while one writes, and the least
+recently used entries are removed beyond a maximum number.
+
+Enable it with ``cfp.set_options(resolution_cache=True)``, or a path for the database.
+"""
+
+import hashlib
+import json
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple, Union
+
+from .metadata import _version
+from .options import OPTIONS
+
+#: File name of the cache in the cache directory.
+CACHE_NAME = "resolutions.sqlite"
+
+# entries already read or written in this process, checked before the database
+_MEMO: Dict[str, Dict[str, List[int]]] = {}
+_MAX_MEMO = 10000
+
+# seconds between updates of when an entry was last used, so most reads don't write
+_TOUCH_INTERVAL = 60.0
+
+# one cache per process and path, since connections are not shared across fork
+_CACHES: Dict[Tuple[int, str], "ResolutionCache"] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+class ResolutionCache(object):
+    """Resolved mappings in a sqlite database.
+
+    Parameters
+    ----------
+    path : str, Path
+        Database file. It and its directory are created if needed.
+    max_entries : int
+        Number of entries to keep. The least recently used are removed beyond this.
+
+    Notes
+    -----
+    Entries map keys to positions in the list of names, so they can hold names of any type.
+    """
+
+    def __init__(self, path: Union[str, pathlib.PurePath], max_entries: int = 10000):
+        self.path = pathlib.Path(path)
+        self.max_entries = max_entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # wait for other processes' writes rather than fail
+        self._con = sqlite3.connect(
+            str(self.path), timeout=30, check_same_thread=False, isolation_level=None
+        )
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute("PRAGMA synchronous=NORMAL")
+        self._con.execute(
+            "CREATE TABLE IF NOT EXISTS resolution "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, used REAL NOT NULL)"
+        )
+        self._con.execute(
+            "CREATE INDEX IF NOT EXISTS resolution_used ON resolution (used)"
+        )
+
+    def __repr__(self):
+        """Representation."""
+        return f"<ResolutionCache {str(self.path)!r} max_entries={self.max_entries}>"
+
+    def __len__(self):
+        """Number of entries."""
+        with self._lock:
+            return self._con.execute("SELECT COUNT(*) FROM resolution").fetchone()[0]
+
+    def get(self, key: str) -> Optional[Dict[str, List[int]]]:
+        """Entry for key, or None.
+
+        The entry is marked as used now if it was last marked more than a minute ago, so reads
+        rarely wait to write.
+        """
+
+        with self._lock:
+            row = self._con.execute(
+                "SELECT value, used FROM resolution WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if now - row[1] > _TOUCH_INTERVAL:
+                try:
+                    self._con.execute(
+                        "UPDATE resolution SET used = ? WHERE key = ?", (now, key)
+                    )
+                except sqlite3.OperationalError:
+                    # still locked after the timeout; the entry is only a little less recent
+                    pass
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Dict[str, List[int]]):
+        """Store value for key, and remove the least recently used entries beyond max_entries."""
+
+        with self._lock:
+            try:
+                self._con.execute("BEGIN IMMEDIATE")
+                try:
+                    self._con.execute(
+                        "INSERT OR REPLACE INTO resolution VALUES (?, ?, ?)",
+                        (key, json.dumps(value), time.time()),
+                    )
+                    count = self._con.execute(
+                        "SELECT COUNT(*) FROM resolution"
+                    ).fetchone()[0]
+                    if count > self.max_entries:
+                        self._con.execute(
+                            "DELETE FROM resolution WHERE key IN "
+                            "(SELECT key FROM resolution ORDER BY used LIMIT ?)",
+                            (count - self.max_entries,),
+                        )
+                    self._con.execute("COMMIT")
+                except BaseException:
+                    self._con.execute("ROLLBACK")
+                    raise
+            except sqlite3.OperationalError:
+                # a cache that cannot be written is not an error, the result is just not kept
+                pass
+
+    def clear(self):
+        """Remove all entries."""
+
+        with self._lock:
+            self._con.execute("DELETE FROM resolution")
+        _MEMO.clear()
+
+    def close(self):
+        """Close the database."""
+
+        with self._lock:
+            self._con.close()
+
+
+def resolution_cache() -> Optional[ResolutionCache]:
+    """Cache set by option "resolution_cache", or None if it is off.
+
+    Returns
+    -------
+    ResolutionCache, None
+        With option True, the cache is ``CACHE_NAME`` in ``cfp.standard_name_table.cache_dir()``.
+        Otherwise the option is the path of the database.
+    """
+
+    option = OPTIONS["resolution_cache"]
+    if not option:
+        return None
+    if option is True:
+        from .standard_name_table import cache_dir
+
+        option = cache_dir() / CACHE_NAME
+    path = str(pathlib.Path(option).expanduser().resolve())
+
+    key = (os.getpid(), path)
+    with _CACHES_LOCK:
+        cache = _CACHES.get(key)
+        if cache is None:
+            cache = _CACHES[key] = ResolutionCache(
+                path, OPTIONS["resolution_cache_size"]
+            )
+        cache.max_entries = OPTIONS["resolution_cache_size"]
+    return cache
+
+
+def schema_key(
+    kind: str, names: Sequence[Hashable], extra=None, fingerprint: Optional[str] = None
+) -> str:
+    """Hash of what a resolution depends on.
+
+    Parameters
+    ----------
+    kind : str
+        What is resolved, so different resolutions of the same names are kept apart.
+    names : Sequence
+        Column and index names, in order.
+    extra : optional
+        Anything else the resolution depends on, as JSON, like which names hold dates.
+    fingerprint : str, optional
+        Fingerprint of the criteria.
+
+    Returns
+    -------
+    str
+        sha256 hex digest.
+    """
+
+    # repr keeps names of different types apart, like 1 and "1"
+    content = json.dumps(
+        [kind, [repr(name) for name in names], extra, fingerprint, _version()],
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def cached_resolution(
+    kind: str,
+    names: Sequence[Hashable],
+    resolve: Callable[[], Dict[str, List[Hashable]]],
+    extra=None,
+    fingerprint: Optional[str] = None,
+) -> Dict[str, List[Hashable]]:
+    """Resolution of names from the cache, or from resolve and then stored.
+
+    Parameters
+    ----------
+    kind, names, extra, fingerprint
+        See ``schema_key``.
+    resolve : Callable
+        Returns keys mapped to the names that match them, if the cache does not have it.
+
+    Returns
+    -------
+    dict
+        Keys mapped to names that match them.
+    """
+
+    names = list(names)
+    cache = resolution_cache()
+    if cache is None:
+        return resolve()
+
+    key = schema_key(kind, names, extra, fingerprint)
+    positions = _MEMO.get(key)
+    if positions is None:
+        positions = cache.get(key)
+    if positions is None:
+        resolved = resolve()
+        index = {}
+        for i, name in enumerate(names):
+            index.setdefault(name, i)
+        positions = {
+            found_key: [index[name] for name in found]
+            for found_key, found in resolved.items()
+        }
+        cache.put(key, positions)
+    if len(_MEMO) >= _MAX_MEMO:
+        _MEMO.clear()
+    _MEMO[key] = positions
+    return {
+        found_key: [names[i] for i in found] for found_key, found in positions.items()
+    }
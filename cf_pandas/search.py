@@ -0,0 +1,208 @@
+"""Full-text search of CF standard names by their descriptions."""
+
+import math
+import re
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .standard_name_table import StandardNameTable, _version, load_table
+
+# words that say nothing about a variable
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it its of on or that the this to which with".split()
+)
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+#: Weight of each field of an entry. Words of the standard name itself count most.
+FIELD_WEIGHTS = {"name": 3.0, "description": 1.0, "canonical_units": 0.5}
+
+
+def _tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase words of text without stopwords. Standard names are split at "_" too."""
+
+    if text is None:
+        return []
+    return [word for word in _WORD.findall(text.lower()) if word not in _STOPWORDS]
+
+
+class StandardNameSearch(object):
+    """Inverted index over standard names, descriptions and canonical units, ranked with BM25.
+
+    Parameters
+    ----------
+    table: StandardNameTable
+        Table to index.
+    k1, b: float
+        BM25 parameters for term frequency saturation and document length normalization.
+    """
+
+    def __init__(self, table: StandardNameTable, k1: float = 1.2, b: float = 0.75):
+        self.names = table.names
+        self.k1 = k1
+        self.b = b
+
+        # term -> doc id -> weighted term frequency
+        postings: Dict[str, Dict[int, float]] = {}
+        lengths = np.zeros(len(self.names))
+        fields = zip(table.names, table.descriptions, table.canonical_units)
+        for doc, (name, description, units) in enumerate(fields):
+            for field, text in zip(FIELD_WEIGHTS, (name, description, units)):
+                weight = FIELD_WEIGHTS[field]
+                for word in _tokenize(text):
+                    frequencies = postings.setdefault(word, {})
+                    frequencies[doc] = frequencies.get(doc, 0.0) + weight
+                    lengths[doc] += weight
+
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {
+            word: (
+                np.fromiter(frequencies.keys(), dtype=np.int64),
+                np.fromiter(frequencies.values(), dtype=float),
+            )
+            for word, frequencies in postings.items()
+        }
+        self._norms = k1 * (1 - b + b * lengths / max(lengths.mean(), 1e-9))
+
+    def __repr__(self):
+        """Representation."""
+        return f"<StandardNameSearch entries={len(self.names)} terms={len(self._postings)}>"
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every standard name for query.
+
+        Parameters
+        ----------
+        query: str
+            Words to search for.
+
+        Returns
+        -------
+        array
+            Score for each standard name in table order; 0 where no query word occurs.
+        """
+
+        scores = np.zeros(len(self.names))
+        ndocs = len(self.names)
+        for word in set(_tokenize(query)):
+            if word not in self._postings:
+                continue
+            docs, frequencies = self._postings[word]
+            idf = math.log(1 + (ndocs - len(docs) + 0.5) / (len(docs) + 0.5))
+            scores[docs] += (
+                idf * frequencies * (self.k1 + 1) / (frequencies + self._norms[docs])
+            )
+        return scores
+
+    def search(self, query: str, limit: Optional[int] = 20) -> List[Tuple[str, float]]:
+        """Standard names ranked by relevance to query.
+
+        Parameters
+        ----------
+        query: str
+            Words to search for, like "salinity" or "sea ice thickness".
+        limit: int, optional
+            Return at most this many results. None for all standard names that match any word.
+
+        Returns
+        -------
+        list
+            (standard name, score) tuples, best first.
+        """
+
+        scores = self.scores(query)
+        matched = np.flatnonzero(scores > 0)
+        if limit is not None and limit < len(matched):
+            matched = matched[np.argpartition(-scores[matched], limit - 1)[:limit]]
+        # ties keep table order
+        ranked = matched[np.lexsort((matched, -scores[matched]))]
+        return [(self.names[doc], float(scores[doc])) for doc in ranked]
+
+
+# version -> search index, for indexes already built in this process
+_MEMO: Dict[str, StandardNameSearch] = {}
+
+
+def load_search(version: Optional[Union[int, str]] = None) -> StandardNameSearch:
+    """Search index for a version of the standard name table, built once per process.
+
+    Parameters
+    ----------
+    version: int, str, optional
+        Version of table. Default is option "standard_name_version", then the bundled version.
+
+    Returns
+    -------
+    StandardNameSearch
+        Search index.
+    """
+
+    version = _version(version)
+    if version not in _MEMO:
+        _MEMO[version] = StandardNameSearch(load_table(version))
+    return _MEMO[version]
+
+
+def search_standard_names(
+    query: str,
+    limit: Optional[int] = 20,
+    version: Optional[Union[int, str]] = None,
+    scores: bool = False,
+) -> Union[List[str], List[Tuple[str, float]]]:
+    """Search CF standard names by meaning.
+
+    Words of the query are looked up in the standard names, their descriptions and their canonical units, and results are ranked with BM25.
+
+    Parameters
+    ----------
+    query: str
+        Words to search for, like "salinity" or "sea ice thickness".
+    limit: int, optional
+        Return at most this many results. None for all standard names that match any word.
+    version: int, str, optional
+        Version of the CF standard name table. Default is option "standard_name_version", then the bundled version.
+    scores: bool
+        If True, return (standard name, score) tuples.
+
+    Returns
+    -------
+    list
+        Standard names, best match first.
+
+    Examples
+    --------
+    >>> cfp.search_standard_names("salinity", limit=3)
+    """
+
+    results = load_search(version).search(query, limit)
+    if scores:
+        return results
+    return [name for name, _ in results]
+
+
+def rank_options(
+    options: Sequence[str], query: str, version: Optional[Union[int, str]] = None
+) -> List[str]:
+    """Options that are standard names matching query, best match first.
+
+    Parameters
+    ----------
+    options: Sequence
+        Strings to choose from, like the options of a ``Selector``.
+    query: str
+        Words to search for.
+    version: int, str, optional
+        Version of the CF standard name table.
+
+    Returns
+    -------
+    list
+        Options found by ``search_standard_names``, in order of relevance.
+    """
+
+    available = set(options)
+    return [
+        name
+        for name in search_standard_names(query, limit=None, version=version)
+        if name in available
+    ]
@@ -0,0 +1,415 @@
+"""Memory-mapped index of CF standard names for prefix, suffix and token queries.
+
+The index file holds, all little-endian:
+
+* a header: magic bytes, table version, and counts,
+* the standard names sorted, as one UTF-8 blob with an array of offsets,
+* name ids sorted by their reversed names, for suffix queries,
+* the tokens of the names (split on "_") sorted, as a blob with offsets,
+* for each token, the sorted ids of the names that contain it.
+
+Name ids are positions in the sorted names. Opening the file maps it into memory and
+reads only the header, so queries touch just the pages they need.
+"""
+
+import bisect
+import mmap
+import os
+import pathlib
+import shutil
+import struct
+import tempfile
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .standard_name_table import _source_key, _version, cache_dir, load_table
+
+_MAGIC = b"CFPSNI01"
+
+# magic, version (16 bytes, padded), number of names, number of tokens,
+# byte offsets of the sections that follow
+_HEADER = struct.Struct("<8s16sII6Q")
+
+
+class _Strings(Sequence):
+    """Sequence view of strings stored as a blob and an offsets array."""
+
+    def __init__(
+        self, blob: memoryview, offsets: np.ndarray, order=None, reverse=False
+    ):
+        self._blob = blob
+        self._offsets = offsets
+        self._order = order
+        self._reverse = reverse
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if self._order is not None:
+            i = int(self._order[i])
+        value = bytes(self._blob[self._offsets[i] : self._offsets[i + 1]])
+        return value[::-1] if self._reverse else value
+
+
+def _range(strings: Sequence, prefix: bytes) -> range:
+    """Positions of sorted strings that start with prefix."""
+
+    lo = bisect.bisect_left(strings, prefix)
+    hi = bisect.bisect_left(strings, prefix + b"\xff", lo)
+    return range(lo, hi)
+
+
+def _blob(values: Sequence[bytes]):
+    offsets = np.zeros(len(values) + 1, dtype="<u4")
+    offsets[1:] = np.cumsum([len(value) for value in values])
+    return b"".join(values), offsets
+
+
+def build_index(
+    names: Iterable[str], path: Union[str, pathlib.PurePath], version: str = ""
+):
+    """Write index file of standard names.
+
+    Parameters
+    ----------
+    names: Iterable
+        Standard names to index.
+    path: str, PurePath
+        Index file to write. It is written to a temporary file first and then moved in place.
+    version: str
+        Table version to record in the index.
+    """
+
+    sorted_names = sorted(set(name.encode() for name in names))
+    suffix_order = np.array(
+        sorted(range(len(sorted_names)), key=lambda i: sorted_names[i][::-1]),
+        dtype="<u4",
+    )
+
+    postings: Dict[bytes, List[int]] = {}
+    for i, name in enumerate(sorted_names):
+        for token in set(name.split(b"_")):
+            postings.setdefault(token, []).append(i)
+    tokens = sorted(postings)
+
+    names_blob, names_offsets = _blob(sorted_names)
+    tokens_blob, tokens_offsets = _blob(tokens)
+    postings_offsets = np.zeros(len(tokens) + 1, dtype="<u4")
+    postings_offsets[1:] = np.cumsum([len(postings[token]) for token in tokens])
+    postings_ids = np.array(
+        [i for token in tokens for i in postings[token]], dtype="<u4"
+    )
+
+    sections = [
+        names_offsets.tobytes(),
+        names_blob,
+        suffix_order.tobytes(),
+        tokens_offsets.tobytes(),
+        tokens_blob,
+        postings_offsets.tobytes() + postings_ids.tobytes(),
+    ]
+    starts = []
+    position = _HEADER.size
+    for section in sections:
+        # keep arrays aligned
+        position += -position % 8
+        starts.append(position)
+        position += len(section)
+
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmpname = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(
+                _HEADER.pack(
+                    _MAGIC,
+                    version.encode()[:16],
+                    len(sorted_names),
+                    len(tokens),
+                    *starts,
+                )
+            )
+            for start, section in zip(starts, sections):
+                f.write(b"\0" * (start - f.tell()))
+                f.write(section)
+        os.replace(tmpname, path)
+    except BaseException:
+        os.unlink(tmpname)
+        raise
+
+
+class StandardNameIndex(object):
+    """Memory-mapped index of standard names.
+
+    Parameters
+    ----------
+    path: str, PurePath
+        Index file written by ``build_index``.
+
+    Examples
+    --------
+    All standard names containing "sea_water" and ending in "temperature":
+
+    >>> index = cfp.standard_name_index.load_index()
+    >>> index.query(contains="sea_water", suffix="temperature")
+    """
+
+    def __init__(self, path: Union[str, pathlib.PurePath]):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self._mmap)
+        magic, version, nnames, ntokens, *starts = _HEADER.unpack_from(buffer)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a standard name index file.")
+        self.version = version.rstrip(b"\0").decode()
+
+        def array(start, count):
+            return np.frombuffer(buffer, dtype="<u4", count=count, offset=start)
+
+        names_offsets = array(starts[0], nnames + 1)
+        self._names = _Strings(buffer[starts[1] :], names_offsets)
+        suffix_order = array(starts[2], nnames)
+        self._suffixes = _Strings(
+            buffer[starts[1] :], names_offsets, order=suffix_order, reverse=True
+        )
+        self._suffix_order = suffix_order
+        self._tokens = _Strings(buffer[starts[4] :], array(starts[3], ntokens + 1))
+        self._postings_offsets = array(starts[5], ntokens + 1)
+        self._postings = array(
+            starts[5] + 4 * (ntokens + 1), int(self._postings_offsets[-1])
+        )
+
+    def __len__(self):
+        """Number of standard names."""
+        return len(self._names)
+
+    def __repr__(self):
+        """Representation."""
+        return f"<StandardNameIndex version={self.version} entries={len(self)}>"
+
+    def _decode(self, ids: np.ndarray) -> List[str]:
+        return [self._names[int(i)].decode() for i in ids]
+
+    def _token_ids(self, positions: Iterable[int]) -> np.ndarray:
+        """Union of postings of tokens at positions."""
+
+        postings = [
+            self._postings[self._postings_offsets[i] : self._postings_offsets[i + 1]]
+            for i in positions
+        ]
+        if len(postings) == 0:
+            return np.array([], dtype="<u4")
+        return np.unique(np.concatenate(postings))
+
+    def _suffix_ids(self, suffix: str) -> np.ndarray:
+        positions = _range(self._suffixes, suffix.encode()[::-1])
+        return np.sort(self._suffix_order[positions.start : positions.stop])
+
+    def _contains_ids(self, string: str) -> np.ndarray:
+        """Candidate ids for names that contain string, from the token postings."""
+
+        pieces = string.encode().split(b"_")
+        ids = None
+        for n, piece in enumerate(pieces):
+            if len(pieces) == 1:
+                positions = [
+                    i for i, token in enumerate(self._tokens) if piece in token
+                ]
+            elif n == 0:
+                positions = [
+                    i for i, token in enumerate(self._tokens) if token.endswith(piece)
+                ]
+            elif n == len(pieces) - 1:
+                positions = _range(self._tokens, piece)
+            else:
+                position = _range(self._tokens, piece)
+                positions = [i for i in position if self._tokens[i] == piece]
+            piece_ids = self._token_ids(positions)
+            ids = piece_ids if ids is None else np.intersect1d(ids, piece_ids)
+        return ids
+
+    def prefix(self, prefix: str) -> List[str]:
+        """Standard names that start with prefix.
+
+        Parameters
+        ----------
+        prefix: str
+            Start of standard names.
+
+        Returns
+        -------
+        list
+            Sorted standard names.
+        """
+
+        return self.query(prefix=prefix)
+
+    def suffix(self, suffix: str) -> List[str]:
+        """Standard names that end with suffix.
+
+        Parameters
+        ----------
+        suffix: str
+            End of standard names.
+
+        Returns
+        -------
+        list
+            Sorted standard names.
+        """
+
+        return self.query(suffix=suffix)
+
+    def tokens(self, *tokens: str) -> List[str]:
+        """Standard names that contain all tokens, where tokens are the parts between "_".
+
+        Parameters
+        ----------
+        tokens: str
+            Whole tokens, for example "sea" and "water".
+
+        Returns
+        -------
+        list
+            Sorted standard names.
+        """
+
+        return self.query(tokens=tokens)
+
+    def query(
+        self,
+        prefix: Optional[str] = None,
+        suffix: Optional[str] = None,
+        tokens: Optional[Sequence[str]] = None,
+        contains: Optional[Union[str, Sequence[str]]] = None,
+    ) -> List[str]:
+        """Standard names that satisfy all input conditions.
+
+        Parameters
+        ----------
+        prefix: str, optional
+            Standard names start with prefix.
+        suffix: str, optional
+            Standard names end with suffix.
+        tokens: Sequence, optional
+            Standard names contain all of these whole tokens, the parts between "_".
+        contains: str, Sequence, optional
+            Standard names contain all of these strings anywhere.
+
+        Returns
+        -------
+        list
+            Sorted standard names.
+        """
+
+        candidates = []
+        if prefix is not None:
+            positions = _range(self._names, prefix.encode())
+            candidates.append(np.arange(positions.start, positions.stop, dtype="<u4"))
+        if suffix is not None:
+            candidates.append(self._suffix_ids(suffix))
+        for token in tokens or []:
+            positions = _range(self._tokens, token.encode())
+            candidates.append(
+                self._token_ids(
+                    i for i in positions if self._tokens[i] == token.encode()
+                )
+            )
+        if isinstance(contains, str):
+            contains = [contains]
+        for string in contains or []:
+            candidates.append(self._contains_ids(string))
+
+        if len(candidates) == 0:
+            return self._decode(np.arange(len(self), dtype="<u4"))
+
+        ids = candidates[0]
+        for other in candidates[1:]:
+            ids = np.intersect1d(ids, other, assume_unique=True)
+
+        names = self._decode(ids)
+        # postings find candidates, substrings across token boundaries are checked here
+        for string in contains or []:
+            names = [name for name in names if string in name]
+        return names
+
+
+# (version, index path, key of the table it is built from) -> index, for indexes already opened
+# in this process
+_MEMO: Dict[Tuple[str, str, Tuple[str, str, Optional[int]]], StandardNameIndex] = {}
+
+
+def index_path(
+    version: Optional[Union[int, str]] = None,
+    cache: Optional[Union[str, pathlib.PurePath]] = None,
+) -> pathlib.Path:
+    """Location of index file for a table version in the cache directory.
+
+    Parameters
+    ----------
+    version: int, str, optional
+        Version of table. Default is option "standard_name_version", then the bundled version.
+    cache: str, PurePath, optional
+        Cache directory, see ``standard_name_table.cache_dir``.
+
+    Returns
+    -------
+    Path
+        Index file.
+    """
+
+    return cache_dir(cache) / f"cf-standard-name-index-{_version(version)}.bin"
+
+
+def load_index(
+    version: Optional[Union[int, str]] = None,
+    cache: Optional[Union[str, pathlib.PurePath]] = None,
+) -> StandardNameIndex:
+    """Open standard name index, building it in the cache directory the first time.
+
+    Parameters
+    ----------
+    version: int, str, optional
+        Version of table. Default is option "standard_name_version", then the bundled version.
+    cache: str, PurePath, optional
+        Cache directory, see ``standard_name_table.cache_dir``.
+
+    Returns
+    -------
+    StandardNameIndex
+        Index, opened once per process.
+    """
+
+    version = _version(version)
+    path = index_path(version, cache)
+    source = _source_key(version, cache)
+    key = (version, str(path.resolve()), source)
+    if key in _MEMO:
+        return _MEMO[key]
+
+    # build the index again if the table was fetched again since it was built
+    if not path.exists() or (
+        source[2] is not None and path.stat().st_mtime_ns < source[2]
+    ):
+        names = load_table(version, cache=cache).names
+        try:
+            build_index(names, path, version)
+        except OSError:
+            # cache directory is not writable, so open the index from a temporary file, which
+            # the memory map keeps after the file is removed
+            directory = tempfile.mkdtemp()
+            try:
+                temporary = pathlib.Path(directory) / path.name
+                build_index(names, temporary, version)
+                index = StandardNameIndex(temporary)
+            finally:
+                shutil.rmtree(directory, ignore_errors=True)
+            _MEMO[key] = index
+            return index
+
+    index = StandardNameIndex(path)
+    _MEMO[key] = index
+    return index
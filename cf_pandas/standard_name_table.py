@@ -0,0 +1,628 @@
+"""Find the CF standard name table offline first, and online only when needed.
+
+A table is looked up in order in:
+
+1. memory, for tables already read in this process,
+2. the cache directory on disk, for tables fetched before,
+3. the tables bundled with cf-pandas,
+4. the cfconventions.org server.
+"""
+
+import gzip
+import io
+import json
+import os
+import pathlib
+import re
+import tempfile
+from typing import IO, Dict, List, Mapping, Optional, Tuple, Union
+from xml.etree import ElementTree
+
+from .options import OPTIONS
+
+#: Version of the CF standard name table that is bundled with cf-pandas and used by default.
+DEFAULT_VERSION = 93
+
+#: Where to fetch a version of the table from.
+URL = "https://cfconventions.org/Data/cf-standard-names/{version}/src/cf-standard-name-table.xml"
+
+_DATA_DIR = pathlib.Path(__file__).parent / "data"
+
+# one term of units, like "m" or "s-1"
+_UNITS_TERM = re.compile(r"^([A-Za-z%]+)(-?\d+)?$")
+
+# dimensions of common units as powers of (length, mass, time, temperature, amount, current),
+# to compare units without cf_units
+_DIMENSIONLESS = (0, 0, 0, 0, 0, 0)
+_DIMENSIONS: Dict[str, Tuple[int, ...]] = {
+    "m": (1, 0, 0, 0, 0, 0),
+    "g": (0, 1, 0, 0, 0, 0),
+    "s": (0, 0, 1, 0, 0, 0),
+    "min": (0, 0, 1, 0, 0, 0),
+    "h": (0, 0, 1, 0, 0, 0),
+    "hr": (0, 0, 1, 0, 0, 0),
+    "hour": (0, 0, 1, 0, 0, 0),
+    "hours": (0, 0, 1, 0, 0, 0),
+    "d": (0, 0, 1, 0, 0, 0),
+    "day": (0, 0, 1, 0, 0, 0),
+    "days": (0, 0, 1, 0, 0, 0),
+    "K": (0, 0, 0, 1, 0, 0),
+    "degC": (0, 0, 0, 1, 0, 0),
+    "degree_C": (0, 0, 0, 1, 0, 0),
+    "degrees_C": (0, 0, 0, 1, 0, 0),
+    "deg_C": (0, 0, 0, 1, 0, 0),
+    "celsius": (0, 0, 0, 1, 0, 0),
+    "degF": (0, 0, 0, 1, 0, 0),
+    "mol": (0, 0, 0, 0, 1, 0),
+    "A": (0, 0, 0, 0, 0, 1),
+    "l": (3, 0, 0, 0, 0, 0),
+    "L": (3, 0, 0, 0, 0, 0),
+    "Hz": (0, 0, -1, 0, 0, 0),
+    "N": (1, 1, -2, 0, 0, 0),
+    "Pa": (-1, 1, -2, 0, 0, 0),
+    "bar": (-1, 1, -2, 0, 0, 0),
+    "J": (2, 1, -2, 0, 0, 0),
+    "W": (2, 1, -3, 0, 0, 0),
+    "V": (2, 1, -3, 0, 0, -1),
+    "S": (-2, -1, 3, 0, 0, 2),
+    "%": _DIMENSIONLESS,
+    "percent": _DIMENSIONLESS,
+    "psu": _DIMENSIONLESS,
+    "PSU": _DIMENSIONLESS,
+    "ppt": _DIMENSIONLESS,
+    "ppm": _DIMENSIONLESS,
+    "rad": _DIMENSIONLESS,
+    "degree": _DIMENSIONLESS,
+    "degrees": _DIMENSIONLESS,
+    "degree_north": _DIMENSIONLESS,
+    "degrees_north": _DIMENSIONLESS,
+    "degree_N": _DIMENSIONLESS,
+    "degrees_N": _DIMENSIONLESS,
+    "degree_east": _DIMENSIONLESS,
+    "degrees_east": _DIMENSIONLESS,
+    "degree_E": _DIMENSIONLESS,
+    "degrees_E": _DIMENSIONLESS,
+}
+_PREFIXES = (
+    "da",
+    "Y",
+    "Z",
+    "E",
+    "P",
+    "T",
+    "G",
+    "M",
+    "k",
+    "h",
+    "d",
+    "c",
+    "m",
+    "u",
+    "µ",
+    "n",
+    "p",
+    "f",
+)
+
+# (version, cached path, its mtime) -> table, for tables already read in this process
+_MEMO: Dict[Tuple[str, str, Optional[int]], "StandardNameTable"] = {}
+
+
+class StandardNameTable(object):
+    """CF standard name table stored by column.
+
+    Entry ``i`` has standard name ``names[i]``, canonical units ``canonical_units[i]``, and so on.
+    Values missing from the table are None.
+
+    Parameters
+    ----------
+    version: str
+        Table version number.
+    names: tuple
+        Standard names, in table order.
+    canonical_units, descriptions, grib, amip: tuple
+        Values for each standard name.
+    aliases: Mapping
+        Deprecated standard name to the standard name that replaces it.
+    last_modified: str, optional
+        When the table was last modified.
+    """
+
+    def __init__(
+        self,
+        version: Optional[str],
+        names: Tuple[str, ...],
+        canonical_units: Tuple[Optional[str], ...],
+        descriptions: Tuple[Optional[str], ...],
+        grib: Tuple[Optional[str], ...],
+        amip: Tuple[Optional[str], ...],
+        aliases: Mapping[str, str],
+        last_modified: Optional[str] = None,
+    ):
+        self.version = version
+        self.names = names
+        self.canonical_units = canonical_units
+        self.descriptions = descriptions
+        self.grib = grib
+        self.amip = amip
+        self.aliases = dict(aliases)
+        self.last_modified = last_modified
+        self._positions = {name: i for i, name in enumerate(names)}
+
+    def __repr__(self):
+        """Representation."""
+        return f"<StandardNameTable version={self.version} entries={len(self.names)} aliases={len(self.aliases)}>"
+
+    def __len__(self):
+        """Number of standard names."""
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        """Whether name is a standard name or an alias of one."""
+        return name in self._positions or name in self.aliases
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Current standard name for a standard name or a deprecated alias.
+
+        Parameters
+        ----------
+        name: str
+            Standard name or alias.
+
+        Returns
+        -------
+        str, None
+            Standard name, or None if name is not in the table.
+        """
+
+        if name in self._positions:
+            return name
+        # aliases point to entries but follow chains to be safe
+        seen = set()
+        while name in self.aliases and name not in seen:
+            seen.add(name)
+            name = self.aliases[name]
+            if name in self._positions:
+                return name
+        return None
+
+    def units(self, name: str) -> Optional[str]:
+        """Canonical units of a standard name or an alias of one.
+
+        Parameters
+        ----------
+        name: str
+            Standard name or alias.
+
+        Returns
+        -------
+        str, None
+            Canonical units, or None if name is not in the table.
+        """
+
+        resolved = self.resolve(name)
+        if resolved is None:
+            return None
+        return self.canonical_units[self._positions[resolved]]
+
+    def description(self, name: str) -> Optional[str]:
+        """Description of a standard name or an alias of one.
+
+        Parameters
+        ----------
+        name: str
+            Standard name or alias.
+
+        Returns
+        -------
+        str, None
+            Description, or None if name is not in the table.
+        """
+
+        resolved = self.resolve(name)
+        if resolved is None:
+            return None
+        return self.descriptions[self._positions[resolved]]
+
+
+def _normalize_units(units: str) -> str:
+    """Spell simple units one way, for example "m/s", "m.s^-1" and "s-1 m" as "m s-1"."""
+
+    units = units.strip().replace("**", "").replace("^", "")
+    units = units.replace("*", " ").replace(".", " ")
+    numerator, _, denominator = units.partition("/")
+    terms = []
+    for sign, part in ((1, numerator), (-1, denominator)):
+        for term in part.split():
+            match = _UNITS_TERM.match(term)
+            if match is None:
+                terms.append(term)
+                continue
+            base, power = match.group(1), sign * int(match.group(2) or 1)
+            terms.append(base if power == 1 else f"{base}{power}")
+    terms = sorted(term for term in terms if term != "1")
+    if len(terms) == 0:
+        return "1"
+    return " ".join(terms)
+
+
+def _dimensions(units: str) -> Optional[Tuple[int, ...]]:
+    """Dimensions of units made of common terms, or None if any term is not known."""
+
+    total = list(_DIMENSIONLESS)
+    for term in _normalize_units(units).split():
+        match = _UNITS_TERM.match(term)
+        base, power = (
+            (term, 1) if match is None else (match.group(1), int(match.group(2) or 1))
+        )
+        dims = _DIMENSIONS.get(base)
+        if dims is None:
+            for prefix in _PREFIXES:
+                if base.startswith(prefix) and base[len(prefix) :] in _DIMENSIONS:
+                    dims = _DIMENSIONS[base[len(prefix) :]]
+                    break
+        if dims is None:
+            try:
+                # a scale factor like "1e-3"
+                float(base)
+            except ValueError:
+                return None
+            dims = _DIMENSIONLESS
+        total = [t + power * d for t, d in zip(total, dims)]
+    return tuple(total)
+
+
+def units_agree(units: str, canonical_units: str) -> Optional[bool]:
+    """Whether units fit canonical units of a standard name.
+
+    Parameters
+    ----------
+    units: str
+        Units to check, for example from a column header.
+    canonical_units: str
+        Canonical units from the CF standard name table.
+
+    Returns
+    -------
+    bool, None
+        True if ``cf_units`` can convert between the units. Without ``cf_units``, True if their
+        normalized spellings or their dimensions are the same, False if their dimensions differ,
+        and None if the units are not common enough to tell.
+    """
+
+    try:
+        import cf_units
+    except ImportError:
+        if _normalize_units(units) == _normalize_units(canonical_units):
+            return True
+        dims, canonical_dims = _dimensions(units), _dimensions(canonical_units)
+        if dims is None or canonical_dims is None:
+            return None
+        return dims == canonical_dims
+
+    try:
+        return cf_units.Unit(units).is_convertible(cf_units.Unit(canonical_units))
+    except ValueError:
+        return False
+
+
+def parse_table(source: Union[str, pathlib.PurePath, IO[bytes]]) -> StandardNameTable:
+    """Parse CF standard name table XML by streaming through it.
+
+    Each entry is stored in columns and then dropped from the XML tree so memory use stays
+    close to the size of the result.
+
+    Parameters
+    ----------
+    source: str, PurePath, file
+        Filename or binary file object of table XML.
+
+    Returns
+    -------
+    StandardNameTable
+        Parsed table.
+    """
+
+    names: List[str] = []
+    columns: Dict[str, List[Optional[str]]] = {
+        "canonical_units": [],
+        "description": [],
+        "grib": [],
+        "amip": [],
+    }
+    aliases: Dict[str, str] = {}
+    header: Dict[str, Optional[str]] = {"version_number": None, "last_modified": None}
+
+    root = None
+    for event, elem in ElementTree.iterparse(source, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+            continue
+
+        if elem.tag == "entry":
+            names.append(elem.get("id"))
+            for tag, column in columns.items():
+                text = elem.findtext(tag)
+                column.append(text.strip() if text is not None else None)
+        elif elem.tag == "alias":
+            entry_id = elem.findtext("entry_id")
+            if entry_id is not None:
+                aliases[elem.get("id")] = entry_id.strip()
+        elif elem.tag in header and elem.text is not None:
+            header[elem.tag] = elem.text.strip()
+        else:
+            continue
+        # children of entries are kept until their entry is done
+        root.clear()
+
+    return StandardNameTable(
+        header["version_number"],
+        tuple(names),
+        tuple(columns["canonical_units"]),
+        tuple(columns["description"]),
+        tuple(columns["grib"]),
+        tuple(columns["amip"]),
+        aliases,
+        header["last_modified"],
+    )
+
+
+def _version(version: Optional[Union[int, str]] = None) -> str:
+    """Version to use, from input or options."""
+
+    if version is None:
+        version = OPTIONS["standard_name_version"]
+    if version is None:
+        version = DEFAULT_VERSION
+    return str(version)
+
+
+def cache_dir(path: Optional[Union[str, pathlib.PurePath]] = None) -> pathlib.Path:
+    """Directory where cf-pandas caches files on disk.
+
+    Parameters
+    ----------
+    path: str, PurePath, optional
+        Use this directory. Otherwise use option "cache_dir", then environment variable ``CF_PANDAS_CACHE_DIR``, then "cf-pandas" in the user cache directory.
+
+    Returns
+    -------
+    Path
+        Cache directory. It is not created here.
+    """
+
+    if path is None:
+        path = OPTIONS["cache_dir"]
+    if path is None:
+        path = os.environ.get("CF_PANDAS_CACHE_DIR")
+    if path is None:
+        base = os.environ.get("XDG_CACHE_HOME", pathlib.Path.home() / ".cache")
+        path = pathlib.Path(base) / "cf-pandas"
+    return pathlib.Path(path)
+
+
+def _cached_path(version: str, cache: pathlib.Path) -> pathlib.Path:
+    return cache / f"cf-standard-name-table-{version}.xml"
+
+
+def _bundled_path(version: str) -> pathlib.Path:
+    return _DATA_DIR / f"cf-standard-name-table-{version}.xml.gz"
+
+
+def bundled_versions() -> List[str]:
+    """Versions of the CF standard name table bundled with cf-pandas.
+
+    Returns
+    -------
+    list
+        Table versions available without network access, besides those in the cache directory.
+    """
+
+    prefix, suffix = "cf-standard-name-table-", ".xml.gz"
+    return sorted(
+        path.name[len(prefix) : -len(suffix)]
+        for path in _DATA_DIR.glob(f"{prefix}*{suffix}")
+    )
+
+
+def _write_atomic(path: pathlib.Path, content: bytes):
+    """Write to a temporary file next to path and move it in place."""
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmpname = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(tmpname, path)
+    except BaseException:
+        os.unlink(tmpname)
+        raise
+
+
+def fetch_table(
+    version: Optional[Union[int, str]] = None,
+    cache: Optional[Union[str, pathlib.PurePath]] = None,
+    url: Optional[str] = None,
+    timeout: float = 30,
+) -> bytes:
+    """Fetch CF standard name table from server into the cache directory.
+
+    If the table is already cached, the request is conditional on it having changed on the server since.
+
+    Parameters
+    ----------
+    version: int, str, optional
+        Version of table. Default is option "standard_name_version", then ``DEFAULT_VERSION``.
+    cache: str, PurePath, optional
+        Cache directory, see ``cache_dir``.
+    url: str, optional
+        Server address of the table, which can contain "{version}". Default is ``URL``.
+    timeout: float
+        Seconds to wait for the server.
+
+    Returns
+    -------
+    bytes
+        Table XML.
+    """
+
+    import requests
+
+    version = _version(version)
+    path = _cached_path(version, cache_dir(cache))
+    headers_path = path.with_suffix(".json")
+
+    headers = {}
+    if path.exists() and headers_path.exists():
+        validators = json.loads(headers_path.read_text())
+        if "ETag" in validators:
+            headers["If-None-Match"] = validators["ETag"]
+        if "Last-Modified" in validators:
+            headers["If-Modified-Since"] = validators["Last-Modified"]
+
+    resp = requests.get(
+        (url or URL).format(version=version), headers=headers, timeout=timeout
+    )
+    if resp.status_code == 304:
+        return path.read_bytes()
+    resp.raise_for_status()
+
+    _write_atomic(path, resp.content)
+    # an index built from an older download of the table is out of date
+    stale_index = path.parent / f"cf-standard-name-index-{version}.bin"
+    if stale_index.exists():
+        stale_index.unlink()
+    validators = {
+        key: resp.headers[key]
+        for key in ("ETag", "Last-Modified")
+        if key in resp.headers
+    }
+    _write_atomic(headers_path, json.dumps(validators).encode())
+    return resp.content
+
+
+def open_table(
+    version: Optional[Union[int, str]] = None,
+    fetch: Optional[bool] = None,
+    cache: Optional[Union[str, pathlib.PurePath]] = None,
+    url: Optional[str] = None,
+) -> IO[bytes]:
+    """Open CF standard name table XML from cache directory, bundled data, or server.
+
+    Parameters
+    ----------
+    version: int, str, optional
+        Version of table. Default is option "standard_name_version", then ``DEFAULT_VERSION``.
+    fetch: bool, optional
+        If None, only go to the server if the table is not available locally. If True, always check the server for a newer table. If False, never use the network.
+    cache: str, PurePath, optional
+        Cache directory, see ``cache_dir``.
+    url: str, optional
+        Server address of the table, which can contain "{version}". Default is ``URL``.
+
+    Returns
+    -------
+    file
+        Binary file object of table XML, to be closed by the caller.
+    """
+
+    version = _version(version)
+    if fetch:
+        return io.BytesIO(fetch_table(version, cache, url))
+
+    path = _cached_path(version, cache_dir(cache))
+    if path.exists():
+        return open(path, "rb")
+
+    bundled = _bundled_path(version)
+    if bundled.exists():
+        return gzip.open(bundled, "rb")
+
+    if fetch is None:
+        return io.BytesIO(fetch_table(version, cache, url))
+
+    raise ValueError(
+        f"CF standard name table version {version} is not available offline. Bundled versions are "
+        f"{bundled_versions()}; use fetch=True to download it into {path.parent}."
+    )
+
+
+def read_table(
+    version: Optional[Union[int, str]] = None,
+    fetch: Optional[bool] = None,
+    cache: Optional[Union[str, pathlib.PurePath]] = None,
+    url: Optional[str] = None,
+) -> bytes:
+    """Read CF standard name table XML from cache directory, bundled data, or server.
+
+    Parameters are as in ``open_table``.
+
+    Returns
+    -------
+    bytes
+        Table XML.
+    """
+
+    with open_table(version, fetch, cache, url) as f:
+        return f.read()
+
+
+def load_table(
+    version: Optional[Union[int, str]] = None,
+    fetch: Optional[bool] = None,
+    cache: Optional[Union[str, pathlib.PurePath]] = None,
+    url: Optional[str] = None,
+) -> StandardNameTable:
+    """CF standard name table, parsed once and remembered for the process.
+
+    Parameters are as in ``open_table``. With ``fetch=True`` the server is checked again even if the table was read before.
+
+    Returns
+    -------
+    StandardNameTable
+        Table with standard names, canonical units, descriptions, and aliases.
+    """
+
+    version = _version(version)
+    key = _source_key(version, cache)
+    if key in _MEMO and not fetch:
+        return _MEMO[key]
+
+    with open_table(version, fetch, cache, url) as f:
+        table = parse_table(f)
+    # fetching may have replaced the cached file
+    _MEMO[_source_key(version, cache)] = table
+    return table
+
+
+def _source_key(
+    version: str, cache: Optional[Union[str, pathlib.PurePath]]
+) -> Tuple[str, str, Optional[int]]:
+    """Version, cached path and its modification time, which change when another table would be read."""
+
+    path = _cached_path(version, cache_dir(cache)).resolve()
+    try:
+        mtime: Optional[int] = path.stat().st_mtime_ns
+    except OSError:
+        mtime = None
+    return version, str(path), mtime
+
+
+def load_names(
+    version: Optional[Union[int, str]] = None,
+    fetch: Optional[bool] = None,
+    cache: Optional[Union[str, pathlib.PurePath]] = None,
+    url: Optional[str] = None,
+) -> Tuple[str, ...]:
+    """Standard names of CF standard name table, remembered for the process.
+
+    Parameters are as in ``load_table``.
+
+    Returns
+    -------
+    tuple
+        All CF standard_names.
+    """
+
+    return load_table(version, fetch, cache, url).names
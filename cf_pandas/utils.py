@@ -2,14 +2,15 @@
 Utilities for cf-pandas.
 """
 
-from collections import ChainMap
-from typing import Any, Iterable, Optional, Union
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
-import regex
 from pandas import Series
 
+from .compiled import CompiledCriteria
 from .options import OPTIONS
 
 
@@ -32,19 +33,27 @@ def astype(value, type_):
     return value
 
 
-def set_up_criteria(criteria: Union[dict, Iterable] = None) -> ChainMap:
+# id of criteria -> (criteria, snapshot, compiled criteria), most recently used last
+_COMPILED: "OrderedDict[int, Tuple[Any, Any, CompiledCriteria]]" = OrderedDict()
+_MAX_COMPILED = 32
+_COMPILED_LOCK = threading.Lock()
+
+
+def set_up_criteria(criteria: Union[dict, Iterable] = None) -> CompiledCriteria:
     """Get custom criteria from options.
 
     Parameters
     ----------
     criteria : dict, optional
         Criteria to use to map from variable to attributes describing the variable. If user has defined
-        custom_criteria, this will be used by default.
+        custom_criteria, this will be used by default. Mappings like ``LazyVocab`` and ``Vocab`` objects
+        can be used too.
 
     Returns
     -------
-    ChainMap
-        Criteria
+    CompiledCriteria
+        Criteria. For the criteria from options, this is the same object until the options change,
+        and for other criteria until their content changes.
     """
 
     if criteria is None:
@@ -52,14 +61,77 @@ def set_up_criteria(criteria: Union[dict, Iterable] = None) -> ChainMap:
             raise ValueError(
                 "criteria needs to be defined either using set_options or directly input."
             )
-        criteria_it = OPTIONS["custom_criteria"]
-    else:
-        criteria_it = always_iterable(criteria, allowed=(tuple, list, set))
+        return OPTIONS["custom_criteria"]
+    if isinstance(criteria, CompiledCriteria):
+        return criteria
 
     # # Add in coordinate_criteria to be able to identify coordinates too
     # criteria_it[0].update(coordinate_criteria)
 
-    return ChainMap(*criteria_it)
+    # the same criteria are often passed to every call, so their compiled patterns and
+    # fingerprint are kept while their content is unchanged
+    snapshot = _snapshot(criteria)
+    with _COMPILED_LOCK:
+        memo = _COMPILED.get(id(criteria))
+        if memo is not None and memo[0] is criteria and memo[1] == snapshot:
+            _COMPILED.move_to_end(id(criteria))
+            return memo[2]
+    # not copied, since the snapshot tells when criteria change
+    compiled = CompiledCriteria(criteria, copy=False)
+    with _COMPILED_LOCK:
+        # keeping criteria keeps their id from being reused
+        _COMPILED[id(criteria)] = (criteria, snapshot, compiled)
+        if len(_COMPILED) > _MAX_COMPILED:
+            _COMPILED.popitem(last=False)
+    return compiled
+
+
+def _snapshot(criteria: Any) -> Any:
+    """Content of criteria that can change, cheap to make and compare."""
+
+    if isinstance(criteria, (tuple, list, set)):
+        return tuple(_snapshot(crit) for crit in criteria)
+    # Vocab objects hold their criteria in .vocab
+    crit = getattr(criteria, "vocab", criteria)
+    if isinstance(crit, dict):
+        return tuple(
+            (key, tuple(attrs.items()) if isinstance(attrs, dict) else attrs)
+            for key, attrs in crit.items()
+        )
+    # other mappings, like LazyVocab, are read-only
+    return id(crit)
+
+
+def header_index(
+    available_values: Iterable[str], split: bool = True
+) -> Dict[str, List[str]]:
+    """Map tokens of available values to the values they come from.
+
+    Parameters
+    ----------
+    available_values: Iterable
+        Strings to index, for example the columns of a DataFrame.
+    split : bool, optional
+        If split is True, split the available_values by white space and index each part. This is helpful e.g. when columns headers have the form "standard_name (units)" and you want to look up standard_name.
+
+    Returns
+    -------
+    dict
+        Token to list of available_values containing that token, in order of first appearance.
+
+    Notes
+    -----
+    Build this once for a set of headers and probe it with exact tokens instead of running a regular expression over every header for every candidate.
+    """
+
+    index: Dict[str, List[str]] = {}
+    for value in available_values:
+        tokens = value.split() if split else [value]
+        for token in tokens:
+            values = index.setdefault(token, [])
+            if value not in values:
+                values.append(value)
+    return index
 
 
 def match_criteria_key(
@@ -92,6 +164,41 @@ def match_criteria_key(
     """
 
     custom_criteria = set_up_criteria(criteria)
+    keys_to_match = astype(keys_to_match, list)
+
+    if OPTIONS["resolution_cache"]:
+        from .resolution_cache import cached_resolution
+
+        # all keys are resolved and kept at once, for the next call with other keys
+        available_values = list(available_values)
+        resolved = cached_resolution(
+            "match_criteria_key",
+            available_values,
+            lambda: {
+                key: _match_criteria_key(available_values, key, custom_criteria, split)
+                for key in custom_criteria
+            },
+            extra=split,
+            fingerprint=custom_criteria.fingerprint,
+        )
+        results = []
+        for key in keys_to_match:
+            if key in resolved:
+                results.extend(resolved[key])
+            elif key in available_values:
+                results.append(key)
+        return list(set(results))
+
+    return _match_criteria_key(available_values, keys_to_match, custom_criteria, split)
+
+
+def _match_criteria_key(
+    available_values: list,
+    keys_to_match: Union[str, list],
+    custom_criteria: CompiledCriteria,
+    split: bool,
+) -> list:
+    """``match_criteria_key`` for prepared criteria, without the resolution cache."""
 
     keys_to_match = astype(keys_to_match, list)
     results = []
@@ -100,7 +207,7 @@ def match_criteria_key(
         if custom_criteria is not None and key in custom_criteria:
             # criterion is the attribute type — in this function we don't use it,
             # instead we use all the patterns available in criteria to match with available_values
-            for criterion, patterns in custom_criteria[key].items():
+            for criterion, matcher in custom_criteria.patterns(key):
                 if split:
                     results.extend(
                         list(
@@ -109,7 +216,7 @@ def match_criteria_key(
                                     value
                                     for value in available_values
                                     for value_part in value.split()
-                                    if regex.match(patterns, value_part)
+                                    if matcher.match(value_part)
                                 ]
                             )
                         )
@@ -122,7 +229,7 @@ def match_criteria_key(
                                 [
                                     value
                                     for value in available_values
-                                    if regex.match(patterns, value)
+                                    if matcher.match(value)
                                 ]
                             )
                         )
@@ -135,25 +242,33 @@ def match_criteria_key(
     return list(set(results))
 
 
-def standard_names():
+def standard_names(
+    version: Optional[Union[int, str]] = None,
+    fetch: Optional[bool] = None,
+    cache_dir: Optional[str] = None,
+) -> list:
     """Returns list of CF standard_names.
 
+    The table is read once per process, from the cache directory if it was fetched before, otherwise from the tables bundled with cf-pandas, and only otherwise from cfconventions.org.
+
+    Parameters
+    ----------
+    version: int, str, optional
+        Version of the CF standard name table. Default is option "standard_name_version", then the bundled version.
+    fetch: bool, optional
+        If None, only download the table if it is not available offline. If True, check the server for a newer table (a conditional request if it was downloaded before). If False, never use the network.
+    cache_dir: str, optional
+        Directory for downloaded tables. Default is option "cache_dir", then environment variable ``CF_PANDAS_CACHE_DIR``, then "cf-pandas" in the user cache directory.
+
     Returns
     -------
     list
         All CF standard_names
     """
 
-    import requests
-    from bs4 import BeautifulSoup
-
-    url = "https://cfconventions.org/Data/cf-standard-names/79/src/cf-standard-name-table.xml"
-    req = requests.get(url)
-    soup = BeautifulSoup(req.content, features="xml")
-
-    standard_names = [entry.get("id") for entry in soup.find_all("entry")]
+    from .standard_name_table import load_names
 
-    return standard_names
+    return list(load_names(version, fetch, cache_dir))
 
 
 def _is_datetime_like(da: Series) -> bool:
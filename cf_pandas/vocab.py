@@ -1,27 +1,204 @@
 """Class for creating and working with vocabularies."""
 
+import hashlib
 import json
+import os
 import pathlib
+import sqlite3
+import tempfile
+import threading
 from collections import defaultdict
-from typing import DefaultDict, Dict, Optional, Sequence, Union
-
+from typing import (
+    DefaultDict,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import pandas as pd
+
+from .compiled import (
+    CompiledPattern,
+    _mapping_fingerprint,
+    _remember,
+    _split_alternatives,
+    compile_pattern,
+)
 from .utils import astype
 
+# nickname -> attribute -> alternatives, as a dict used as an ordered set
+Entries = Dict[str, Dict[str, Dict[str, None]]]
+
+
+_COMPILED_FORMAT = "cf-pandas-compiled-vocab"
+_COMPILED_VERSION = 1
+
+
+def _content_hash(entries: dict, patterns: dict) -> str:
+    """sha256 of entries and their patterns, independent of key order and formatting."""
+
+    content = json.dumps(
+        {"entries": entries, "patterns": patterns},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def _compile_entries(entries: Entries) -> dict:
+    """Content of a compiled vocab file."""
+
+    alternatives = {
+        nickname: {attr: list(alternatives) for attr, alternatives in attrs.items()}
+        for nickname, attrs in entries.items()
+    }
+    patterns = {
+        nickname: {
+            attr: compile_pattern("|".join(alternatives)).to_dict()
+            for attr, alternatives in attrs.items()
+        }
+        for nickname, attrs in alternatives.items()
+    }
+    return {
+        "format": _COMPILED_FORMAT,
+        "version": _COMPILED_VERSION,
+        "sha256": _content_hash(alternatives, patterns),
+        "entries": alternatives,
+        "patterns": patterns,
+    }
+
+
+def _load_compiled(content: dict) -> Dict[str, Dict[str, List[str]]]:
+    """Check content of a compiled vocab file and make its patterns ready to match.
+
+    Returns the alternatives of each entry.
+    """
+
+    if content.get("version") != _COMPILED_VERSION:
+        raise ValueError(
+            f"Compiled vocab version {content.get('version')} is not supported."
+        )
+    entries, patterns = content.get("entries"), content.get("patterns")
+    if not isinstance(entries, dict) or not isinstance(patterns, dict):
+        raise ValueError("Compiled vocab is missing its entries or patterns.")
+    if _content_hash(entries, patterns) != content.get("sha256"):
+        raise ValueError("Compiled vocab does not match its content hash.")
+    for nickname, attrs in entries.items():
+        for attr, alternatives in attrs.items():
+            pattern = "|".join(alternatives)
+            try:
+                _remember(CompiledPattern.from_dict(pattern, patterns[nickname][attr]))
+            except KeyError:
+                raise ValueError(
+                    f"Compiled vocab is missing the pattern for {nickname!r}, {attr!r}."
+                )
+    return entries
+
 
 class Vocab(object):
-    """Class to handle vocabularies."""
+    """Class to handle vocabularies.
+
+    Each nickname and attribute holds an ordered list of regular expressions without
+    duplicates. ``vocab`` shows them piped together into one expression each.
+    """
 
     def __init__(self, openname: Optional[str] = None):
-        self.vocab: DefaultDict[str, Dict[str, str]]
+        self._vocab: DefaultDict[str, Dict[str, str]] = defaultdict(dict)
+        # (nickname, attr) -> expression last written to _vocab and the alternatives, which may
+        # have more alternatives than the expression if (nickname, attr) is in _dirty
+        self._split: Dict[Tuple[str, str], Tuple[Optional[str], Dict[str, None]]] = {}
+        # alternatives added since their expression was written, used as an ordered set
+        self._dirty: Dict[Tuple[str, str], None] = {}
         if openname is not None:
-            self.vocab = defaultdict(dict, self.open_file(openname))
-        else:
-            self.vocab = defaultdict(dict)
+            self.vocab = self.open_file(openname)
 
     def __repr__(self):
         """Representation."""
         return dict(self.vocab).__repr__()
 
+    @property
+    def vocab(self) -> DefaultDict[str, Dict[str, str]]:
+        """Vocabulary mapping nickname to attribute to regular expression.
+
+        Expressions are joined from the stored alternatives when first needed. Changes made to
+        this dictionary are kept by later calls to ``make_entry`` and adding.
+        """
+
+        for nickname, attr in self._dirty:
+            alternatives = self._split[(nickname, attr)][1]
+            expression = "|".join(alternatives)
+            self._vocab[nickname][attr] = expression
+            self._split[(nickname, attr)] = (expression, alternatives)
+        self._dirty = {}
+        return self._vocab
+
+    @vocab.setter
+    def vocab(self, vocab: Mapping[str, Mapping[str, str]]):
+        self._vocab = defaultdict(dict)
+        self._split = {}
+        self._dirty = {}
+        self._extend(vocab)
+
+    def _alternatives(self, nickname: str, attr: str) -> Dict[str, None]:
+        """Alternatives for nickname and attr, as a dict used as an ordered set."""
+
+        expression = (
+            self._vocab[nickname].get(attr) if nickname in self._vocab else None
+        )
+        split = self._split.get((nickname, attr))
+        if split is not None and split[0] == expression:
+            return split[1]
+        # expression was set in vocab directly, so it replaces what was stored
+        self._dirty.pop((nickname, attr), None)
+        alternatives = (
+            dict.fromkeys(_split_alternatives(expression)) if expression else {}
+        )
+        self._split[(nickname, attr)] = (expression, alternatives)
+        return alternatives
+
+    @property
+    def _entries(self) -> Entries:
+        """Alternatives of every nickname and attribute."""
+
+        keys = dict.fromkeys(
+            (nickname, attr)
+            for nickname, attrs in self._vocab.items()
+            for attr in attrs
+        )
+        keys.update(self._dirty)
+        entries: Entries = {}
+        for nickname, attr in keys:
+            entries.setdefault(nickname, {})[attr] = self._alternatives(nickname, attr)
+        return entries
+
+    def _extend(self, other_vocab: Union[Mapping[str, Mapping[str, str]], "Vocab"]):
+        """Append alternatives of other_vocab that are not present yet, in place."""
+
+        if isinstance(other_vocab, Vocab):
+            other_entries = other_vocab._entries.items()
+        else:
+            other_entries = (
+                (
+                    nickname,
+                    {
+                        attr: dict.fromkeys(_split_alternatives(expressions))
+                        for attr, expressions in attrs.items()
+                    },
+                )
+                for nickname, attrs in other_vocab.items()
+            )
+
+        for nickname, attrs in other_entries:
+            self._vocab.setdefault(nickname, {})
+            for attr, alternatives in attrs.items():
+                self._alternatives(nickname, attr).update(alternatives)
+                self._dirty[(nickname, attr)] = None
+
     def make_entry(
         self, nickname: str, expressions: Union[str, list], attr: str = "standard_name"
     ):
@@ -32,7 +209,7 @@ class Vocab(object):
         nickname: str
             The nickname to call the variable being represented in this entry.
         expressions: str, list
-            Regular expression(s) to use to select out the variable in a regex match. Multiple expressions input in a list are piped together to create one str of expressions.
+            Regular expression(s) to use to select out the variable in a regex match. Multiple expressions input in a list are piped together to create one str of expressions. Expressions already in the entry are not repeated.
         attr: str
             What attribute to identify the regular expressions with. Default is "standard_name", but other reasonable options are any variable attributes in a netcdf file such as "units", "name", and "long_name".
 
@@ -48,9 +225,7 @@ class Vocab(object):
         """
 
         expressions = astype(expressions, list)
-        entry: DefaultDict[str, Dict[str, str]] = defaultdict(dict)
-        entry[nickname][attr] = "|".join(expressions)
-        self.__iadd__(entry)
+        self._extend({nickname: {attr: "|".join(expressions)}})
 
         return self
 
@@ -59,7 +234,7 @@ class Vocab(object):
     ) -> "Vocab":
         """Add two Vocab objects together...
 
-        by adding their `.vocab`s together. Expressions are piped together but otherwise not changed.
+        by adding their `.vocab`s together. Expressions are piped together, skipping any that are already present, but otherwise not changed.
         This is used for both `__add__` and `__iadd__`.
 
         Parameters
@@ -75,30 +250,13 @@ class Vocab(object):
             vocab + other_vocab either as a new object or in place.
         """
 
-        if isinstance(other_vocab, Vocab):
-            other_vocab = other_vocab.vocab
-
         if method == "add":
             output = Vocab()
+            output._extend(self)
         elif method == "iadd":
             output = self
 
-        nicknames = set(list(self.vocab.keys()) + list(other_vocab.keys()))
-        for nickname in nicknames:
-
-            # gather all attributes under nickname as a set to compare their expressions
-            attributes = set(
-                list(self.vocab[nickname].keys()) + list(other_vocab[nickname].keys())
-            )
-
-            # pipe together expressions for nickname-attribute pairs
-            for attribute in attributes:
-                new_expressions = (
-                    self.vocab[nickname].get(attribute, "")
-                    + "|"
-                    + other_vocab[nickname].get(attribute, "")
-                ).strip("|")
-                output.vocab[nickname][attribute] = new_expressions
+        output._extend(other_vocab)
         return output
 
     def __add__(self, other_vocab: Union[DefaultDict[str, Dict[str, str]], "Vocab"]):
@@ -115,16 +273,51 @@ class Vocab(object):
         """right add?"""
         return self.__add__(other_vocab)
 
-    def save(self, savename: Union[str, pathlib.PurePath]):
+    def analyze(self, sample: Optional[Iterable[str]] = None) -> "pd.DataFrame":
+        """Estimate the cost of every pattern and list likely problems.
+
+        Parameters
+        ----------
+        sample: Iterable, optional
+            Column names or attribute values to time every pattern against.
+
+        Returns
+        -------
+        DataFrame
+            See ``cf_pandas.analyze.analyze_vocab``.
+        """
+
+        from .analyze import analyze_vocab
+
+        return analyze_vocab(self.vocab, sample)
+
+    def save(
+        self,
+        savename: Union[str, pathlib.PurePath],
+        compiled: bool = False,
+        indexed: bool = False,
+    ):
         """Save to file.
 
         Parameters
         ----------
         savename: str, PurePath
             Filename to save to.
+        compiled: bool
+            If True, save the alternatives of each entry with a content hash and the literals and validated expressions the matcher uses, so that opening the file skips that work. Such a file is opened like any other saved vocab.
+        indexed: bool
+            If True, save to a sqlite database with suffix ".sqlite" instead, indexed by nickname. Open it with ``LazyVocab`` to read entries only when they are used.
         """
+
+        if indexed:
+            _write_indexed(self.vocab, astype(savename, pathlib.PurePath))
+            return
+        if compiled:
+            content = _compile_entries(self._entries)
+        else:
+            content = self.vocab
         a_file = open(astype(savename, pathlib.PurePath).with_suffix(".json"), "w")
-        json.dump(self.vocab, a_file)
+        json.dump(content, a_file)
         a_file.close()
 
     def open_file(self, openname: Union[str, pathlib.PurePath]):
@@ -134,15 +327,202 @@ class Vocab(object):
         ----------
         openname: str
             Where to find vocab to open.
+
+        Notes
+        -----
+        For a file saved with ``compiled=True``, the content hash is checked and every expression is compiled now, so an invalid file raises ValueError here instead of on first match.
         """
-        return json.loads(
+        content = json.loads(
             open(pathlib.PurePath(openname).with_suffix(".json"), "r").read()
         )
+        if content.get("format") == _COMPILED_FORMAT:
+            return {
+                nickname: {
+                    attr: "|".join(alternatives) for attr, alternatives in attrs.items()
+                }
+                for nickname, attrs in _load_compiled(content).items()
+            }
+        return content
+
+
+def _write_indexed(vocab: Mapping[str, Mapping[str, str]], savename: pathlib.PurePath):
+    """Write vocab to a sqlite database, replacing any existing file."""
+
+    path = pathlib.Path(savename).with_suffix(".sqlite")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmpname = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    os.close(fd)
+    try:
+        con = sqlite3.connect(tmpname)
+        with con:
+            con.execute(
+                "CREATE TABLE vocab (nickname TEXT, attr TEXT, expression TEXT, "
+                "PRIMARY KEY (nickname, attr)) WITHOUT ROWID"
+            )
+            # so criteria can be told apart without reading every entry
+            con.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+            con.execute(
+                "INSERT INTO meta VALUES ('fingerprint', ?)",
+                (_mapping_fingerprint(vocab),),
+            )
+            con.executemany(
+                "INSERT INTO vocab VALUES (?, ?, ?)",
+                (
+                    (nickname, attr, expression)
+                    for nickname, attrs in vocab.items()
+                    for attr, expression in attrs.items()
+                ),
+            )
+        con.close()
+        os.replace(tmpname, path)
+    except BaseException:
+        os.unlink(tmpname)
+        raise
+
+
+class LazyVocab(Mapping):
+    """Read-only vocabulary in a sqlite database that reads entries when first used.
+
+    Behaves like ``Vocab.vocab``, mapping nickname to attribute to regular expression, so it
+    can be used as criteria directly or with ``set_options(custom_criteria=...)``. Only the
+    entries that are looked up are read from the file and kept in memory.
+
+    Parameters
+    ----------
+    openname: str, PurePath
+        Database written by ``Vocab.save(..., indexed=True)``.
+
+    Examples
+    --------
+    >>> vocab.save("vocab", indexed=True)
+    >>> lazy = cfp.LazyVocab("vocab.sqlite")
+    >>> with cfp.set_options(custom_criteria=lazy):
+    ...     df.cf["temp"]
+    """
+
+    def __init__(self, openname: Union[str, pathlib.PurePath]):
+        self.path = pathlib.Path(openname).with_suffix(".sqlite")
+        if not self.path.exists():
+            raise FileNotFoundError(self.path)
+        self._con = sqlite3.connect(
+            f"{self.path.absolute().as_uri()}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+        )
+        # the connection and what was read from it are shared by threads
+        self._lock = threading.Lock()
+        # nickname -> attribute -> expression, for entries read so far
+        self._loaded: Dict[str, Dict[str, str]] = {}
+        self._nicknames: Optional[List[str]] = None
+        self._fingerprint: Optional[str] = None
+
+    def __repr__(self):
+        """Representation."""
+        return f"<LazyVocab {str(self.path)!r} loaded={len(self._loaded)}/{len(self)}>"
+
+    def __getitem__(self, nickname: str) -> Dict[str, str]:
+        """Entry for nickname, read from the file on first access."""
+
+        with self._lock:
+            if nickname not in self._loaded:
+                rows = self._con.execute(
+                    "SELECT attr, expression FROM vocab WHERE nickname = ?",
+                    (nickname,),
+                ).fetchall()
+                if len(rows) == 0:
+                    raise KeyError(nickname)
+                self._loaded[nickname] = dict(rows)
+            return self._loaded[nickname]
+
+    def __contains__(self, nickname) -> bool:
+        """Whether nickname has an entry, without reading the entry."""
+
+        with self._lock:
+            if nickname in self._loaded:
+                return True
+            row = self._con.execute(
+                "SELECT 1 FROM vocab WHERE nickname = ? LIMIT 1", (nickname,)
+            ).fetchone()
+            return row is not None
+
+    def _all_nicknames(self) -> List[str]:
+        with self._lock:
+            if self._nicknames is None:
+                self._nicknames = [
+                    nickname
+                    for (nickname,) in self._con.execute(
+                        "SELECT DISTINCT nickname FROM vocab ORDER BY nickname"
+                    )
+                ]
+            return self._nicknames
+
+    def __iter__(self):
+        """Nicknames, without reading their entries."""
+        return iter(self._all_nicknames())
+
+    def __len__(self):
+        """Number of nicknames."""
+        return len(self._all_nicknames())
+
+    def __deepcopy__(self, memo):
+        """Read-only, so copies share the open database."""
+        return self
+
+    def __reduce__(self):
+        """Pickle by file name."""
+        return (LazyVocab, (self.path,))
+
+    @property
+    def fingerprint(self) -> str:
+        """sha256 of the content, the same as ``CompiledCriteria.fingerprint`` of the vocab.
+
+        It is stored in the file when it is written, so entries are not read for it.
+        """
+
+        if self._fingerprint is None:
+            with self._lock:
+                try:
+                    row = self._con.execute(
+                        "SELECT value FROM meta WHERE key = 'fingerprint'"
+                    ).fetchone()
+                except sqlite3.OperationalError:
+                    # written without a meta table
+                    row = None
+            if row is None:
+                self._fingerprint = _mapping_fingerprint(self._read_all())
+            else:
+                self._fingerprint = row[0]
+        return self._fingerprint
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            self._con.close()
+
+    def _read_all(self) -> Dict[str, Dict[str, str]]:
+        """All entries, without keeping them."""
+
+        entries: Dict[str, Dict[str, str]] = {}
+        with self._lock:
+            for nickname, attr, expression in self._con.execute(
+                "SELECT nickname, attr, expression FROM vocab"
+            ):
+                entries.setdefault(nickname, {})[attr] = expression
+        return entries
+
+    def to_vocab(self) -> Vocab:
+        """Read all entries into a Vocab."""
+
+        vocab = Vocab()
+        vocab._extend(self._read_all())
+        return vocab
 
 
 def merge(vocabs: Sequence[Vocab]) -> Vocab:
     """Add together multiple Vocab objects.
 
+    Each input is added once into the result, so this takes time proportional to the total size of the inputs. Expressions repeated across vocabs are kept once, in order of first appearance.
+
     Parameters
     ----------
     vocabs : Sequence[Vocab]
@@ -1,19 +1,188 @@
 """Widget"""
 
-from typing import DefaultDict, Dict, Optional, Sequence, Union
+import functools
+import threading
+from collections import OrderedDict
+from typing import DefaultDict, Dict, List, Optional, Sequence, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
-from .reg import Reg
+from .reg import Reg, _literal
+from .search import rank_options
 from .utils import astype
 from .vocab import Vocab
 
 
+def _on_kernel_loop(func, *args):
+    """Call func on the event loop of the IPython kernel, where widgets are changed, or now without a kernel."""
+
+    try:
+        from IPython import get_ipython
+
+        io_loop = getattr(getattr(get_ipython(), "kernel", None), "io_loop", None)
+    except ImportError:
+        io_loop = None
+    if io_loop is None:
+        func(*args)
+    else:
+        io_loop.add_callback(func, *args)
+
+
+@functools.lru_cache(maxsize=128)
+def _reg(include: str, exclude: str) -> Reg:
+    """Reg for widget inputs, made and compiled once per combination of inputs."""
+    return Reg(include=include, exclude=exclude)
+
+
+class OptionsIndex(object):
+    """Options for the dropdown with an index that makes repeated filtering fast.
+
+    Options are filtered as in ``dropdown``, by the pattern of ``Reg(include=..., exclude=...)``,
+    but only options that can match are checked:
+
+    * When the include text extends an earlier one with the same exclude, as when typing,
+      only the earlier results are checked.
+    * Otherwise, options containing each trigram of the lowercased include text are found from
+      postings, computed with one vectorized scan the first time the trigram is used and then kept.
+    * Recent results are kept by (include, exclude).
+
+    Parameters
+    ----------
+    options: Sequence
+        Strings to select from.
+    cache_size: int
+        Number of recent (include, exclude) results to keep.
+    """
+
+    n = 3
+
+    def __init__(self, options: Union[Sequence, pd.Series], cache_size: int = 64):
+        self.options = astype(options, pd.Series)
+        self._lower = self.options.astype(str).str.lower()
+        # options that lowercasing might not match the way the regular expression does
+        self._nonascii = np.flatnonzero(
+            ~self.options.map(lambda value: isinstance(value, str) and value.isascii())
+        )
+        self._postings: Dict[str, np.ndarray] = {}
+        self._cache: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self.cache_size = cache_size
+
+    def __len__(self):
+        """Number of options."""
+        return len(self.options)
+
+    def __repr__(self):
+        """Representation."""
+        return f"<OptionsIndex options={len(self)} trigrams={len(self._postings)}>"
+
+    def _trigram_ids(self, text: str) -> Optional[np.ndarray]:
+        """Ids of options containing every trigram of text, or None if text is too short."""
+
+        ids = None
+        for gram in dict.fromkeys(text[i : i + self.n] for i in range(len(text) - 2)):
+            if gram not in self._postings:
+                self._postings[gram] = np.flatnonzero(
+                    self._lower.str.contains(gram, regex=False).to_numpy(dtype=bool)
+                )
+            postings = self._postings[gram]
+            ids = postings if ids is None else np.intersect1d(ids, postings, True)
+        return ids
+
+    def _candidates(self, include: str, exclude: str) -> np.ndarray:
+        """Ids of options that might match, a superset of the matches."""
+
+        text = _literal(include) if include != "" else None
+        if text is None:
+            return np.arange(len(self))
+        text = text.lower()
+
+        # smallest earlier result for an include text that this one extends
+        ids = None
+        for (previous, previous_exclude), previous_ids in self._cache.items():
+            previous_text = _literal(previous) if previous != "" else None
+            if (
+                previous_exclude == exclude
+                and previous_text is not None
+                and previous_text.lower() in text
+                and (ids is None or len(previous_ids) < len(ids))
+            ):
+                ids = previous_ids
+        if ids is not None:
+            return ids
+
+        ids = self._trigram_ids(text)
+        if ids is None:
+            return np.arange(len(self))
+        return np.union1d(ids, self._nonascii)
+
+    def filter_ids(self, include: str = "", exclude: str = "") -> np.ndarray:
+        """Positions of options that match.
+
+        Parameters
+        ----------
+        include, exclude: str
+            As for ``dropdown``.
+
+        Returns
+        -------
+        ndarray
+            Sorted positions in ``options``.
+        """
+
+        key = (include, exclude)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        ids = self._candidates(include, exclude)
+        ids = ids[_reg(include, exclude).match(self.options.iloc[ids])]
+
+        self._cache[key] = ids
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return ids
+
+    def filter(self, include: str = "", exclude: str = "") -> pd.Series:
+        """Options that match.
+
+        Parameters
+        ----------
+        include, exclude: str
+            As for ``dropdown``.
+
+        Returns
+        -------
+        Series
+            Matching options, same as ``Reg(include=include, exclude=exclude).filter(options)``.
+        """
+
+        return self.options.iloc[self.filter_ids(include, exclude)]
+
+
+def _filter_options(
+    options: Union[Sequence, pd.Series, OptionsIndex],
+    include: str,
+    exclude: str,
+    search: str,
+) -> pd.Series:
+    """Options left by include, exclude and search inputs, as shown in the dropdown."""
+
+    if isinstance(options, OptionsIndex):
+        filtered = options.filter(include, exclude)
+    else:
+        filtered = _reg(include, exclude).filter(options)
+    if search != "":
+        filtered = pd.Series(rank_options(filtered, search), dtype=object)
+    return filtered
+
+
 def dropdown(
     nickname: str,
     options: Union[Sequence, pd.Series],
     include: str = "",
     exclude: str = "",
+    search: str = "",
 ):
     """Makes widget that is used by class.
 
@@ -23,19 +192,19 @@ def dropdown(
     ----------
     nickname: str
         nickname to associate with the Vocab class vocabulary entry from this, e.g., "temp". Inputting this to the function creates a text box for the user to enter it into.
-    options: Sequence
-        strings to select from in the dropdown widget. Will be filtered by include and exclude inputs.
+    options: Sequence, OptionsIndex
+        strings to select from in the dropdown widget. Will be filtered by include and exclude inputs. Input an ``OptionsIndex`` to filter many options repeatedly.
     include: str
         include must be in options values for them to show in the dropdown. Will update as more are input. To input more than one, join separate strings with "|". For example, to search on both "temperature" and "sea_water", input "temperature|sea_water".
     exclude: str
         exclude must not be in options values for them to show in the dropdown. Will update as more are input. To input more than one, join separate strings with "|". For example, to exclude both "temperature" and "sea_water", input "temperature|sea_water".
+    search: str
+        Words to search for in CF standard names and their descriptions, for example "salinity". If input, only options that are standard names found by ``search_standard_names`` are shown, best match first.
     """
     import ipywidgets as widgets
 
-    reg = Reg(include=include, exclude=exclude)
-    print("Regular expression: ", reg.pattern())
-    options = astype(options, pd.Series)
-    options2 = options[options.str.match(reg.pattern())]
+    print("Regular expression: ", _reg(include, exclude).pattern())
+    options2 = _filter_options(options, include, exclude, search)
 
     widg = widgets.SelectMultiple(
         options=options2,
@@ -53,6 +222,10 @@ class Selector(object):
 
     Options are filtered by a regular expression written to reflect the include and exclude inputs, and these are updated when changed and shown in the dropdown. The user should select using `command` or `control` to make multiple options. Then push the "save" button when the nickname and selected options from the dropdown menu are the variables you want to include exactly in a future regular expression search.
 
+    Only one page of matching options is shown, and sent to the browser, at a time. Move between pages with the page buttons and narrow the matches further with the refine box; options stay selected when changing pages.
+
+    Filtering runs on a background thread once typing pauses for ``debounce`` seconds, so the notebook stays responsive with many options, and the result is shown from the kernel's event loop. Input that changes again before a filter finishes makes its result stale, and stale results are dropped instead of shown.
+
     Examples
     --------
 
@@ -74,6 +247,9 @@ class Selector(object):
         nickname_in: str = "",
         include_in: str = "",
         exclude_in: str = "",
+        search_in: str = "",
+        debounce: float = 0.3,
+        page_size: int = 100,
     ):
         """Initialize Selector object.
 
@@ -89,6 +265,12 @@ class Selector(object):
             Default include, used for initial value, useful for testing
         exclude_in: str
             Default exclude, used for initial value, useful for testing
+        search_in: str
+            Default words to search for in standard names and their descriptions, used for initial value
+        debounce: float
+            Seconds to wait after the last change to include, exclude or search before filtering.
+        page_size: int
+            Number of matching options shown, and sent to the browser, at a time. Use the page buttons to see others.
         """
         import ipywidgets as widgets
 
@@ -100,29 +282,243 @@ class Selector(object):
         else:
             self.vocab = vocab
 
-        self.dropdown_values: Sequence = []
-        self.include = include_in
-        self.exclude = exclude_in
-
+        self.debounce = debounce
+        self.page_size = page_size
+        self.page = 0
+        # all options for the current input, those left by refine, and selected ones in order
+        self._matches: List[str] = []
+        self._refined: List[str] = []
+        self.selected: Dict[str, None] = {}
+        # set while the dropdown is changed here, so its observer ignores the change
+        self._updating = False
+
+        # index once, so filtering while typing does not rescan all options
+        self.options = OptionsIndex(options)
+
+        self.nickname_text = widgets.Text(value=nickname_in, description="nickname")
+        self.include_text = widgets.Text(value=include_in, description="include")
+        self.exclude_text = widgets.Text(value=exclude_in, description="exclude")
+        self.search_text = widgets.Text(value=search_in, description="search")
+        self.dropdown = widgets.SelectMultiple(
+            options=[],
+            rows=10,
+            description="Options",
+            disabled=False,
+            layout=widgets.Layout(width="50%"),
+        )
+        self.status = widgets.Label()
+        self.refine_text = widgets.Text(description="refine")
+        self.button_prev = widgets.Button(description="Previous page")
+        self.button_next = widgets.Button(description="Next page")
         self.button_save = widgets.Button(description="Press to save")
 
-        self.nickname_text = widgets.Text(value=nickname_in)
-        self.nickname = self.nickname_text.value
+        # the generation counts input changes; _shown is the generation on display.
+        # _state_lock guards these, the selection and the timer briefly, and is reentrant since
+        # changing the dropdown calls its observer; _filter_lock runs one filter at a time
+        self._state_lock = threading.RLock()
+        self._filter_lock = threading.Lock()
+        self._generation = 0
+        self._shown = -1
+        self._timer: Optional[threading.Timer] = None
+
+        self._refresh(self._generation)
+        for text in (self.include_text, self.exclude_text, self.search_text):
+            text.observe(self._input_changed, names="value")
+        self.refine_text.observe(self._refine_changed, names="value")
+        self.dropdown.observe(self._selection_changed, names="value")
+        self.button_prev.on_click(lambda button: self.prev_page())
+        self.button_next.on_click(lambda button: self.next_page())
 
-        self.dropdown = widgets.interact(
-            dropdown,
-            options=widgets.fixed(options),
-            nickname=self.nickname,
-            include=self.include,
-            exclude=self.exclude,
-        )
         from IPython.display import display
 
+        display(
+            widgets.VBox(
+                [
+                    self.nickname_text,
+                    self.include_text,
+                    self.exclude_text,
+                    self.search_text,
+                    self.status,
+                    self.dropdown,
+                    widgets.HBox(
+                        [self.button_prev, self.button_next, self.refine_text]
+                    ),
+                ]
+            )
+        )
         display(self.button_save)
 
         self.button_save.on_click(self.button_pressed)
         display(self.output)
 
+    @property
+    def nickname(self) -> str:
+        """Nickname for the next entry."""
+        return self.nickname_text.value
+
+    @nickname.setter
+    def nickname(self, value: str):
+        self.nickname_text.value = value
+
+    @property
+    def include(self) -> str:
+        """Current include input. Setting it filters the options again, as typing does."""
+        return self.include_text.value
+
+    @include.setter
+    def include(self, value: str):
+        self.include_text.value = value
+
+    @property
+    def exclude(self) -> str:
+        """Current exclude input. Setting it filters the options again, as typing does."""
+        return self.exclude_text.value
+
+    @exclude.setter
+    def exclude(self, value: str):
+        self.exclude_text.value = value
+
+    @property
+    def search(self) -> str:
+        """Current search input. Setting it filters the options again, as typing does."""
+        return self.search_text.value
+
+    @search.setter
+    def search(self, value: str):
+        self.search_text.value = value
+
+    def _input_changed(self, change=None):
+        """Schedule filtering for the new input, replacing any that has not started yet."""
+
+        with self._state_lock:
+            self._generation += 1
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(
+                self.debounce, self._refresh_later, args=(self._generation,)
+            )
+            self._timer.daemon = True
+            self._timer.start()
+        self.status.value = "Filtering..."
+
+    def _filter(self, generation: int) -> Optional[Tuple[str, str, List[str]]]:
+        """Include, exclude and filtered options for the input of generation, or None if input changed since."""
+
+        with self._filter_lock:
+            if generation != self._generation:
+                return None
+            include, exclude, search = self.include, self.exclude, self.search
+            return (
+                include,
+                exclude,
+                _filter_options(self.options, include, exclude, search),
+            )
+
+    def _show_filtered(
+        self, generation: int, include: str, exclude: str, filtered: List[str]
+    ):
+        """Show filtered options for the input of generation, unless input changed or they are shown already."""
+
+        with self._state_lock:
+            if generation != self._generation or generation == self._shown:
+                return
+            self._matches = list(filtered)
+            # as in dropdown, new matches start with the first one selected
+            self.selected = dict.fromkeys(self._matches[:1])
+            self._pattern = _reg(include, exclude).pattern()
+            self._apply_refine()
+            self._shown = generation
+
+    def _refresh(self, generation: int):
+        """Filter options for the input of generation and show them, unless input changed since."""
+
+        result = self._filter(generation)
+        if result is not None:
+            self._show_filtered(generation, *result)
+
+    def _refresh_later(self, generation: int):
+        """Filter options on this thread and show them from the kernel's event loop."""
+
+        result = self._filter(generation)
+        if result is not None:
+            _on_kernel_loop(self._show_filtered, generation, *result)
+
+    @property
+    def pages(self) -> int:
+        """Number of pages of refined matches."""
+        return max(1, -(-len(self._refined) // self.page_size))
+
+    def _apply_refine(self):
+        """Narrow matches by the refine input and show the first page."""
+
+        refine = self.refine_text.value.lower()
+        self._refined = [
+            option for option in self._matches if refine in str(option).lower()
+        ]
+        self.page = 0
+        self._show_page()
+
+    def _show_page(self):
+        """Send the options of the current page to the dropdown, with their selection."""
+
+        start = self.page * self.page_size
+        options = self._refined[start : start + self.page_size]
+        self._updating = True
+        try:
+            self.dropdown.options = options
+            self.dropdown.value = [
+                option for option in options if option in self.selected
+            ]
+        finally:
+            self._updating = False
+        self.status.value = (
+            f"{len(self._matches)} matches for regular expression {self._pattern!r}, "
+            f"showing {start + 1 if options else 0}-{start + len(options)} of {len(self._refined)}, "
+            f"page {self.page + 1} of {self.pages}, {len(self.selected)} selected"
+        )
+
+    def _selection_changed(self, change):
+        """Update selection from the options of the current page."""
+
+        with self._state_lock:
+            if self._updating:
+                return
+            for option in self.dropdown.options:
+                self.selected.pop(option, None)
+            self.selected.update(dict.fromkeys(change["new"]))
+            self._show_page()
+
+    def _refine_changed(self, change=None):
+        """Show matches narrowed by the new refine input."""
+
+        with self._state_lock:
+            self._apply_refine()
+
+    def next_page(self):
+        """Show the next page of matches."""
+
+        with self._state_lock:
+            self.page = min(self.page + 1, self.pages - 1)
+            self._show_page()
+
+    def prev_page(self):
+        """Show the previous page of matches."""
+
+        with self._state_lock:
+            self.page = max(self.page - 1, 0)
+            self._show_page()
+
+    def flush(self):
+        """Filter for the current input now instead of waiting for the debounce timer."""
+
+        with self._state_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            generation = self._generation
+        if self._shown != generation:
+            self._refresh(generation)
+
     def button_pressed(self, *args):
         """Saves a new entry in the catalog when button is pressed."""
 
@@ -132,20 +528,13 @@ class Selector(object):
 
         # execute function so it gets captured in output widget view
         with self.output:
-            if self.dropdown.widget.kwargs["nickname"] == "":
+            if self.nickname == "":
                 raise KeyError("Must input nickname to make entry.")
 
+            # selection should be from options for the current input
+            self.flush()
+
             # regular expressions to put into entries: exact matching
-            res = [
-                Reg(include_exact=exp).pattern()
-                for exp in self.dropdown.widget.result.value
-            ]
-            self.vocab.make_entry(
-                self.dropdown.widget.kwargs["nickname"], res, attr="standard_name"
-            )
+            res = [Reg(include_exact=exp).pattern() for exp in self.selected]
+            self.vocab.make_entry(self.nickname, res, attr="standard_name")
             print("Vocabulary: ", self.vocab)
-
-    # def return_list(self):
-    #     """Return list of variables selected."""
-
-    #     self._variables.append(self.dropdown.widget.result.value)
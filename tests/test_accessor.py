@@ -1,11 +1,8 @@
 """Test cf-pandas."""
 
-from unittest import mock
-
 import numpy as np
 import pandas as pd
 import pytest
-import requests
 
 import cf_pandas as cfp
 
@@ -77,12 +74,7 @@ def test_match_criteria_key_accessor():
         assert "salt2" not in df.cf
 
 
-@mock.patch("requests.get")
-def test_standard_names(mock_requests):
-
-    resp = requests.models.Response
-    resp.content = b"""<?xml version="1.0"?>\n<standard_name_table xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xsi:noNamespaceSchemaLocation="cf-standard-name-table-1.1.xsd">\n   <version_number>79</version_number>\n   <last_modified>2022-03-19T15:25:54Z</last_modified>\n   <institution>Centre for Environmental Data Analysis</institution>\n   <contact>support@ceda.ac.uk</contact>\n\n  \n   <entry id="longitude">\n      </entry>\n  \n   <entry id="wind_speed">\n  """
-    mock_requests.return_value = resp
+def test_standard_names():
     df = pd.DataFrame(
         columns=[
             "temp",
@@ -145,3 +137,48 @@ def test_cols():
     df = pd.DataFrame(columns=["m_time", "lon", "lat", "temp"])
     assert df.cf.axes_cols == ["m_time"]
     assert sorted(df.cf.coordinates_cols) == ["lat", "lon", "m_time"]
+
+
+def test_axis_coords_one_pass():
+    df = pd.DataFrame(columns=["temp", "depth", "lon (degrees_east)", "y"])
+    axis_coords = cfp.accessor._get_axis_coords(df)
+    assert axis_coords["longitude"] == ["lon (degrees_east)"]
+    assert axis_coords["vertical"] == ["depth"]
+    assert axis_coords["Y"] == ["y"]
+    assert axis_coords["T"] == []
+
+    # no guess_regex for vertical so match only comes from criteria
+    assert df.cf["vertical"].name == "depth"
+    assert df.cf.coordinates == {
+        "longitude": ["lon (degrees_east)"],
+        "vertical": ["depth"],
+    }
+
+
+def test_standard_names_aliases_and_units():
+    df = pd.DataFrame(
+        columns=[
+            "sea_water_temperature (degC)",
+            "wind_speed (m/s)",
+            "chlorophyll_concentration_in_sea_water (mg m-3)",
+            "air_temperature [K]",
+            "wind_speed (K)",
+        ]
+    )
+    # deprecated alias is reported under current standard name
+    assert df.cf.standard_names["mass_concentration_of_chlorophyll_in_sea_water"] == [
+        "chlorophyll_concentration_in_sea_water (mg m-3)"
+    ]
+    assert "chlorophyll_concentration_in_sea_water" not in df.cf.standard_names
+
+    mismatches = df.cf.check_units()
+    assert "wind_speed (m/s)" not in mismatches
+    assert "air_temperature [K]" not in mismatches
+    # convertible units are not mismatches, with or without cf_units
+    assert "sea_water_temperature (degC)" not in mismatches
+    assert "chlorophyll_concentration_in_sea_water (mg m-3)" not in mismatches
+    assert mismatches["wind_speed (K)"] == {
+        "standard_name": "wind_speed",
+        "units": "K",
+        "canonical_units": "m s-1",
+    }
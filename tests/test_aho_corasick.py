@@ -0,0 +1,21 @@
+"""Test Aho-Corasick automaton"""
+
+from cf_pandas.aho_corasick import AhoCorasick
+
+
+def test_occurrences():
+    automaton = AhoCorasick(["he", "she", "his", "hers", "he"])
+    assert automaton.terms == ["he", "she", "his", "hers"]
+    assert sorted(automaton.occurrences("ushers")) == [(4, 0), (4, 1), (6, 3)]
+    assert list(automaton.occurrences("ushers", start=2)) == [(4, 0), (6, 3)]
+
+
+def test_search():
+    automaton = AhoCorasick(["qc", "flag"])
+    assert automaton.search("temp_qc")
+    assert not automaton.search("temp")
+    assert not automaton.search("qc_temp", start=1)
+    assert automaton.first_end("temp_flag_qc") == 9
+    assert automaton.first_end("temp") is None
+    assert automaton.contains_all("flag_qc")
+    assert not automaton.contains_all("flag_qc", start=1)
@@ -0,0 +1,57 @@
+"""Test analyze"""
+
+import json
+
+import cf_pandas as cfp
+from cf_pandas.analyze import analyze_pattern
+
+
+def test_analyze_pattern():
+    assert analyze_pattern("lat|lon") == {"cost": 0.2, "issues": []}
+
+    result = analyze_pattern(".*temp")
+    assert result["issues"] == ["leading unbounded wildcard scans the whole value"]
+    result = analyze_pattern("[^_]+_temp")
+    assert result["issues"] == ["leading unbounded wildcard scans the whole value"]
+    # a class that stops at the first character outside it doesn't scan the whole value
+    assert analyze_pattern(r"[a-z]+\d")["issues"] == []
+
+    result = analyze_pattern("(a+)+b")
+    assert result["issues"] == ["nested quantifiers can backtrack exponentially"]
+
+    # Reg writes a lookahead per include term
+    result = analyze_pattern(cfp.Reg(include=["sea", "temp"], include_or="a").pattern())
+    assert "2 stacked lookarounds each scan the value" in result["issues"]
+    assert any("unbounded wildcards in sequence" in issue for issue in result["issues"])
+
+    result = analyze_pattern("(?i)temp$|temperature|TEMP$|temp")
+    assert result["issues"] == [
+        "duplicate alternative 'TEMP$'",
+        "alternative '(?i)temp$' is already matched by 'temp'",
+        "alternative 'temperature' is already matched by 'temp'",
+    ]
+
+    assert analyze_pattern("[ab")["cost"] == float("inf")
+
+
+def test_analyze_vocab(tmpdir):
+    vocab = cfp.Vocab()
+    vocab.make_entry("temp", ["temp$", "(?=.*sea)(?=.*temp)"], attr="name")
+    vocab.make_entry("salt", "sal", attr="name")
+
+    df = vocab.analyze()
+    assert list(df.columns) == ["nickname", "attr", "pattern", "cost", "issues"]
+    assert list(df["nickname"]) == ["temp", "salt"]
+
+    df = vocab.analyze(sample=["temp", "sea_temp", "salinity"])
+    assert "seconds" in df.columns and (df["seconds"] >= 0).all()
+
+    # duplicates are kept when reading the file directly
+    fname = f"{tmpdir}/vocab.json"
+    with open(fname, "w") as f:
+        json.dump({"temp": {"name": "temp$|temp$"}}, f)
+    df = cfp.lint_vocab(fname)
+    assert df.loc[0, "issues"] == ["duplicate alternative 'temp$'"]
+
+    vocab.save(f"{tmpdir}/indexed", indexed=True)
+    assert len(cfp.lint_vocab(f"{tmpdir}/indexed.sqlite")) == 2
@@ -0,0 +1,113 @@
+"""Test the catalog of files."""
+
+import os
+
+import pandas as pd
+import pytest
+
+import cf_pandas as cfp
+from cf_pandas import catalog as catalog_module
+
+criteria = {
+    "temp": {"standard_name": "sea_water_temperature$"},
+    "salt": {"standard_name": "sea_water_practical_salinity$"},
+}
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for i, columns in enumerate(
+        [
+            ["time", "sea_water_temperature", "sea_water_practical_salinity"],
+            ["time", "sea_water_temperature"],
+            ["station", "sea_water_temperature", "sea_water_practical_salinity"],
+            ["time", "sea_water_temperature", "sea_water_practical_salinity"],
+        ]
+    ):
+        path = tmp_path / f"file{i}.csv"
+        pd.DataFrame(columns=columns).to_csv(path, index=False)
+        paths.append(str(path))
+    return paths
+
+
+def test_build_and_search(files, tmp_path):
+    catalog = cfp.Catalog.build(files, criteria, n_workers=2)
+    assert len(catalog) == 4
+    assert catalog.search("temp", "salt", "T") == [files[0], files[3]]
+    assert catalog.search("salt") == [files[0], files[2], files[3]]
+    assert catalog.search("temp", "nope") == []
+    assert catalog.search() == sorted(files)
+    assert catalog["salt"][files[2]] == ["sea_water_practical_salinity"]
+    assert "latitude" not in catalog
+
+    # Parquet headers have types, so time is found without a matching name
+    pytest.importorskip("pyarrow")
+    path = str(tmp_path / "typed.parquet")
+    pd.DataFrame(
+        {
+            "sampled": pd.date_range("2023-01-01", periods=2),
+            "sea_water_temperature": 1.0,
+        }
+    ).to_parquet(path)
+    catalog = cfp.Catalog.build(files + [path], criteria)
+    assert catalog["T"][path] == ["sampled"]
+
+
+def test_rebuild(files, tmp_path, monkeypatch):
+    savename = tmp_path / "catalog.json"
+    missing = str(tmp_path / "missing.csv")
+    catalog = cfp.Catalog.build(files + [missing], criteria, savename=savename)
+    assert list(catalog.errors) == [missing]
+
+    scanned = []
+    scan = catalog_module._scan
+
+    def counting_scan(path, units_row):
+        scanned.append(path)
+        return scan(path, units_row)
+
+    monkeypatch.setattr(catalog_module, "_scan", counting_scan)
+
+    # only changed files are scanned again
+    pd.DataFrame(columns=["time", "sea_water_practical_salinity"]).to_csv(
+        files[1], index=False
+    )
+    stat = os.stat(files[1])
+    os.utime(files[1], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    catalog = cfp.Catalog.build(files, criteria, savename=savename)
+    assert scanned == [files[1]]
+    assert catalog.search("salt", "T") == [files[0], files[1], files[3]]
+    assert cfp.Catalog.open(savename).search("salt", "T") == catalog.search("salt", "T")
+
+    # and all of them with other criteria
+    scanned.clear()
+    cfp.Catalog.build(files, {"temp": {"name": "temp"}}, savename=savename)
+    assert scanned == files
+
+    # a save that fails leaves the old catalog and no temporary file
+    def fail(*args):
+        raise OSError("disk full")
+
+    saved = savename.read_bytes()
+    monkeypatch.setattr(cfp.standard_name_table.os, "replace", fail)
+    with pytest.raises(OSError):
+        catalog.save(savename)
+    monkeypatch.undo()
+    assert sorted(p.name for p in tmp_path.glob("*catalog.json*")) == ["catalog.json"]
+    assert savename.read_bytes() == saved
+
+    # files of other types are not scanned
+    path = tmp_path / "data.nc"
+    path.touch()
+    assert list(cfp.Catalog.build(path, criteria).errors) == [str(path)]
+    with pytest.raises(ValueError):
+        cfp.Catalog.open(files[0])
+
+
+def test_units_row(tmp_path):
+    path = tmp_path / "erddap.csv"
+    path.write_text("time,sea_water_temperature,station\nUTC,degree_C\n")
+    catalog = cfp.Catalog.build(path, criteria, units_row=True)
+    assert catalog["temp"] == {str(path): ["sea_water_temperature (degree_C)"]}
+    assert catalog["T"] == {str(path): ["time (UTC)"]}
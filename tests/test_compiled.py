@@ -0,0 +1,106 @@
+"""Test compiled patterns"""
+
+import copy
+from collections import ChainMap
+
+import pytest
+import regex
+
+import cf_pandas as cfp
+from cf_pandas.compiled import CompiledCriteria, CompiledPattern, compile_pattern
+from cf_pandas.utils import set_up_criteria
+
+
+def test_parts():
+    compiled = CompiledPattern(r"temp$|^sea_water|sal\.|(lat|lon)|t[0-9]")
+    assert compiled.exact == {"temp"}
+    assert compiled.prefixes == ("sea_water", "sal.")
+    assert compiled.rest == "(lat|lon)|t[0-9]"
+
+    # inline flags apply to the whole pattern
+    compiled = CompiledPattern("(?i)temp$|sea")
+    assert compiled.exact == set()
+    assert compiled.rest == "(?i)temp$|sea"
+
+    # an empty alternative matches anything
+    assert CompiledPattern("temp|").match("anything")
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    [
+        r"temp$|^sea_water|sal\.|(lat|lon)|t[0-9]",
+        "(?i)temp$|sea",
+        "$",
+        "^",
+        "a|b$|",
+        r"a\$|b\\",
+    ],
+)
+def test_match_same_as_regex(pattern):
+    values = ["temp", "temp\n", "temperature", "TEMP", "sea_water_temp", "sal.", "salt"]
+    values += ["lat", "t1", "", "\n", "a$", "b\\", "b", "x"]
+    compiled = CompiledPattern(pattern)
+    for value in values:
+        assert compiled.match(value) == (regex.match(pattern, value) is not None)
+
+
+def test_compile_pattern():
+    assert compile_pattern("temp$|sea") is compile_pattern("temp$|sea")
+    with pytest.raises(ValueError):
+        compile_pattern("temp|(")
+
+
+def test_compiled_criteria():
+    criteria = {"temp": {"name": "temp$"}, "salt": {"name": "sal"}}
+    other = {"temp": {"name": "t$"}, "wind": {"standard_name": "wind"}}
+    compiled = CompiledCriteria([criteria, other])
+    assert list(compiled) == list(ChainMap(criteria, other))
+    assert compiled["temp"] == {"name": "temp$"}
+    assert "wind" in compiled and len(compiled) == 3
+
+    # copied once, so later changes to the input do not show
+    criteria["temp"]["name"] = "changed"
+    assert compiled["temp"]["name"] == "temp$"
+    with pytest.raises(TypeError):
+        compiled["temp"]["name"] = "changed"
+
+    patterns = compiled.patterns("temp")
+    assert patterns[0][0] == "name" and patterns[0][1].match("temp")
+    assert compiled.patterns("temp") is patterns
+
+    assert compiled.fingerprint == CompiledCriteria([dict(compiled)]).fingerprint
+    assert compiled.fingerprint != CompiledCriteria(other).fingerprint
+
+
+def test_set_options_shares_compiled_criteria():
+    criteria = {"temp": {"name": "temp$"}}
+    with cfp.set_options(custom_criteria=criteria):
+        compiled = set_up_criteria()
+        assert isinstance(compiled, CompiledCriteria)
+        assert set_up_criteria() is compiled
+        assert copy.deepcopy(compiled) is compiled
+        with cfp.set_options(custom_criteria={"salt": {"name": "sal"}}):
+            assert "temp" not in set_up_criteria()
+        assert set_up_criteria() is compiled
+    with pytest.raises(ValueError):
+        set_up_criteria()
+
+
+def test_set_up_criteria_remembers_criteria():
+    criteria = {"temp": {"name": "temp$"}}
+    compiled = set_up_criteria(criteria)
+    assert set_up_criteria(criteria) is compiled
+    fingerprint = compiled.fingerprint
+    vocab = cfp.Vocab()
+    vocab.vocab = criteria
+    assert set_up_criteria(vocab) is set_up_criteria(vocab)
+
+    # changed criteria are compiled again
+    criteria["temp"]["name"] = "temperature$"
+    changed = set_up_criteria(criteria)
+    assert changed is not compiled
+    assert changed.fingerprint != fingerprint
+    assert changed["temp"] == {"name": "temperature$"}
+    vocab.make_entry("salt", "sal")
+    assert "salt" in set_up_criteria(vocab)
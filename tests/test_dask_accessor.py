@@ -0,0 +1,83 @@
+"""Test the accessor for dask DataFrames."""
+
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+import cf_pandas as cfp
+
+dd = pytest.importorskip("dask.dataframe")
+dask = pytest.importorskip("dask")
+pytest.importorskip("cf_pandas.dask_accessor")
+
+criteria = {
+    "temp": {"standard_name": "sea_water_temperature$"},
+    "salt": {"standard_name": "sea_water_practical_salinity$"},
+}
+
+df = pd.DataFrame(
+    {
+        "time": pd.date_range("2023-01-01", periods=6),
+        "lon": [-150.0] * 6,
+        "sea_water_temperature (degC)": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+        "sea_water_practical_salinity": [30.0] * 6,
+    }
+).set_index("time")
+
+
+def test_getitem():
+    ddf = dd.from_pandas(df, npartitions=3)
+    with cfp.set_options(custom_criteria=criteria), dask.config.set(
+        scheduler="synchronous"
+    ):
+        temp = ddf.cf["temp"]
+        assert isinstance(temp, dd.Series)
+        assert temp.sum().compute() == 21.0
+        pd.testing.assert_index_equal(ddf.cf["T"].compute(), df.index)
+        assert ddf.cf["lon"].name == "lon"
+        assert ddf.cf.keys() == df.cf.keys()
+        assert ddf.cf.custom_keys == df.cf.custom_keys
+        assert ddf.cf.coordinates == {"longitude": ["lon"], "time": ["time"]}
+        assert "salt" in ddf.cf
+
+    # several matching columns are a DataFrame
+    with cfp.set_options(custom_criteria={"sea": {"name": "sea_water"}}):
+        both = ddf.cf["sea"]
+        assert isinstance(both, dd.DataFrame)
+        assert sorted(both.columns) == [
+            "sea_water_practical_salinity",
+            "sea_water_temperature (degC)",
+        ]
+
+    # without criteria, as for pandas
+    with pytest.raises(ValueError):
+        ddf.cf["temp"]
+
+
+def test_resolved_once(monkeypatch):
+    ddf = dd.from_pandas(df, npartitions=3)
+    calls = []
+    key_names = cfp.CFAccessor._key_names
+
+    def counting(self, key):
+        calls.append(key)
+        return key_names(self, key)
+
+    monkeypatch.setattr(cfp.CFAccessor, "_key_names", counting)
+    with cfp.set_options(custom_criteria=criteria):
+        ddf.cf["temp"]
+        ddf.cf["temp"]
+        # the column selection is lazy; computing does not match again
+        ddf.cf["temp"].compute(scheduler="synchronous")
+    assert calls == ["temp"]
+
+
+def test_registered_on_request():
+    # importing cf_pandas doesn't import dask
+    code = "import sys, cf_pandas; assert 'dask.dataframe' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)
+    # but registers the accessor if dask is in use already
+    code = "import dask.dataframe as dd, cf_pandas; assert hasattr(dd.DataFrame, 'cf')"
+    subprocess.run([sys.executable, "-c", code], check=True)
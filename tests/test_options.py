@@ -0,0 +1,74 @@
+"""Test options"""
+
+import asyncio
+import threading
+
+import pytest
+
+import cf_pandas as cfp
+from cf_pandas.options import OPTIONS
+
+
+def test_options_read_only():
+    with pytest.raises(TypeError):
+        OPTIONS["cache_dir"] = "somewhere"
+    with pytest.raises(ValueError):
+        cfp.set_options(not_an_option=1)
+
+
+def test_set_options_thread_local():
+    values = ["temp", "salt"]
+    barrier = threading.Barrier(2)
+    results = {}
+
+    def resolve(key, criteria):
+        with cfp.set_options(custom_criteria=criteria):
+            # both threads are inside their own set_options here
+            barrier.wait()
+            results[key] = cfp.match_criteria_key(values, key)
+
+    threads = [
+        threading.Thread(target=resolve, args=("t", {"t": {"name": "temp"}})),
+        threading.Thread(target=resolve, args=("s", {"s": {"name": "salt"}})),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {"t": ["temp"], "s": ["salt"]}
+    assert not OPTIONS["custom_criteria"]
+
+
+def test_set_options_task_local():
+    async def resolve(key, criteria):
+        with cfp.set_options(custom_criteria=criteria):
+            await asyncio.sleep(0)
+            return cfp.match_criteria_key(["temp", "salt"], key)
+
+    async def main():
+        return await asyncio.gather(
+            resolve("t", {"t": {"name": "temp"}}),
+            resolve("s", {"s": {"name": "salt"}}),
+        )
+
+    assert asyncio.run(main()) == [["temp"], ["salt"]]
+
+
+def test_set_default_options():
+    criteria = {"t": {"name": "temp"}}
+    try:
+        cfp.set_default_options(custom_criteria=criteria)
+        seen = []
+        thread = threading.Thread(
+            target=lambda: seen.append(cfp.match_criteria_key(["temp"], "t"))
+        )
+        thread.start()
+        thread.join()
+        assert seen == [["temp"]]
+
+        # set_options takes precedence in its context
+        with cfp.set_options(custom_criteria={"t": {"name": "salt"}}):
+            assert cfp.match_criteria_key(["temp", "salt"], "t") == ["salt"]
+        assert cfp.match_criteria_key(["temp", "salt"], "t") == ["temp"]
+    finally:
+        cfp.set_default_options(custom_criteria=[])
@@ -0,0 +1,71 @@
+"""Test the cf namespace for polars."""
+
+import datetime
+import subprocess
+import sys
+
+import pytest
+
+import cf_pandas as cfp
+
+pl = pytest.importorskip("polars")
+polars_accessor = pytest.importorskip("cf_pandas.polars_accessor")
+
+criteria = {
+    "temp": {"standard_name": "sea_water_temperature$"},
+    "sea": {"standard_name": "sea_water"},
+}
+
+df = pl.DataFrame(
+    {
+        "sampled": [datetime.datetime(2023, 1, 1), datetime.datetime(2023, 1, 2)],
+        "lon": [-150.0, -150.1],
+        "sea_water_temperature (degC)": [1.0, 2.0],
+        "sea_water_practical_salinity": [30.0, 31.0],
+    }
+)
+
+
+def test_dataframe():
+    with cfp.set_options(custom_criteria=criteria):
+        assert df.cf["temp"].to_list() == [1.0, 2.0]
+        assert df.cf["sea"].columns == [
+            "sea_water_temperature (degC)",
+            "sea_water_practical_salinity",
+        ]
+        # the dtype identifies time
+        assert df.cf["T"].name == "sampled"
+        assert df.cf.axes == {"T": ["sampled"]}
+        assert df.cf.coordinates == {"longitude": ["lon"], "time": ["sampled"]}
+        assert df.cf.keys() == {"T", "time", "longitude", "temp", "sea"}
+        assert "temp" in df.cf
+    with pytest.raises(ValueError):
+        df.cf["temp"]
+
+
+def test_lazyframe(tmp_path):
+    path = tmp_path / "wide.parquet"
+    df.write_parquet(path)
+    lf = pl.scan_parquet(path)
+    with cfp.set_options(custom_criteria=criteria):
+        selected = lf.cf["temp"]
+        assert isinstance(selected, pl.LazyFrame)
+        assert selected.collect().columns == ["sea_water_temperature (degC)"]
+        assert lf.cf["longitude"].collect_schema().names() == ["lon"]
+        assert lf.cf.keys() == df.cf.keys()
+        # the projection is pushed down into the scan
+        plan = lf.cf["sea"].explain()
+        assert "PROJECT 2/4 COLUMNS" in plan
+
+
+def test_registered_on_request():
+    # importing cf_pandas doesn't import polars
+    code = "import sys, cf_pandas; assert 'polars' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)
+    # but registers the namespace if polars is in use already
+    code = "import polars as pl, cf_pandas; assert hasattr(pl.DataFrame, 'cf')"
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+    # the shared namespace needs a schema
+    with pytest.raises(TypeError):
+        polars_accessor._PolarsCFNamespace(pl.DataFrame())
@@ -0,0 +1,273 @@
+"""Test reading matching columns of files."""
+
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import cf_pandas as cfp
+from cf_pandas.readers import resolve_keys
+
+criteria = {
+    "temp": {"standard_name": "sea_water_temperature$"},
+    "salt": {"standard_name": "sea_water_practical_salinity$"},
+}
+
+df = pd.DataFrame(
+    {
+        "time": pd.date_range("2023-01-01", periods=3),
+        "longitude": [-150.0, -150.1, -150.2],
+        "lat": [58.0, 58.1, 58.2],
+        "sea_water_temperature (degC)": [1.0, 2.0, 3.0],
+        "sea_water_practical_salinity": [30.0, 31.0, 32.0],
+        "other": [0, 1, 2],
+    }
+)
+
+
+def test_resolve_keys():
+    mapping = resolve_keys(df.columns, ["temp", "longitude", "lat", "T"], criteria)
+    assert mapping == {
+        "temp": ["sea_water_temperature (degC)"],
+        "longitude": ["longitude"],
+        "lat": ["lat"],
+        "T": ["time"],
+    }
+    with pytest.raises(KeyError):
+        resolve_keys(df.columns, "nope", criteria)
+
+
+def test_read_parquet(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "wide.parquet"
+    df.set_index("time").to_parquet(path)
+
+    read = cfp.read_parquet(path, keys=["temp", "latitude"], criteria=criteria)
+    # the index is read too, and the accessor works on the result
+    assert list(read.columns) == ["lat", "sea_water_temperature (degC)"]
+    assert read.index.name == "time"
+    with cfp.set_options(custom_criteria=criteria):
+        pd.testing.assert_series_equal(
+            read.cf["temp"], df.set_index("time")["sea_water_temperature (degC)"]
+        )
+        assert list(cfp.read_parquet(path).columns) == list(df.columns[1:])
+
+
+def test_read_feather(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "wide.feather"
+    df.to_feather(path)
+
+    for memory_map in (True, False):
+        read = cfp.read_feather(
+            path, keys=["T", "salt"], criteria=criteria, memory_map=memory_map
+        )
+        pd.testing.assert_frame_equal(
+            read, df[["time", "sea_water_practical_salinity"]]
+        )
+
+
+def test_read_dataset(tmp_path):
+    ds = pytest.importorskip("pyarrow.dataset")
+    df.iloc[:2].to_parquet(tmp_path / "part0.parquet", index=False)
+    df.iloc[2:].to_parquet(tmp_path / "part1.parquet", index=False)
+
+    read = cfp.read_dataset(tmp_path, keys=["temp", "longitude"], criteria=criteria)
+    assert list(read.columns) == ["longitude", "sea_water_temperature (degC)"]
+    assert len(read) == 3
+
+    read = cfp.read_dataset(
+        ds.dataset(tmp_path),
+        keys="temp",
+        criteria=criteria,
+        filter=ds.field("longitude") < -150.05,
+    )
+    assert read["sea_water_temperature (degC)"].tolist() == [2.0, 3.0]
+
+
+def test_read_csv(tmp_path):
+    path = tmp_path / "erddap.csv"
+    path.write_text(
+        "time,longitude,latitude,sea_water_temperature,sea_water_practical_salinity,other\n"
+        "UTC,degrees_east,degrees_north,degree_C,,\n"
+        "2023-01-01T00:00:00Z,-150.0,58.0,1.0,30.0,0\n"
+        "2023-01-01T01:00:00Z,-150.1,58.1,2.0,31.0,1\n"
+        "2023-01-01T02:00:00Z,-150.2,58.2,3.0,32.0,2\n"
+    )
+
+    read = cfp.read_csv(
+        path,
+        keys=["temp", "salt", "latitude"],
+        criteria=criteria,
+        units_row=True,
+        dtype={"temp": "float32"},
+        index_col="time (UTC)",
+    )
+    assert list(read.columns) == [
+        "latitude (degrees_north)",
+        "sea_water_temperature (degree_C)",
+        "sea_water_practical_salinity",
+    ]
+    assert read.index.name == "time (UTC)"
+    assert read["sea_water_temperature (degree_C)"].dtype == "float32"
+
+    chunks = list(
+        cfp.read_csv(path, keys="temp", criteria=criteria, units_row=True, chunksize=2)
+    )
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert pd.concat(chunks)["sea_water_temperature (degree_C)"].tolist() == [
+        1.0,
+        2.0,
+        3.0,
+    ]
+
+    # without a units row, and from a file object
+    path = tmp_path / "plain.csv"
+    df.to_csv(path, index=False)
+    with open(path) as f:
+        read = cfp.read_csv(f, keys=["T", "temp"], criteria=criteria)
+    assert list(read.columns) == ["time", "sea_water_temperature (degC)"]
+    assert read["sea_water_temperature (degC)"].tolist() == [1.0, 2.0, 3.0]
+
+    # index by position in the header, which pandas would count among the columns read
+    read = cfp.read_csv(path, keys="temp", criteria=criteria, index_col=0)
+    assert read.index.name == "time"
+    assert list(read.columns) == ["sea_water_temperature (degC)"]
+    read = cfp.read_csv(path, keys="temp", criteria=criteria, index_col=[2, "time"])
+    assert read.index.names == ["lat", "time"]
+    read = cfp.read_csv(path, keys="temp", criteria=criteria, index_col=False)
+    assert list(read.columns) == ["sea_water_temperature (degC)"]
+    for index_col in [6, 1.5, True]:
+        with pytest.raises(ValueError, match="index_col"):
+            cfp.read_csv(path, keys="temp", criteria=criteria, index_col=index_col)
+
+
+def test_read_sql():
+    import sqlite3
+
+    con = sqlite3.connect(":memory:")
+    con.execute(
+        'CREATE TABLE obs (station TEXT, sampled DATETIME, "sea_water_temperature (degC)" REAL, other INTEGER)'
+    )
+    con.executemany(
+        "INSERT INTO obs VALUES (?, ?, ?, ?)",
+        [
+            ("a", "2023-01-01", 1.0, 0),
+            ("a", "2023-01-02", 2.0, 1),
+            ("b", "2023-01-01", 3.0, 2),
+        ],
+    )
+
+    # the declared type identifies time
+    read = cfp.read_sql("obs", con, keys=["T", "temp"], criteria=criteria)
+    assert list(read.columns) == ["sampled", "sea_water_temperature (degC)"]
+    assert len(read) == 3
+
+    read = cfp.read_sql(
+        "SELECT * FROM obs WHERE station = ?;",
+        con,
+        keys="temp",
+        criteria=criteria,
+        params=("a",),
+        index_col="station",
+    )
+    assert list(read.columns) == ["sea_water_temperature (degC)"]
+    assert read.index.tolist() == ["a", "a"]
+
+    read = cfp.read_sql(
+        "obs", con, keys="temp", criteria=criteria, index_col=["station", "sampled"]
+    )
+    assert read.index.names == ["station", "sampled"]
+    # pandas takes only names for the index of a query
+    for index_col in [0, False, ["station", 1]]:
+        with pytest.raises(ValueError, match="index_col"):
+            cfp.read_sql(
+                "obs", con, keys="temp", criteria=criteria, index_col=index_col
+            )
+
+    chunks = list(cfp.read_sql("obs", con, keys="temp", criteria=criteria, chunksize=2))
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+
+    with pytest.raises(ValueError):
+        cfp.read_sql("missing", con, keys="temp", criteria=criteria)
+    with pytest.raises(KeyError):
+        cfp.read_sql("obs", con, keys="salt", criteria=criteria)
+
+
+def test_stored_mapping(tmp_path, monkeypatch):
+    pa = pytest.importorskip("pyarrow")
+    path = tmp_path / "resolved.parquet"
+    with cfp.set_options(custom_criteria=criteria):
+        df.cf.to_parquet(path)
+    table = df.cf.to_arrow(criteria)
+    field = table.schema.field("sea_water_temperature (degC)")
+    assert field.metadata == {
+        b"standard_name": b"sea_water_temperature",
+        b"units": b"degC",
+    }
+    assert table.schema.field("time").metadata == {
+        b"standard_name": b"time",
+        b"axis": b"T",
+    }
+    assert isinstance(table, pa.Table)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("matched again")
+
+    # with the same criteria, nothing is matched again
+    monkeypatch.setattr(cfp.readers, "resolve_keys", fail)
+    monkeypatch.setattr(cfp.accessor, "match_criteria_key", fail)
+    monkeypatch.setattr(cfp.accessor, "_match_axis_coord_names", fail)
+    with cfp.set_options(custom_criteria=criteria):
+        read = cfp.read_parquet(path, keys=["temp", "T", "latitude", "longitude"])
+        assert list(read.columns) == [
+            "time",
+            "longitude",
+            "lat",
+            "sea_water_temperature (degC)",
+        ]
+        assert read.cf["temp"].tolist() == [1.0, 2.0, 3.0]
+        assert read.cf.axes == {"T": ["time"]}
+        assert read.cf.coordinates["latitude"] == ["lat"]
+        assert read.cf.custom_keys == {
+            "temp": ["sea_water_temperature (degC)"],
+            "salt": [],
+        }
+
+    # other criteria are matched
+    with pytest.raises(AssertionError, match="matched again"):
+        cfp.read_parquet(path, keys="temp", criteria={"temp": {"name": "temp"}})
+    monkeypatch.undo()
+
+    # and so are changed columns
+    renamed = read.rename(columns={"lat": "latitude"})
+    with cfp.set_options(custom_criteria=criteria):
+        assert renamed.cf["latitude"].tolist() == df["lat"].tolist()
+
+        # reading fewer columns keeps the matches of criteria keys among them
+        read = cfp.read_parquet(path, keys=["salt", "T"])
+        assert read.attrs["cf_pandas"]["keys"]["temp"] == []
+        assert read.cf.coordinates == {"time": ["time"]}
+
+
+def test_chunks_keep_mapping(tmp_path, monkeypatch):
+    path = tmp_path / "chunks.csv"
+    df.to_csv(path, index=False)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("matched again")
+
+    con = sqlite3.connect(":memory:")
+    df.to_sql("obs", con, index=False)
+
+    with cfp.set_options(custom_criteria=criteria):
+        chunks = cfp.read_csv(path, keys=["temp", "T"], chunksize=2)
+        sql = cfp.read_sql("obs", con, keys="temp", index_col="time", chunksize=2)
+        # keys are matched once from the header, not again for each chunk
+        monkeypatch.setattr(cfp.readers, "resolve_keys", fail)
+        monkeypatch.setattr(cfp.accessor, "match_criteria_key", fail)
+        monkeypatch.setattr(cfp.accessor, "_match_axis_coord_names", fail)
+        chunks = list(chunks)
+        assert [chunk.cf["temp"].tolist() for chunk in chunks] == [[1.0, 2.0], [3.0]]
+        assert chunks[0].cf["T"].name == "time"
+        assert [chunk.cf["temp"].tolist() for chunk in sql] == [[1.0, 2.0], [3.0]]
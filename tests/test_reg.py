@@ -2,6 +2,7 @@
 
 import pandas as pd
 import pytest
+import regex
 from pandas import testing as tm
 
 import cf_pandas as cfp
@@ -395,3 +396,85 @@ def test_ignore_case():
     dfmatch = df[df.str.match(reg.pattern())]
     matches = ["sea_water_temperature"]
     tm.assert_series_equal(dfmatch, pd.Series(matches), check_index=False)
+
+
+def test_compile_cached():
+    reg = cfp.Reg(include="temp", exclude="qc")
+    pattern = reg.pattern()
+    compiled = reg.compile()
+    assert reg.pattern() is pattern
+    assert reg.compile() is compiled
+
+    # mutators and ignore_case reset the cache
+    reg.exclude("sal")
+    assert reg.compile() is not compiled
+    assert reg.pattern() == "(?i)^(?!.*(qc|sal))(?=.*temp)"
+    reg.ignore_case = False
+    assert reg.pattern() == "^(?!.*(qc|sal))(?=.*temp)"
+
+
+def test_match_filter():
+    strings = pd.Series(
+        ["sea_water_temperature", "temp_qc", "salinity", None], index=[5, 6, 7, 8]
+    )
+    reg = cfp.Reg(include="temp", exclude="qc")
+    assert list(reg.match(strings)) == [True, False, False, False]
+    tm.assert_series_equal(
+        reg.filter(strings), pd.Series(["sea_water_temperature"], index=[5])
+    )
+    # same as str.match
+    valid = strings.dropna()
+    tm.assert_series_equal(reg.filter(valid), valid[valid.str.match(reg.pattern())])
+
+
+@pytest.mark.parametrize("min_terms", [32, 0])
+def test_match_literal_rules(monkeypatch, min_terms):
+    # also use the Aho-Corasick automaton for short term lists
+    monkeypatch.setattr(cfp.reg, "AHO_CORASICK_MIN_TERMS", min_terms)
+    strings = [
+        "sea_water_temperature",
+        "Sea_Water_Temperature_qc",
+        "temp_sea",
+        "sea_temp_sea",
+        "sea_surface_temperature",
+        "[celsius]_sea_temp",
+        "sea_water\ntemperature",
+        "séa_water_temperature",
+        "",
+    ]
+    regs = [
+        cfp.Reg(include_start="sea", include_or=["water", "surface"], include="temp"),
+        cfp.Reg(include=["sea", "temp"], exclude=["qc", "surface"], ignore_case=False),
+        cfp.Reg(include_or="temp", include="sea", include_end="ture"),
+        cfp.Reg(exclude_start=["temp", "Sea"], exclude_end="sea"),
+        cfp.Reg(include_start=r"\[celsius\]", include_end="temp"),
+        cfp.Reg(include_exact="temp_sea"),
+        cfp.Reg(include="te.p"),
+    ]
+    for reg in regs:
+        expected = [
+            regex.match(reg.pattern(), string) is not None for string in strings
+        ]
+        assert list(reg.match(strings)) == expected
+    assert regs[0]._literal_rules() is not None
+    assert regs[-1]._literal_rules() is None
+
+
+def test_match_include_exact_not_literal():
+    strings = pd.Series(["x", "temp1", "temp_qc", "sea_temp"])
+    later = cfp.Reg(ignore_case=False)
+    later.include_exact("temp[0-9]")
+    # include_exact can't be combined with include and exclude terms, but with the other options
+    regs = [
+        cfp.Reg(include_exact="temp.*"),
+        cfp.Reg(include_exact="(temp|sea)_.*", ignore_case=False),
+        later,
+    ]
+    for reg in regs:
+        assert reg._literal_rules() is None
+        expected = [
+            regex.match(reg.pattern(), string) is not None for string in strings
+        ]
+        assert list(reg.match(strings)) == expected
+        tm.assert_series_equal(reg.filter(strings), strings[expected])
+    assert list(cfp.Reg(include_exact="temp.*").match(["x", "temp1"])) == [False, True]
@@ -0,0 +1,108 @@
+"""Test the resolution cache on disk."""
+
+import multiprocessing
+import sys
+
+import pandas as pd
+import pytest
+
+import cf_pandas as cfp
+from cf_pandas import resolution_cache
+from cf_pandas.resolution_cache import ResolutionCache
+
+criteria = {
+    "temp": {"standard_name": "sea_water_temperature$"},
+    "salt": {"standard_name": "sea_water_practical_salinity$"},
+}
+
+df = pd.DataFrame(
+    columns=[
+        "time",
+        "lon",
+        "lat",
+        "sea_water_temperature (degC)",
+        "sea_water_practical_salinity",
+    ]
+)
+
+
+def test_lru(tmp_path, monkeypatch):
+    path = tmp_path / "cache.sqlite"
+    cache = ResolutionCache(path, max_entries=2)
+    cache.put("a", {"temp": [0]})
+    cache.put("b", {"temp": [1]})
+
+    # reads mark entries as used only once in a while
+    def used(key):
+        return cache._con.execute(
+            "SELECT used FROM resolution WHERE key = ?", (key,)
+        ).fetchone()[0]
+
+    before = used("a")
+    assert cache.get("a") == {"temp": [0]}
+    assert used("a") == before
+
+    monkeypatch.setattr(resolution_cache, "_TOUCH_INTERVAL", 0)
+    assert cache.get("a") == {"temp": [0]}  # now b is least recently used
+    cache.put("c", {"temp": [2]})
+    assert len(cache) == 2
+    assert cache.get("b") is None
+
+    # another connection, like from another process, sees the same entries
+    other = ResolutionCache(path)
+    assert other.get("c") == {"temp": [2]}
+    other.close()
+    cache.close()
+
+
+def test_accessor_and_match_criteria_key(tmp_path, monkeypatch):
+    path = tmp_path / "cache.sqlite"
+    with cfp.set_options(custom_criteria=criteria, resolution_cache=str(path)):
+        assert df.cf.keys() == {"temp", "salt", "longitude", "latitude", "T", "time"}
+        assert cfp.match_criteria_key(df.columns, "salt", split=True) == [
+            "sea_water_practical_salinity"
+        ]
+        assert len(resolution_cache.resolution_cache()) == 2
+
+        def fail(*args, **kwargs):
+            raise AssertionError("matched again")
+
+        # from disk, as in a new process
+        resolution_cache._MEMO.clear()
+        monkeypatch.setattr(cfp.accessor, "_classify", fail)
+        monkeypatch.setattr(cfp.utils, "_match_criteria_key", fail)
+        assert df.cf["temp"].name == "sea_water_temperature (degC)"
+        assert df.cf.coordinates == {
+            "longitude": ["lon"],
+            "latitude": ["lat"],
+            "time": ["time"],
+        }
+        assert sorted(
+            cfp.match_criteria_key(df.columns, ["salt", "time"], split=True)
+        ) == ["sea_water_practical_salinity", "time"]
+
+        # other criteria are resolved again
+        with cfp.set_options(custom_criteria={"temp": {"name": "lon"}}):
+            with pytest.raises(AssertionError, match="matched again"):
+                df.cf["temp"]
+
+    # only used when enabled
+    monkeypatch.undo()
+    assert cfp.match_criteria_key(df.columns, "salt", criteria, split=True) == [
+        "sea_water_practical_salinity"
+    ]
+
+
+def _resolve(path, i):
+    columns = [f"var{i}", "sea_water_temperature"]
+    with cfp.set_options(custom_criteria=criteria, resolution_cache=path):
+        return cfp.match_criteria_key(columns, "temp")
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="uses fork")
+def test_processes(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    with multiprocessing.get_context("fork").Pool(4) as pool:
+        results = pool.starmap(_resolve, [(path, i % 8) for i in range(32)])
+    assert results == [["sea_water_temperature"]] * 32
+    assert len(ResolutionCache(path)) == 8
@@ -0,0 +1,69 @@
+"""Test search of standard names."""
+
+import io
+
+import cf_pandas as cfp
+
+content = b"""<?xml version="1.0"?>
+<standard_name_table>
+   <version_number>1</version_number>
+   <entry id="sea_water_practical_salinity">
+      <canonical_units>1</canonical_units>
+      <description>Practical Salinity, S_P, is a determination of the salt content of sea water.</description>
+   </entry>
+   <entry id="sea_water_temperature">
+      <canonical_units>K</canonical_units>
+      <description>Sea water temperature is the in situ temperature of the sea water.</description>
+   </entry>
+   <entry id="sea_water_absolute_salinity">
+      <canonical_units>g kg-1</canonical_units>
+      <description>Absolute Salinity is the mass fraction of dissolved material in sea water.</description>
+   </entry>
+   <entry id="air_temperature">
+      <canonical_units>K</canonical_units>
+      <description>Air temperature is the bulk temperature of the air.</description>
+   </entry>
+</standard_name_table>"""
+
+
+def test_search():
+    table = cfp.standard_name_table.parse_table(io.BytesIO(content))
+    search = cfp.search.StandardNameSearch(table)
+
+    names = [name for name, _ in search.search("salinity")]
+    assert sorted(names) == [
+        "sea_water_absolute_salinity",
+        "sea_water_practical_salinity",
+    ]
+
+    # found by description only
+    names = [name for name, score in search.search("salt content")]
+    assert names == ["sea_water_practical_salinity"]
+
+    # name matches rank first
+    names = [name for name, _ in search.search("air temperature")]
+    assert names[0] == "air_temperature"
+    assert "sea_water_temperature" in names
+
+    assert search.search("temperature", limit=1)[0][0] in [
+        "air_temperature",
+        "sea_water_temperature",
+    ]
+    assert search.search("nothing") == []
+
+
+def test_search_standard_names():
+    names = cfp.search_standard_names("salinity", limit=10)
+    assert len(names) == 10
+    assert "sea_water_practical_salinity" in names
+
+    results = cfp.search_standard_names("sea ice thickness", limit=3, scores=True)
+    assert results[0][0] == "sea_ice_thickness"
+    assert results[0][1] >= results[1][1] >= results[2][1]
+
+
+def test_rank_options():
+    options = ["sea_water_temperature", "var1", "sea_water_practical_salinity"]
+    ranked = cfp.search.rank_options(options, "salinity")
+    assert ranked[0] == "sea_water_practical_salinity"
+    assert "var1" not in ranked
@@ -0,0 +1,101 @@
+"""Test standard name index."""
+
+import pytest
+
+import cf_pandas as cfp
+
+names = [
+    "sea_water_temperature",
+    "sea_water_potential_temperature",
+    "sea_surface_temperature",
+    "sea_water_practical_salinity",
+    "air_temperature",
+    "subsea_water_depth",
+]
+
+
+@pytest.fixture
+def index(tmpdir):
+    path = f"{tmpdir}/index.bin"
+    cfp.standard_name_index.build_index(names, path, version="1")
+    return cfp.standard_name_index.StandardNameIndex(path)
+
+
+def test_index(index):
+    assert len(index) == 6
+    assert index.version == "1"
+    assert index.query() == sorted(names)
+
+
+def test_prefix_suffix(index):
+    assert index.prefix("sea_water") == [
+        "sea_water_potential_temperature",
+        "sea_water_practical_salinity",
+        "sea_water_temperature",
+    ]
+    assert index.suffix("salinity") == ["sea_water_practical_salinity"]
+    assert index.prefix("zzz") == []
+
+
+def test_tokens(index):
+    assert index.tokens("sea", "temperature") == [
+        "sea_surface_temperature",
+        "sea_water_potential_temperature",
+        "sea_water_temperature",
+    ]
+    # whole tokens only
+    assert index.tokens("temp") == []
+
+
+def test_query(index):
+    assert index.query(contains="sea_water", suffix="temperature") == [
+        "sea_water_potential_temperature",
+        "sea_water_temperature",
+    ]
+    # substring of a token and across tokens
+    assert index.query(contains="bsea_wat") == ["subsea_water_depth"]
+    assert index.query(contains="temp", prefix="air") == ["air_temperature"]
+    assert index.query(contains=["water", "salin"]) == ["sea_water_practical_salinity"]
+
+
+def test_load_index(tmpdir):
+    cfp.standard_name_index._MEMO.clear()
+    index = cfp.standard_name_index.load_index(cache=tmpdir)
+    assert cfp.standard_name_index.index_path(cache=tmpdir).exists()
+    assert len(index) == len(set(cfp.standard_names()))
+    assert "sea_water_temperature" in index.suffix("temperature")
+    cfp.standard_name_index._MEMO.clear()
+
+
+def test_not_index(tmpdir):
+    path = f"{tmpdir}/other.bin"
+    with open(path, "wb") as f:
+        f.write(b"\0" * 100)
+    with pytest.raises(ValueError):
+        cfp.standard_name_index.StandardNameIndex(path)
+
+
+def test_load_index_not_writable(tmpdir, tmp_path_factory, monkeypatch):
+    sni = cfp.standard_name_index
+    sni._MEMO.clear()
+
+    def build_index(names, path, version):
+        if str(path).startswith(str(tmpdir)):
+            raise PermissionError(path)
+        return original(names, path, version)
+
+    original = sni.build_index
+    monkeypatch.setattr(sni, "build_index", build_index)
+    temporary = tmp_path_factory.mktemp("base") / "temporary"
+
+    def mkdtemp():
+        temporary.mkdir()
+        return str(temporary)
+
+    monkeypatch.setattr(sni.tempfile, "mkdtemp", mkdtemp)
+    index = sni.load_index(cache=tmpdir)
+    assert "sea_water_temperature" in index.suffix("temperature")
+    # the temporary directory is removed and the index is remembered
+    assert not temporary.exists()
+    assert sni.load_index(cache=tmpdir) is index
+    sni._MEMO.clear()
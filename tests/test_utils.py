@@ -1,8 +1,13 @@
 """Test cf-pandas utils."""
 
+import http.server
+import io
+import sys
+import threading
 from unittest import mock
 
 import pandas as pd
+import pytest
 import requests
 
 import cf_pandas as cfp
@@ -42,14 +47,85 @@ def test_match_criteria_key_split():
     ]
 
 
-@mock.patch("requests.get")
-def test_standard_names(mock_requests):
+TABLE = b"""<?xml version="1.0"?>\n<standard_name_table xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xsi:noNamespaceSchemaLocation="cf-standard-name-table-1.1.xsd">\n   <version_number>79</version_number>\n   <last_modified>2022-03-19T15:25:54Z</last_modified>\n   <institution>Centre for Environmental Data Analysis</institution>\n   <contact>support@ceda.ac.uk</contact>\n\n  \n   <entry id="longitude">\n      </entry>\n  \n   <entry id="wind_speed">\n  </entry>\n</standard_name_table>"""
 
-    resp = requests.models.Response
-    resp.content = b"""<?xml version="1.0"?>\n<standard_name_table xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xsi:noNamespaceSchemaLocation="cf-standard-name-table-1.1.xsd">\n   <version_number>79</version_number>\n   <last_modified>2022-03-19T15:25:54Z</last_modified>\n   <institution>Centre for Environmental Data Analysis</institution>\n   <contact>support@ceda.ac.uk</contact>\n\n  \n   <entry id="longitude">\n      </entry>\n  \n   <entry id="wind_speed">\n  """
-    mock_requests.return_value = resp
-    names = cfp.standard_names()
+
+@pytest.fixture
+def table_server():
+    """Local stand-in for cfconventions.org that answers conditional requests."""
+
+    requests_seen = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests_seen.append((self.path, self.headers.get("If-None-Match")))
+            if "/79/" not in self.path:
+                self.send_response(404)
+                self.end_headers()
+            elif self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+            else:
+                self.send_response(200)
+                self.send_header("ETag", '"v1"')
+                self.send_header("Content-Length", str(len(TABLE)))
+                self.end_headers()
+                self.wfile.write(TABLE)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/{{version}}/table.xml"
+    yield url, requests_seen
+    server.shutdown()
+    server.server_close()
+
+
+def test_standard_names():
+    # bundled table, no network
+    names = cfp.standard_names(fetch=False)
     assert "wind_speed" in names
+    assert "sea_water_practical_salinity" in names
+
+    with pytest.raises(ValueError):
+        cfp.standard_names(version=1, fetch=False)
+
+
+def test_standard_names_fetch(tmpdir, tmp_path, table_server):
+    url, requests_seen = table_server
+    snt = cfp.standard_name_table
+    snt._MEMO.clear()
+
+    # not cached so downloaded
+    content = snt.read_table(79, cache=tmpdir, url=url)
+    assert content == TABLE
+    assert requests_seen == [("/79/table.xml", None)]
+
+    # then read from cache without network
+    names = cfp.standard_names(version=79, fetch=False, cache_dir=tmpdir)
+    assert names == ["longitude", "wind_speed"]
+
+    # conditional request finds table has not changed
+    with mock.patch("cf_pandas.standard_name_table.URL", url):
+        names = cfp.standard_names(version=79, fetch=True, cache_dir=tmpdir)
+    assert names == ["longitude", "wind_speed"]
+    assert requests_seen[-1] == ("/79/table.xml", '"v1"')
+
+    # memo, no network
+    with cfp.set_options(standard_name_version=79, cache_dir=str(tmpdir)):
+        assert cfp.standard_names() == ["longitude", "wind_speed"]
+    assert len(requests_seen) == 2
+
+    # the memo is per cache directory
+    with pytest.raises(ValueError):
+        cfp.standard_names(version=79, fetch=False, cache_dir=tmp_path / "other")
+    snt._MEMO.clear()
+
+    with pytest.raises(requests.HTTPError):
+        snt.fetch_table(80, cache=tmpdir, url=url)
 
 
 def test__is_datetime_like():
@@ -61,3 +137,72 @@ def test__is_datetime_like():
     df["time"] = ["2001-1-1", "2001-1-2", "2001-1-3"]
     assert not cfp.utils._is_datetime_like(df["time"])
     assert cfp.utils._is_datetime_like(pd.to_datetime(df["time"]))
+
+
+def test_header_index():
+    vals = ["wind_speed (m/s)", "wind_speed", "temp"]
+    index = cfp.utils.header_index(vals)
+    assert index["wind_speed"] == ["wind_speed (m/s)", "wind_speed"]
+    assert index["(m/s)"] == ["wind_speed (m/s)"]
+    assert index["temp"] == ["temp"]
+
+    index = cfp.utils.header_index(vals, split=False)
+    assert "wind_speed" in index
+    assert "(m/s)" not in index
+
+
+def test_parse_table():
+    content = b"""<?xml version="1.0"?>
+<standard_name_table>
+   <version_number>79</version_number>
+   <last_modified>2022-03-19T15:25:54Z</last_modified>
+   <entry id="mass_concentration_of_chlorophyll_in_sea_water">
+      <canonical_units>kg m-3</canonical_units>
+      <grib></grib>
+      <amip>chl</amip>
+      <description>Mass concentration of chlorophyll.</description>
+   </entry>
+   <entry id="wind_speed">
+      <canonical_units>m s-1</canonical_units>
+      <description>Speed is the magnitude of velocity.</description>
+   </entry>
+   <alias id="chlorophyll_concentration_in_sea_water">
+      <entry_id>mass_concentration_of_chlorophyll_in_sea_water</entry_id>
+   </alias>
+</standard_name_table>"""
+    table = cfp.standard_name_table.parse_table(io.BytesIO(content))
+    assert table.version == "79"
+    assert table.last_modified == "2022-03-19T15:25:54Z"
+    assert table.names == (
+        "mass_concentration_of_chlorophyll_in_sea_water",
+        "wind_speed",
+    )
+    assert table.canonical_units == ("kg m-3", "m s-1")
+    assert table.grib == ("", None)
+    assert table.amip == ("chl", None)
+    assert "chlorophyll_concentration_in_sea_water" in table
+    assert (
+        table.resolve("chlorophyll_concentration_in_sea_water")
+        == "mass_concentration_of_chlorophyll_in_sea_water"
+    )
+    assert table.units("chlorophyll_concentration_in_sea_water") == "kg m-3"
+    assert table.description("wind_speed") == "Speed is the magnitude of velocity."
+    assert table.resolve("temp") is None
+
+
+def test_units_agree():
+    snt = cfp.standard_name_table
+    assert snt._normalize_units("m/s") == snt._normalize_units("m s-1")
+    assert snt._normalize_units("W/m^2") == "W m-2"
+    assert snt._normalize_units("") == "1"
+    assert not snt._normalize_units("degC") == snt._normalize_units("K")
+
+    assert snt._dimensions("mg m-3") == snt._dimensions("kg m-3")
+    assert snt._dimensions("1e-3") == snt._dimensions("psu")
+    assert snt._dimensions("furlong") is None
+    # without cf_units, compare dimensions and don't guess about unknown units
+    with mock.patch.dict(sys.modules, {"cf_units": None}):
+        assert snt.units_agree("degC", "K")
+        assert snt.units_agree("dbar", "Pa")
+        assert snt.units_agree("m/s", "K") is False
+        assert snt.units_agree("furlong", "m") is None
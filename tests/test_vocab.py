@@ -1,7 +1,11 @@
 """Test vocab"""
 
+import json
 import os
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
 
 import cf_pandas as cfp
 
@@ -22,7 +26,8 @@ def test_add_vocabs():
     vocab.vocab = defaultdict(
         dict, {"temp": {"standard_name": "a|b"}, "salt": {"name": "a|b"}}
     )
-    compare = {"temp": {"standard_name": "a|b|a|b"}, "salt": {"name": "a|b|a|b"}}
+    # repeated expressions are kept once
+    compare = {"temp": {"standard_name": "a|b"}, "salt": {"name": "a|b"}}
     assert (vocab + vocab).vocab == compare
 
     vocab2 = cfp.Vocab()
@@ -41,6 +46,26 @@ def test_add_vocabs():
     assert vocab.vocab == compare
 
 
+def test_write_through_vocab():
+    vocab = cfp.Vocab()
+    vocab.make_entry("a", "x", attr="name")
+    vocab.vocab["b"]["name"] = "y"
+    vocab.vocab["a"]["name"] = "w|x"
+    vocab.make_entry("c", "z", attr="name")
+    vocab.make_entry("a", "v", attr="name")
+    assert vocab.vocab == {
+        "a": {"name": "w|x|v"},
+        "b": {"name": "y"},
+        "c": {"name": "z"},
+    }
+    # changes through a dictionary held before more entries are made are kept too
+    held = vocab.vocab
+    vocab.make_entry("b", "u", attr="name")
+    held["b"]["name"] = "t"
+    vocab.make_entry("b", "s", attr="name")
+    assert (vocab + cfp.Vocab()).vocab["b"] == {"name": "t|s"}
+
+
 def test_make_more_entries():
     vocab = cfp.Vocab()
     vocab.make_entry("temp", ["a", "b"], attr="name")
@@ -49,7 +74,7 @@ def test_make_more_entries():
     vocab.make_entry("salt", ["a", "b"], attr="name")
     compare = {
         "temp": {"name": "a|b", "standard_name": "a|b"},
-        "salt": {"name": "a|b|a|b"},
+        "salt": {"name": "a|b"},
     }
     assert vocab.vocab == compare
 
@@ -89,3 +114,142 @@ def test_save_and_open(tmpdir):
     # open
     vocab2 = cfp.Vocab(fname)
     assert vocab.vocab == vocab2.vocab
+
+
+def test_merge_many():
+    vocabs = []
+    for i in range(5):
+        vocab = cfp.Vocab()
+        vocab.make_entry("temp", ["temp$", f"temp{i}$"], attr="name")
+        vocabs.append(vocab)
+    merged = cfp.merge(vocabs)
+    assert merged.vocab == {
+        "temp": {"name": "temp$|temp0$|temp1$|temp2$|temp3$|temp4$"}
+    }
+    # inputs are not changed
+    assert vocabs[0].vocab == {"temp": {"name": "temp$|temp0$"}}
+
+
+def test_split_alternatives():
+    split = cfp.vocab._split_alternatives
+    assert split("a|b") == ["a", "b"]
+    assert split("(sea|lake)_water|temp$") == ["(sea|lake)_water", "temp$"]
+    assert split(r"a\|b|[|x]|c") == [r"a\|b", "[|x]", "c"]
+    assert split("[]|]|d") == ["[]|]", "d"]
+    assert split("|a||") == ["a"]
+    assert split("") == []
+
+
+def test_vocab_setter():
+    vocab = cfp.Vocab()
+    vocab.vocab = {"temp": {"name": "(a|b)|a|(a|b)"}}
+    assert vocab.vocab == {"temp": {"name": "(a|b)|a"}}
+    vocab.make_entry("temp", "a", attr="name")
+    assert vocab.vocab == {"temp": {"name": "(a|b)|a"}}
+
+
+def test_save_compiled(tmpdir):
+    vocab = cfp.Vocab()
+    vocab.make_entry("temp", ["temp$", "sea_water_temp", "(?i)tem"], attr="name")
+    vocab.make_entry("salt", ["salinity$", r"sal\.", "psu"], attr="name")
+    fname = f"{tmpdir}/compiled.json"
+    vocab.save(fname, compiled=True)
+
+    with open(fname) as f:
+        content = json.load(f)
+    assert content["format"] == "cf-pandas-compiled-vocab"
+    assert content["entries"]["salt"]["name"] == ["salinity$", r"sal\.", "psu"]
+    assert content["patterns"]["salt"]["name"] == {
+        "exact": ["salinity"],
+        "prefixes": ["sal.", "psu"],
+        "rest": None,
+    }
+
+    vocab2 = cfp.Vocab(fname)
+    assert vocab.vocab == vocab2.vocab
+    assert sorted(
+        cfp.match_criteria_key(
+            ["salinity", "sal.", "salinity2", "psu_1"], "salt", criteria=vocab2.vocab
+        )
+    ) == ["psu_1", "sal.", "salinity"]
+
+
+def test_open_compiled_invalid(tmpdir):
+    vocab = cfp.Vocab()
+    vocab.make_entry("temp", ["temp$"], attr="name")
+    fname = f"{tmpdir}/compiled.json"
+    vocab.save(fname, compiled=True)
+    with open(fname) as f:
+        content = json.load(f)
+
+    # edited entries no longer match the hash
+    content["entries"]["temp"]["name"] = ["temp$", "t"]
+    with open(fname, "w") as f:
+        json.dump(content, f)
+    with pytest.raises(ValueError):
+        cfp.Vocab(fname)
+
+    # missing fields are corrupt too
+    for field in ["sha256", "entries"]:
+        with open(fname, "w") as f:
+            json.dump({key: val for key, val in content.items() if key != field}, f)
+        with pytest.raises(ValueError):
+            cfp.Vocab(fname)
+
+    # invalid expressions are found when opening, not when matching
+    content["entries"]["temp"]["name"] = ["temp("]
+    content["patterns"]["temp"]["name"] = {
+        "exact": [],
+        "prefixes": [],
+        "rest": "temp(",
+    }
+    content["sha256"] = cfp.vocab._content_hash(content["entries"], content["patterns"])
+    with open(fname, "w") as f:
+        json.dump(content, f)
+    with pytest.raises(ValueError):
+        cfp.Vocab(fname)
+
+
+def test_lazy_vocab(tmpdir):
+    vocab = cfp.Vocab()
+    vocab.make_entry("temp", ["temp$", "sea_water_temp"], attr="name")
+    vocab.make_entry("salt", "salinity", attr="name")
+    vocab.make_entry("salt", "sea_water_salinity$", attr="standard_name")
+    fname = f"{tmpdir}/indexed"
+    vocab.save(fname, indexed=True)
+
+    lazy = cfp.LazyVocab(f"{fname}.sqlite")
+    assert len(lazy) == 2
+    assert "temp" in lazy and "other" not in lazy
+    # nothing read yet, also for the fingerprint
+    fingerprint = cfp.CompiledCriteria(lazy).fingerprint
+    assert fingerprint == cfp.CompiledCriteria(vocab).fingerprint
+    assert lazy._loaded == {}
+    assert lazy["salt"] == vocab.vocab["salt"]
+    assert list(lazy._loaded) == ["salt"]
+    with pytest.raises(KeyError):
+        lazy["other"]
+    assert dict(lazy) == dict(vocab.vocab)
+    assert lazy.to_vocab().vocab == vocab.vocab
+
+    values = ["temp", "salinity_1", "sea_water_temperature"]
+    assert sorted(cfp.match_criteria_key(values, "temp", criteria=lazy)) == [
+        "sea_water_temperature",
+        "temp",
+    ]
+    with cfp.set_options(custom_criteria=lazy):
+        assert cfp.match_criteria_key(values, "salt") == ["salinity_1"]
+
+    # one connection shared by threads
+    lazy = cfp.LazyVocab(f"{fname}.sqlite")
+    with ThreadPoolExecutor(8) as pool:
+        entries = list(pool.map(lazy.__getitem__, ["temp", "salt"] * 200))
+    assert entries[:2] == [vocab.vocab["temp"], vocab.vocab["salt"]]
+
+
+def test_vocab_as_criteria():
+    vocab = cfp.Vocab()
+    vocab.make_entry("temp", "temp$", attr="name")
+    assert cfp.match_criteria_key(["temp", "temp2"], "temp", criteria=vocab) == ["temp"]
+    with cfp.set_options(custom_criteria=vocab):
+        assert cfp.match_criteria_key(["temp", "temp2"], "temp") == ["temp"]
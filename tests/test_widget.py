@@ -1,5 +1,9 @@
 """Test widget."""
 
+from types import SimpleNamespace
+
+import IPython
+import pandas as pd
 import pytest
 
 import cf_pandas as cfp
@@ -32,7 +36,7 @@ def test_selector():
     w.button_pressed()  # make entry with default options
     assert w.vocab.vocab == {"temp": {"standard_name": "act1$"}}
 
-    assert w.nickname == w.dropdown.widget.kwargs["nickname"] == "temp"
+    assert w.nickname == w.nickname_text.value == "temp"
 
 
 def test_selector_no_nickname():
@@ -54,3 +58,125 @@ def test_selector_input_vocab():
     # then make entry and change vocab
     w.button_pressed()  # make entry with default options — so only first valid value is kept
     assert w.vocab.vocab == {"key": {"standard_name": "var|var1$"}}
+
+
+def test_dropdown_search():
+    options = ["var1", "sea_water_temperature", "sea_water_practical_salinity"]
+    w = cfp.dropdown("salt", options, search="salinity")
+    assert w.options[0] == "sea_water_practical_salinity"
+    assert "var1" not in w.options
+
+    w = cfp.Selector(options=options, nickname_in="salt", search_in="salinity")
+    w.button_pressed()
+    assert w.vocab.vocab == {"salt": {"standard_name": "sea_water_practical_salinity$"}}
+
+
+def test_options_index():
+    options = [
+        "sea_water_temperature",
+        "Sea_Water_Temperature_qc",
+        "sea_surface_temperature",
+        "air_temperature",
+        "séa_water_temperature",
+        "sea_water_salinity",
+    ]
+    index = cfp.widget.OptionsIndex(options)
+    series = pd.Series(options)
+    for include, exclude in [
+        ("sea", ""),
+        ("sea_wa", ""),
+        ("sea_water_t", ""),
+        ("sea_water_t", "qc"),
+        ("temp|sal", ""),
+        ("", "air"),
+        ("wa", ""),
+    ]:
+        expected = series[
+            series.str.match(cfp.Reg(include=include, exclude=exclude).pattern())
+        ]
+        pd.testing.assert_series_equal(index.filter(include, exclude), expected)
+
+    # repeated filters come from the cache
+    assert index.filter_ids("sea", "") is index.filter_ids("sea", "")
+
+    w = cfp.dropdown("temp", index, include="water_temp", exclude="qc")
+    assert w.options == ("sea_water_temperature", "séa_water_temperature")
+
+
+def test_selector_debounce():
+    w = cfp.Selector(
+        options=["var1", "var2", "act1", "act2"], nickname_in="temp", debounce=60
+    )
+    assert w.dropdown.options == ("var1", "var2", "act1", "act2")
+
+    # changes wait for the debounce timer, and only the newest input is filtered
+    w.include_text.value = "act"
+    w.include_text.value = "act2"
+    assert w.dropdown.options == ("var1", "var2", "act1", "act2")
+    generation = w._generation
+    w.flush()
+    assert w.dropdown.options == ("act2",)
+
+    # stale results are dropped
+    w._refresh(generation - 1)
+    assert w.dropdown.options == ("act2",)
+
+    # saving uses the options for the current input
+    w.exclude_text.value = "2"
+    w.include_text.value = "act"
+    w.button_pressed()
+    assert w.vocab.vocab == {"temp": {"standard_name": "act1$"}}
+
+
+def test_selector_background(monkeypatch):
+    w = cfp.Selector(options=["var1", "var2", "act1"], debounce=0.01)
+    w.include_text.value = "act"
+    w._timer.join(5)
+    assert w.dropdown.options == ("act1",)
+
+    # in a kernel, widgets are changed from its event loop, not the timer thread
+    callbacks = []
+    kernel = SimpleNamespace(
+        io_loop=SimpleNamespace(add_callback=lambda *args: callbacks.append(args))
+    )
+    monkeypatch.setattr(IPython, "get_ipython", lambda: SimpleNamespace(kernel=kernel))
+    w.include = "var"
+    assert w.include_text.value == "var"
+    w._timer.join(5)
+    assert w.dropdown.options == ("act1",)
+    func, *args = callbacks.pop()
+    func(*args)
+    assert w.dropdown.options == ("var1", "var2")
+    # the result is not shown twice
+    w.dropdown.value = ["var2"]
+    func(*args)
+    assert w.dropdown.value == ("var2",)
+
+
+def test_selector_pages():
+    options = [f"var{i:02d}" for i in range(25)]
+    w = cfp.Selector(options=options, nickname_in="temp", page_size=10)
+    assert w.dropdown.options == tuple(options[:10])
+    assert w.pages == 3
+    assert "showing 1-10 of 25" in w.status.value
+
+    # selection is kept across pages
+    w.dropdown.value = ["var01", "var02"]
+    w.next_page()
+    w.next_page()
+    assert w.dropdown.options == tuple(options[20:])
+    w.dropdown.value = ["var24"]
+    w.next_page()  # stays on the last page
+    assert w.page == 2
+    w.prev_page()
+    w.prev_page()
+    assert w.dropdown.value == ("var01", "var02")
+    assert "3 selected" in w.status.value
+
+    # refine narrows the matches without dropping the selection
+    w.refine_text.value = "1"
+    assert w.dropdown.options == ("var01",) + tuple(options[10:19])
+    assert w.pages == 2
+    assert w.dropdown.value == ("var01",)
+    w.button_pressed()
+    assert w.vocab.vocab == {"temp": {"standard_name": "var01$|var02$|var24$"}}